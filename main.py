@@ -6,18 +6,35 @@ The enhancement functions are defined in src/search.py:
     - decisive_move_mcts
     - weighted_backpropagation_mcts
     - multi_simulation_mcts
+    - rave_mcts
+    - puct_mcts
+
+An Engine (defined in src/engine.py) can be used in place of any of these functions.  It keeps its
+tree between moves and, with ponder=True, keeps searching while the opponent thinks.
+
+Any of them can be wrapped with book_player (defined in src/book.py) to play the opening from a book
+built with 'python -m src.book build/book.bin'.
+
+Games can be played under a time control (see src/clock.py) instead of a fixed number of iterations.
 """
 from typing import Optional, Tuple
 
 from src.types import get_default_state
 from src.enums import Color
 from src.game import get_next_state, check_victory
+from src.clock import GameClock, TimeControl
 from src.utils import print_state
 from src.search import default_mcts, decisive_move_mcts,\
-    weighted_backpropagation_mcts, multi_simulation_mcts
+    weighted_backpropagation_mcts, multi_simulation_mcts, rave_mcts, puct_mcts
+from src.engine import Engine
+from src.book import OpeningBook, book_player
+
+def get_player_name(player) -> str:
+    """Returns the name of a search function, or the class name of a callable such as an Engine."""
+    return getattr(player, '__name__', type(player).__name__)
 
-def play_game(color: Color, black_enh, white_enh, iterations: int = 300)\
-    -> Optional[Tuple[float, float]]:
+def play_game(color: Color, black_enh, white_enh, iterations: int = 300,
+              time_control: Optional[TimeControl] = None) -> Optional[Tuple[float, float]]:
     """Plays a game using the given MCTS enhancement functions.
 
     Args:
@@ -25,6 +42,8 @@ def play_game(color: Color, black_enh, white_enh, iterations: int = 300)\
         black_enh: a function from search.py that defines the black player's mcts algorithm.
         white_enh: a function from search.py that defines the white player's mcts algorithm.
         iterations: an int defining how many iterations should run for each MCTS search.
+        time_control: if given, each search runs until the deadlines given by a GameClock instead
+            of for a number of iterations, and a player who runs out of time loses.
 
     Returns:
         A tuple of the form: (BlackScore, WhiteScore).  The range for each score is [0.0, 1.0] where
@@ -33,14 +52,22 @@ def play_game(color: Color, black_enh, white_enh, iterations: int = 300)\
     state = get_default_state(color)
 
     print(f"Starting a game.  {color.value} is going first.\n"
-          f"The player with black stones is using {black_enh.__name__}.\n"
-          f"The player with white stones is using {white_enh.__name__}.\n")
+          f"The player with black stones is using {get_player_name(black_enh)}.\n"
+          f"The player with white stones is using {get_player_name(white_enh)}.\n")
 
+    clock = GameClock(time_control) if time_control is not None else None
     while not check_victory(state):
-        if state.to_move == Color.BLACK:
-            action = black_enh(state, iterations)
+        enhancement = black_enh if state.to_move == Color.BLACK else white_enh
+        if clock is None:
+            action = enhancement(state, iterations)
         else:
-            action = white_enh(state, iterations)
+            deadline, max_deadline = clock.start_move(state)
+            action = enhancement(state, None, deadline=deadline, max_deadline=max_deadline)
+            remaining = clock.end_move()
+            print(f"{state.to_move.value} has {max(0.0, remaining):.1f}s left.")
+            if remaining <= 0.0:
+                print(f"{state.to_move.value} ran out of time.")
+                return (0.0, 1.0) if state.to_move == Color.BLACK else (1.0, 0.0)
         state = get_next_state(state, action)
         print_state(state)
     return check_victory(state)
@@ -50,5 +77,12 @@ def play_game(color: Color, black_enh, white_enh, iterations: int = 300)\
 # decisive_move_mcts,
 # weighted_backpropagation_mcts,
 # multi_simulation_mcts,
+# rave_mcts,
+# puct_mcts,
+# Engine(ponder=True),
+# book_player(OpeningBook('build/book.bin'), default_mcts),
+#
+# TIME CONTROL (instead of iterations):
+# play_game(Color.BLACK, default_mcts, rave_mcts, time_control=TimeControl(60.0, 1.0))
 
 print(play_game(Color.BLACK, default_mcts, decisive_move_mcts))
@@ -0,0 +1,86 @@
+"""
+Defines functions used to measure how many iterations the RAVE MCTS algorithm needs to match the
+other MCTS algorithms used in tournament.py.
+
+For each opponent and each fraction of the opponent's iteration budget, rave_mcts plays a number of
+games (alternating colors) with that fraction of the budget.  The result is appended to
+build/rave.csv in the form: Opponent,Fraction,Points,Games
+
+The smallest fraction at which Points/Games reaches 0.5 is the fraction of the iterations that RAVE
+needs for equal strength.
+"""
+
+from typing import Tuple
+import csv
+from datetime import datetime
+
+from src.types import get_default_state
+from src.search import default_mcts, decisive_move_mcts,\
+    weighted_backpropagation_mcts, multi_simulation_mcts, rave_mcts
+from src.enums import Color
+from src.game import check_victory, get_next_state
+from src.utils import pretty_time_delta
+
+OPPONENTS = [
+    (default_mcts, 'def'),
+    (decisive_move_mcts, 'dec'),
+    (weighted_backpropagation_mcts, 'wbp'),
+    (multi_simulation_mcts, 'msm'),
+]
+FRACTIONS = [0.125, 0.25, 0.5, 1.0]
+ITERATIONS = 150
+GAMES = 20
+
+def play_game(color: Color, opponent, rave_iterations: int) -> float:
+    """Plays a game between rave_mcts (always Black) and an opponent (always White).
+
+    Args:
+        color: the Color that moves first.
+        opponent: the function from search.py that decides the White player's actions.
+        rave_iterations: the number of iterations rave_mcts runs for each move.
+
+    Returns:
+        The points the RAVE player achieved: 1.0 for a win, 0.5 for a draw, 0.0 for a loss.
+    """
+    state = get_default_state(color)
+    while not check_victory(state):
+        if state.to_move == Color.BLACK:
+            action = rave_mcts(state, rave_iterations)
+        else:
+            action = opponent(state, ITERATIONS)
+        state = get_next_state(state, action)
+
+    return check_victory(state)[0]
+
+def test_fraction(opponent: Tuple, fraction: float) -> None:
+    """Plays GAMES games at the given fraction of the budget and appends the result to
+    build/rave.csv.
+
+    Args:
+        opponent: a tuple containing a MCTS function from search.py and a short string for ease of
+        reading.
+        fraction: the fraction of ITERATIONS that rave_mcts is given.
+    """
+    rave_iterations = max(1, int(ITERATIONS * fraction))
+    points = 0.0
+    for game in range(GAMES):
+        print(f'({game}/{GAMES})')
+        starting_player = Color.BLACK if game % 2 == 0 else Color.WHITE
+        points += play_game(starting_player, opponent[0], rave_iterations)
+
+    line = [opponent[1], fraction, points, GAMES]
+    with open('./build/rave.csv', mode='a') as rave_file:
+        r_writer = csv.writer(rave_file, delimiter=',', quoting=csv.QUOTE_MINIMAL, quotechar='"')
+        r_writer.writerow(line)
+        print("writing:", line)
+
+START = datetime.now()
+
+for opp in OPPONENTS:
+    for frac in FRACTIONS:
+        print(f'rav vs {opp[1]} at {frac} of {ITERATIONS} iterations')
+        test_fraction(opp, frac)
+
+END = datetime.now()
+
+print(f'\nRan the RAVE benchmark in {pretty_time_delta((END - START).total_seconds())}')
@@ -0,0 +1,230 @@
+"""An iterative-deepening alpha-beta search for late-game positions.
+
+Near the end of the game the tree is small and most lines end within a few plies, so an exact
+search is much cheaper than thousands of random rollouts, and it never misses a forced finish.
+
+alphabeta_search runs a negamax alpha-beta search to increasing depths.  Values are the chance of
+winning for the player to move, in [0.0, 1.0]: terminal positions are scored with check_victory and
+positions at the depth limit with evaluation.evaluate_state.  Every value also carries a flag that
+is True when no position at the depth limit contributed to it, in which case it is the exact value
+of the game; the search stops deepening as soon as the root value is exact.
+
+The search uses a transposition table keyed by utils.get_state_key and orders the actions of each
+position so that the most promising are searched first:
+    - actions that win at once (these end the search of the position),
+    - the best action found for the position by an earlier search,
+    - actions that extend the player's longest row or column of flats (road threats),
+    - the rest, flats before moves before standing stones (see utils.get_action_order).
+
+search.SearchOptions hands a position off to alphabeta_search when alphabeta is set and
+is_late_game holds, and uses its action whenever the result is exact.
+"""
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+from .enums import Color
+from .evaluation import evaluate_state, get_road_potential
+from .game import get_actions, get_next_state, check_victory
+from .types import State, Action
+from .utils import get_state_key, encode_action, get_action_order, TranspositionTable,\
+    TABLE_CAPACITY
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class AlphaBetaResult(NamedTuple):
+    """Defines the result of an alpha-beta search.
+
+    Attributes:
+        action: the best action found.
+        value: the value of the position for the player to move, in [0.0, 1.0].
+        exact: True if value is the exact result of the game, False if it is an estimate.
+        depth: the depth of the deepest completed search.
+        nodes: the number of positions searched.
+    """
+    action: Action
+    value: float
+    exact: bool
+    depth: int
+    nodes: int
+
+class TableEntry(NamedTuple):
+    """Defines an entry of the transposition table.
+
+    Attributes:
+        depth: the depth the position was searched to.
+        value: the value found for the player to move.
+        bound: EXACT, LOWER or UPPER, depending on how value relates to the window.
+        exact: True if the value does not depend on the depth limit.
+        code: the code of the best action found, or None.
+    """
+    depth: int
+    value: float
+    bound: int
+    exact: bool
+    code: Optional[int]
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the deadline has passed."""
+
+def is_late_game(state: State, max_empty: int = 1, max_stones: int = 1) -> bool:
+    """Returns True if the game is close enough to its end for an exact search.
+
+    With the defaults, a depth 4 search finds the exact result of about half of the late-game
+    positions reached by random games, in well under a second.
+
+    Args:
+        state: the State to check.
+        max_empty: the game is late if no more than this many squares are empty...
+        max_stones: ...or if either player has no more than this many stones left.
+    """
+    if min(state.black_stones, state.white_stones) <= max_stones:
+        return True
+    empty = 0
+    for row in state.board:
+        for square in row:
+            if not square:
+                empty += 1
+    return empty <= max_empty
+
+class AlphaBeta:
+    """Runs alpha-beta searches that share a transposition table."""
+    def __init__(self, capacity: int = TABLE_CAPACITY):
+        """Initializes a searcher with an empty transposition table.
+
+        Args:
+            capacity: the most positions the table holds (see utils.TranspositionTable).
+        """
+        self._table = TranspositionTable(capacity)
+        self._nodes = 0
+        self._deadline: Optional[float] = None
+
+    def search(self, state: State, max_depth: int = 6,
+               deadline: Optional[float] = None) -> AlphaBetaResult:
+        """Searches the position to increasing depths and returns the deepest result.
+
+        Args:
+            state: the position to search; it must not be terminal.
+            max_depth: the greatest depth searched.
+            deadline: a time.monotonic() value after which the search stops.  The result of the
+                deepest search completed before the deadline is returned (depth 1 always
+                completes).
+        """
+        self._nodes = 0
+        best: Optional[AlphaBetaResult] = None
+        for depth in range(1, max_depth + 1):
+            self._deadline = deadline if best is not None else None
+            try:
+                value, exact, action = self._search_root(state, depth)
+            except SearchTimeout:
+                break
+            best = AlphaBetaResult(action=action, value=value, exact=exact, depth=depth,
+                                   nodes=self._nodes)
+            if exact:
+                break
+        return best._replace(nodes=self._nodes)
+
+    def _search_root(self, state: State, depth: int) -> Tuple[float, bool, Action]:
+        """Searches the root with a full window and returns its value, flag and best action.
+
+        The best action comes from the root's own loop: the table may have been cleared while
+        the children were searched, so it is not read back from there.
+        """
+        self._nodes += 1
+        mover = 0 if state.to_move == Color.BLACK else 1
+        key = get_state_key(state)
+        value, exact, action = self._search_children(state, depth, 0.0, 1.0, mover,
+                                                     self._table.get(key))
+        self._store(key, depth, 0.0, 1.0, value, exact, action)
+        return value, exact, action
+
+    def _negamax(self, state: State, depth: int, alpha: float, beta: float) -> Tuple[float, bool]:
+        """Returns the value of the position for the player to move and whether it is exact."""
+        self._nodes += 1
+        if self._deadline is not None and self._nodes % 256 == 0 and\
+                time.monotonic() >= self._deadline:
+            raise SearchTimeout()
+
+        mover = 0 if state.to_move == Color.BLACK else 1
+        result = check_victory(state)
+        if result is not None:
+            return result[mover], True
+        if depth == 0:
+            return evaluate_state(state)[mover], False
+
+        key = get_state_key(state)
+        entry = self._table.get(key)
+        if entry is not None and (entry.depth >= depth or entry.exact):
+            if entry.bound == EXACT or\
+                    entry.bound == LOWER and entry.value >= beta or\
+                    entry.bound == UPPER and entry.value <= alpha:
+                return entry.value, entry.exact
+
+        value, exact, action = self._search_children(state, depth, alpha, beta, mover, entry)
+        self._store(key, depth, alpha, beta, value, exact, action)
+        return value, exact
+
+    def _search_children(self, state: State, depth: int, alpha: float, beta: float, mover: int,
+                         entry: Optional[TableEntry]) -> Tuple[float, bool, Action]:
+        """Searches the children of a non-terminal position and returns its value, flag and best
+        action."""
+        best_value, best_exact, best_action = -1.0, True, None
+        for action, child in self._get_ordered_children(state, mover, entry):
+            child_value, child_exact = self._negamax(child, depth - 1, 1.0 - beta, 1.0 - alpha)
+            value = 1.0 - child_value
+            best_exact = best_exact and child_exact
+            if value > best_value:
+                best_value, best_action = value, action
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                best_exact = child_exact
+                break
+        return best_value, best_exact, best_action
+
+    def _store(self, key: Tuple, depth: int, alpha: float, beta: float, value: float,
+               exact: bool, action: Action) -> None:
+        """Stores the result of searching a position with the window (alpha, beta)."""
+        if value <= alpha:
+            bound = UPPER
+        elif value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self._table.put(key, TableEntry(depth, value, bound, exact, encode_action(action)))
+
+    @staticmethod
+    def _get_ordered_children(state: State, mover: int, entry: Optional[TableEntry])\
+        -> List[Tuple[Action, State]]:
+        """Returns the actions of the position with their states, best candidates first.
+
+        If an action wins at once, it is the only one returned.
+        """
+        color = state.to_move
+        potential = get_road_potential(state, color)
+        tt_code = entry.code if entry is not None else None
+        scored = []
+        for action in get_actions(state):
+            child = get_next_state(state, action)
+            result = check_victory(child)
+            if result is not None and result[mover] == 1.0:
+                return [(action, child)]
+            if encode_action(action) == tt_code:
+                priority = 0
+            elif get_road_potential(child, color) > potential:
+                priority = 1
+            else:
+                priority = 2 + get_action_order(action)
+            scored.append((priority, action, child))
+        scored.sort(key=lambda item: item[0])
+        return [(action, child) for _, action, child in scored]
+
+def alphabeta_search(state: State, max_depth: int = 6,
+                     deadline: Optional[float] = None) -> AlphaBetaResult:
+    """Returns the result of an iterative-deepening alpha-beta search with a new table.
+
+    Args:
+        state: the position to search; it must not be terminal.
+        max_depth: the greatest depth searched.
+        deadline: a time.monotonic() value after which the search stops.
+    """
+    return AlphaBeta().search(state, max_depth, deadline)
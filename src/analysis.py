@@ -0,0 +1,221 @@
+"""Open-ended analysis: a search that reports on its tree while it runs.
+
+A search returns a single action once its budget is used up.  analyze instead searches for as long
+as the caller keeps asking, and yields a Snapshot of the tree every interval_iterations iterations
+or every interval seconds, whichever comes first.  A snapshot holds the statistics of every root
+child, the principal variation (the line of most visited children), the search rate and the size of
+the tree, so a long analysis can be watched as it converges and stopped once it has.
+
+The caller stops the analysis by leaving its loop (or calling close on the generator); iterations
+only run while the generator is waiting to produce the next snapshot, so no work is done after the
+last snapshot is taken.  An iteration count, a deadline or a stop event set from another thread
+ends the analysis too, as does the solver proving the root; the last snapshot is always yielded.
+
+    for snapshot in analyze(state, interval=1.0, solver=True):
+        print(format_snapshot(snapshot))
+        if snapshot.iterations >= 100000:
+            break
+
+Run an analysis of the starting position with 'python -m src.analysis [--time S] [--interval S]'.
+"""
+from argparse import ArgumentParser
+from threading import Event
+import time
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from .enums import Color
+from .node import Node
+from .search import SearchOptions, SearchStats, run_iterations
+from .types import State, Action, get_default_state
+from .utils import get_action_string
+
+class ChildStats(NamedTuple):
+    """Defines the statistics of one root child in a Snapshot.
+
+    Attributes:
+        action: the child's action.
+        visits: the child's visits.
+        win_rate: the average result of the child's simulations for the player to move at the root.
+        proven: the child's proven (Black, White) value, or None if it is unknown.
+    """
+    action: Action
+    visits: int
+    win_rate: float
+    proven: Optional[Tuple[float, float]]
+
+class Snapshot(NamedTuple):
+    """Defines the state of an analysis at one point in time.
+
+    Attributes:
+        iterations: the number of simulations run so far.
+        elapsed: the number of seconds since the analysis started.
+        nodes_per_second: the number of simulations run per second so far.
+        tree_size: the number of nodes in the tree.
+        children: the statistics of the root's children, most visited first.
+        pv: the principal variation: the actions of the most visited child at each level.
+        proven: the exact (Black, White) result of the root if the solver proved it, otherwise
+            None.
+    """
+    iterations: int
+    elapsed: float
+    nodes_per_second: float
+    tree_size: int
+    children: List[ChildStats]
+    pv: List[Action]
+    proven: Optional[Tuple[float, float]]
+
+def get_principal_variation(root_node: Node, max_length: int = 10) -> List[Action]:
+    """Returns the actions of the most visited child at each level below root_node.
+
+    Args:
+        root_node: the root of the tree.
+        max_length: the most actions returned.  The line also ends at a child with no visits.
+    """
+    pv: List[Action] = []
+    node = root_node
+    while node.children and len(pv) < max_length:
+        node = max(node.children, key=lambda child: child.visits)
+        if node.visits == 0:
+            break
+        pv.append(node.action)
+    return pv
+
+def get_snapshot(root_node: Node, iterations: int, elapsed: float, tree_size: int,
+                 pv_length: int = 10) -> Snapshot:
+    """Returns a Snapshot of the tree below root_node.
+
+    Args:
+        root_node: the root of the tree.
+        iterations: the number of simulations run so far.
+        elapsed: the number of seconds since the analysis started.
+        tree_size: the number of nodes in the tree.
+        pv_length: the most actions in the principal variation.
+    """
+    children = [
+        ChildStats(
+            action=child.action,
+            visits=child.visits,
+            # Each child's wins are those of its own player to move, the root player's opponent.
+            win_rate=1.0 - child.wins / child.visits if child.visits else 0.0,
+            proven=child.proven,
+        )
+        for child in sorted(root_node.children, key=lambda child: child.visits, reverse=True)
+    ]
+    return Snapshot(
+        iterations=iterations,
+        elapsed=elapsed,
+        nodes_per_second=iterations / elapsed if elapsed > 0.0 else 0.0,
+        tree_size=tree_size,
+        children=children,
+        pv=get_principal_variation(root_node, pv_length),
+        proven=root_node.proven,
+    )
+
+def analyze_tree(root_node: Node, options: SearchOptions, interval_iterations: Optional[int] = None,
+                 interval: Optional[float] = 1.0, iterations: Optional[int] = None,
+                 deadline: Optional[float] = None, stop: Optional[Event] = None,
+                 pv_length: int = 10) -> Iterator[Snapshot]:
+    """Searches an existing tree, yielding a Snapshot at every interval, until the caller stops.
+
+    Args:
+        root_node: the root of the tree to search.
+        options: the enhancements to use.  Early stopping is ignored.
+        interval_iterations: if given, a snapshot is taken after this many simulations.
+        interval: if given, a snapshot is taken after this many seconds.
+        iterations: if given, the analysis ends after this many simulations.
+        deadline: if given, a time.monotonic() value at which the analysis ends.
+        stop: if given, the analysis ends once this event is set.
+        pv_length: the most actions in each principal variation.
+
+    Raises:
+        ValueError: neither interval_iterations nor interval is given.
+    """
+    if interval_iterations is None and interval is None:
+        raise ValueError("an analysis needs an iteration or a time interval")
+
+    options = options._replace(early_stop=False, confidence=None)
+    stats = SearchStats(root_node.count_descendants() + 1)
+    step = options.leaf_simulations
+    start = time.monotonic()
+    completed = 0
+    while True:
+        budget = interval_iterations
+        if iterations is not None:
+            remaining = max(step, iterations - completed)
+            budget = remaining if budget is None else min(budget, remaining)
+        slice_deadline = deadline
+        if interval is not None:
+            interval_deadline = time.monotonic() + interval
+            if slice_deadline is None or interval_deadline < slice_deadline:
+                slice_deadline = interval_deadline
+
+        done, _ = run_iterations(root_node, options, budget, slice_deadline, stats, stop)
+        completed += done
+        now = time.monotonic()
+        finished = iterations is not None and completed + step > iterations or\
+            deadline is not None and now >= deadline or\
+            stop is not None and stop.is_set() or\
+            options.solver and root_node.proven is not None
+
+        yield get_snapshot(root_node, completed, now - start, stats.nodes, pv_length)
+        if finished:
+            return
+
+def analyze(root: State, interval_iterations: Optional[int] = None,
+            interval: Optional[float] = 1.0, iterations: Optional[int] = None,
+            time_limit: Optional[float] = None, stop: Optional[Event] = None,
+            pv_length: int = 10, **options) -> Iterator[Snapshot]:
+    """Searches a new tree from root, yielding a Snapshot at every interval, until the caller stops.
+
+    Args:
+        root: a State NamedTuple that represents the game state to analyze.
+        interval_iterations: if given, a snapshot is taken after this many simulations.
+        interval: if given, a snapshot is taken after this many seconds.
+        iterations: if given, the analysis ends after this many simulations.
+        time_limit: if given, the analysis ends after this many seconds.
+        stop: if given, the analysis ends once this event is set.
+        pv_length: the most actions in each principal variation.
+        options: keyword arguments defining the enhancements to use (see search.SearchOptions).
+    """
+    search_options = SearchOptions(**options)
+    deadline = time.monotonic() + time_limit if time_limit is not None else None
+    root_node = Node(action=None, state=root, parent=None, weight=search_options.weight_factor,
+                     arena=search_options.arena)
+    try:
+        yield from analyze_tree(root_node, search_options, interval_iterations, interval,
+                                iterations, deadline, stop, pv_length)
+    finally:
+        if search_options.arena is not None:
+            search_options.arena.release(root_node)
+
+def format_snapshot(snapshot: Snapshot, children: int = 3) -> str:
+    """Returns a one-line summary of a snapshot.
+
+    Args:
+        snapshot: the snapshot to describe.
+        children: the number of root children to list, most visited first.
+    """
+    pv = ' '.join(get_action_string(action) for action in snapshot.pv)
+    best = ', '.join(f"{get_action_string(child.action)} {child.visits} {child.win_rate:.3f}"
+                     for child in snapshot.children[:children])
+    line = (f"{snapshot.elapsed:.1f}s {snapshot.iterations} it {snapshot.nodes_per_second:.0f}/s "
+            f"{snapshot.tree_size} nodes | {best} | pv {pv}")
+    if snapshot.proven is not None:
+        line += f" | proven {snapshot.proven}"
+    return line
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Parses the command line and prints an analysis of the starting position."""
+    parser = ArgumentParser(description='Analyze the starting position.')
+    parser.add_argument('--time', type=float, default=10.0, help='the seconds to analyze for')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='the seconds between snapshots')
+    parser.add_argument('--white', action='store_true', help='White moves first')
+    args = parser.parse_args(argv)
+
+    state = get_default_state(Color.WHITE if args.white else Color.BLACK)
+    for snapshot in analyze(state, interval=args.interval, time_limit=args.time, solver=True):
+        print(format_snapshot(snapshot))
+
+if __name__ == '__main__':
+    main()
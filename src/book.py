@@ -0,0 +1,184 @@
+"""An opening book: precomputed moves for the first plies of a game.
+
+Every game starts from get_default_state, so the first few positions recur in every game and are
+worth searching once, deeply, rather than in every game.  build_book searches every position up to
+a given number of plies from the start (one per class of positions equivalent under the board's
+symmetries, see utils.get_canonical_hash) in parallel and writes the best action for each to a
+book file.
+
+A book file holds a header and an array of fixed-size records sorted by canonical position hash:
+    header: magic b'TAKB', format version, number of records
+    record: canonical hash, code of the best action in the canonical orientation, visits of the
+        best action, iterations searched
+OpeningBook maps the file with mmap and finds a position with a binary search (see
+records.RecordFile), so a lookup costs a few record reads and the file is shared between processes
+through the page cache.
+
+book_player wraps a search function so that it plays from the book while it can:
+    play_game(Color.BLACK, book_player(OpeningBook('build/book.bin'), default_mcts), default_mcts)
+
+Build a book with 'python -m src.book PATH [--plies N] [--iterations N] [--workers N]'.
+"""
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+import os
+import struct
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .enums import Color
+from .game import get_actions, get_next_state, check_victory
+from .node import Node
+from .records import RecordFile
+from .search import SearchOptions, search_tree
+from .types import State, Action, get_default_state
+from .utils import encode_action, decode_action, get_canonical_hash, transform_action,\
+    INVERSE_SYMMETRIES
+
+MAGIC = b'TAKB'
+VERSION = 1
+HEADER = struct.Struct('<4sHI')
+RECORD = struct.Struct('<QHII')
+
+class BookEntry(NamedTuple):
+    """Defines the BookEntry type: one position of an opening book.
+
+    Attributes:
+        key: the canonical hash of the position.
+        code: the code of the best action, in the canonical orientation of the position.
+        visits: the visits of the best action.
+        iterations: the number of iterations the position was searched for.
+    """
+    key: int
+    code: int
+    visits: int
+    iterations: int
+
+def get_book_positions(plies: int, colors: Tuple[Color, ...] = (Color.BLACK, Color.WHITE))\
+    -> List[State]:
+    """Returns one position from each class of equivalent positions within plies of the start.
+
+    Args:
+        plies: the number of plies to play from the starting positions.
+        colors: the players who may move first.
+    """
+    positions: Dict[int, State] = {}
+    frontier = [get_default_state(color) for color in colors]
+    for ply in range(plies + 1):
+        next_frontier = []
+        for state in frontier:
+            key, _ = get_canonical_hash(state)
+            if key in positions or check_victory(state):
+                continue
+            positions[key] = state
+            if ply < plies:
+                next_frontier.extend(get_next_state(state, action)
+                                     for action in get_actions(state))
+        frontier = next_frontier
+    return list(positions.values())
+
+def search_book_position(state: State, iterations: int, options: Dict) -> BookEntry:
+    """Searches one position and returns its book entry.  Runs in a worker process."""
+    search_options = SearchOptions(**options)
+    root_node = Node(action=None, state=state, parent=None, weight=search_options.weight_factor)
+    result = search_tree(root_node, search_options, iterations)
+    code = encode_action(result.action)
+    # An exact result from the alphabeta or pns handoff leaves the root without children.
+    visits = next((child.visits for child in root_node.children if child.code == code), 0)
+
+    key, symmetry = get_canonical_hash(state)
+    code = encode_action(transform_action(result.action, symmetry))
+    return BookEntry(key=key, code=code, visits=visits, iterations=result.iterations)
+
+def write_book(entries: List[BookEntry], path: str) -> None:
+    """Writes book entries to a book file, sorted by key."""
+    entries = sorted(entries)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        for entry in entries:
+            file.write(RECORD.pack(*entry))
+
+def build_book(path: str, plies: int = 2, iterations: int = 2000, workers: Optional[int] = None,
+               colors: Tuple[Color, ...] = (Color.BLACK, Color.WHITE), **options) -> int:
+    """Searches every book position and writes the results to a book file.
+
+    Args:
+        path: the name of the book file.
+        plies: the book covers the positions up to this many plies from the start.
+        iterations: the number of iterations to search each position.
+        workers: the number of processes searching positions, defaulting to the number of CPUs.
+            With 1, every position is searched in this process.
+        colors: the players who may move first.
+        options: keyword arguments defining the enhancements to use (see search.SearchOptions).
+
+    Returns:
+        The number of positions in the book.
+    """
+    positions = get_book_positions(plies, colors)
+    count = len(positions)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            entries = list(executor.map(search_book_position, positions, [iterations] * count,
+                                        [options] * count))
+    else:
+        entries = [search_book_position(state, iterations, options) for state in positions]
+    write_book(entries, path)
+    return count
+
+class OpeningBook(RecordFile):
+    """A book file opened with mmap, searched by canonical position hash."""
+    MAGIC = MAGIC
+    VERSION = VERSION
+    HEADER = HEADER
+    RECORD = RECORD
+    KIND = 'book'
+
+    def __contains__(self, state: State) -> bool:
+        return self.get_entry(get_canonical_hash(state)[0]) is not None
+
+    def get_entry(self, key: int) -> Optional[BookEntry]:
+        """Returns the entry for a canonical position hash, or None if it is not in the book."""
+        record = self.find_record(key)
+        return None if record is None else BookEntry(*record)
+
+    def lookup(self, state: State) -> Optional[Action]:
+        """Returns the book action for the position, or None if it is not in the book."""
+        key, symmetry = get_canonical_hash(state)
+        entry = self.get_entry(key)
+        if entry is None:
+            return None
+        return transform_action(decode_action(entry.code), INVERSE_SYMMETRIES[symmetry])
+
+def book_player(book: OpeningBook, function: Callable) -> Callable:
+    """Returns a search function that plays the book action when there is one.
+
+    Args:
+        book: the opening book.
+        function: a function from search.py (or an Engine) used once the game leaves the book.
+            Keyword arguments (e.g. a deadline) are passed on to it.
+    """
+    def play(state: State, iterations: Optional[int] = None, **kwargs) -> Action:
+        action = book.lookup(state)
+        if action is None:
+            return function(state, iterations, **kwargs)
+        return action
+    play.__name__ = f"book_{getattr(function, '__name__', type(function).__name__)}"
+    return play
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Parses the command line and builds a book."""
+    parser = ArgumentParser(description='Build an opening book.')
+    parser.add_argument('path', help='the book file to write')
+    parser.add_argument('--plies', type=int, default=2, help='the depth of the book')
+    parser.add_argument('--iterations', type=int, default=2000,
+                        help='the iterations searched for each position')
+    parser.add_argument('--workers', type=int, help='the number of processes to use')
+    args = parser.parse_args(argv)
+
+    count = build_book(args.path, args.plies, args.iterations, args.workers)
+    print(f"Wrote {count} positions to {args.path}")
+
+if __name__ == '__main__':
+    main()
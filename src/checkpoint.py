@@ -0,0 +1,208 @@
+"""Functions for saving search trees to a compact binary file and loading them again.
+
+A checkpoint file holds a header, the root position, and an array of fixed-size node records in
+breadth-first order, so the children of every node are contiguous:
+    header: magic b'TAKT', format version, size of the root position, number of nodes
+    root position: the player to move, each player's stones, and the stack on every square
+    node record: action code (-1 at the root), proven value (-1 if unknown, otherwise twice
+        Black's result), number of children, visits, wins, index of the first child
+
+TreeFile opens a checkpoint with mmap (see records.RecordFile) and reads single records on demand,
+so a large tree can be inspected (or shared between processes through the page cache) without
+building any Nodes.
+load_tree resumes a checkpoint as a Node tree, which can be passed to search.search_tree to run
+more iterations.  It builds only the root and its children at once; every other node is built from
+its record the first time the search selects its parent (see Node.load), so the nodes the search
+never returns to are never deserialized.  Nodes below a visit threshold can be left unexpanded, as
+if pruned.
+
+AMAF tables and last visit ticks are not saved.
+"""
+from functools import partial
+import struct
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from .game import get_next_state
+from .node import Node
+from .records import RecordFile
+from .utils import encode_action, encode_state, decode_state
+
+MAGIC = b'TAKT'
+VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+RECORD = struct.Struct('<hbHqdI')
+
+class NodeRecord(NamedTuple):
+    """Defines the NodeRecord type: one node of a checkpoint file.
+
+    Attributes:
+        code: the code of the node's action (see utils.encode_action), or None at the root.
+        proven: the node's proven (Black, White) value, or None if it is unknown.
+        child_count: the number of children saved for the node.
+        visits: the node's visits.
+        wins: the node's wins.
+        first_child: the index of the node's first child; its children follow it.
+    """
+    code: Optional[int]
+    proven: Optional[Tuple[float, float]]
+    child_count: int
+    visits: int
+    wins: float
+    first_child: int
+
+def save_tree(root_node: Node, path: str) -> int:
+    """Writes the tree below root_node to a checkpoint file.
+
+    The nodes of a loaded tree that the search has not reached yet are built first (see
+    load_tree), so they are saved too.
+
+    Args:
+        root_node: the root of the tree to save.
+        path: the name of the file to write.
+
+    Returns:
+        The number of nodes written.
+    """
+    load_pending(root_node)
+    nodes: List[Node] = [root_node]
+    for node in nodes:
+        nodes.extend(node.children)
+
+    state = encode_state(root_node.state)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(state), len(nodes)))
+        file.write(state)
+        first_child = 1
+        for node in nodes:
+            code = -1 if node.code is None else node.code
+            proven = -1 if node.proven is None else round(node.proven[0] * 2)
+            file.write(RECORD.pack(code, proven, len(node.children), node.visits, node.wins,
+                                   first_child))
+            first_child += len(node.children)
+    return len(nodes)
+
+class TreeFile(RecordFile):
+    """A checkpoint file opened with mmap, whose records are read only when asked for."""
+    MAGIC = MAGIC
+    VERSION = VERSION
+    HEADER = HEADER
+    RECORD = RECORD
+    KIND = 'checkpoint'
+
+    def _read_header(self, fields: Tuple) -> int:
+        """Reads the root position, which the node records follow, and the number of nodes."""
+        state_size, count = fields
+        self._state = decode_state(self._map[self._offset:self._offset + state_size])
+        self._offset += state_size
+        return count
+
+    def get_record(self, index: int) -> NodeRecord:
+        """Returns the record of the node at index; the root is at index 0."""
+        if not 0 <= index < self._count:
+            raise IndexError(f"node {index} is not in the checkpoint")
+        code, proven, child_count, visits, wins, first_child = self.read_record(index)
+        return NodeRecord(
+            code=None if code < 0 else code,
+            proven=None if proven < 0 else (proven / 2, 1.0 - proven / 2),
+            child_count=child_count,
+            visits=visits,
+            wins=wins,
+            first_child=first_child,
+        )
+
+    def get_children(self, index: int) -> range:
+        """Returns the indices of the children of the node at index."""
+        record = self.get_record(index)
+        return range(record.first_child, record.first_child + record.child_count)
+
+    def find(self, codes: List[int]) -> Optional[int]:
+        """Returns the index of the node reached by a sequence of action codes from the root, or
+        None if that node was not saved."""
+        index = 0
+        for code in codes:
+            for child in self.get_children(index):
+                if self.get_record(child).code == code:
+                    index = child
+                    break
+            else:
+                return None
+        return index
+
+    def iter_records(self) -> Iterator[NodeRecord]:
+        """Yields every record in breadth-first order."""
+        for index in range(self._count):
+            yield self.get_record(index)
+
+    @property
+    def state(self):
+        """Property definition for _state."""
+        return self._state
+
+def load_children(tree_file: TreeFile, record: NodeRecord, min_visits: int, node: Node) -> None:
+    """Adds the saved children of a node, each with its saved statistics and proven value.
+
+    The children's own children are not built: each child is given a loader that builds them when
+    the search first selects it (see Node.load).
+
+    Args:
+        tree_file: the open checkpoint.
+        record: the node's record.
+        min_visits: the children of nodes with fewer visits than this are never loaded.
+        node: the node whose children are added.
+    """
+    actions = {encode_action(action): action for action in node.unexplored}
+    for index in range(record.first_child, record.first_child + record.child_count):
+        child_record = tree_file.get_record(index)
+        action = actions[child_record.code]
+        restore_node(tree_file, child_record, min_visits,
+                     node.add_child(action, get_next_state(node.state, action)))
+
+def restore_node(tree_file: TreeFile, record: NodeRecord, min_visits: int, node: Node) -> None:
+    """Sets a node's saved statistics and proven value, and a loader for its saved children."""
+    # pylint: disable=protected-access
+    node._visits, node._wins = record.visits, record.wins
+    if record.proven is not None and node.proven is None:
+        node.set_proven(record.proven)
+    if record.child_count and record.visits >= min_visits:
+        node.loader = partial(load_children, tree_file, record, min_visits)
+
+def load_tree(path: str, min_visits: int = 0, weight: float = 2.0, lazy: bool = True) -> Node:
+    """Builds a Node tree from a checkpoint file.
+
+    Only the root and its children are built at once.  Every other node is built from its record
+    when the search first selects its parent, so resuming a large checkpoint costs nothing for the
+    parts of the tree the search never returns to; the file stays mapped until every saved node
+    has been built or discarded.  save_tree builds any nodes still pending before it saves.
+
+    Args:
+        path: the name of the checkpoint file.
+        min_visits: the children of nodes with fewer visits than this are not loaded, and their
+            actions are left unexplored, as if the node had been pruned.
+        weight: the exploration weight of the new nodes.
+        lazy: if False, the whole tree is built before returning and the file is closed.
+
+    Returns:
+        The root Node, with the saved statistics and proven values.
+    """
+    tree_file = TreeFile(path)
+    root_node = Node(action=None, state=tree_file.state, parent=None, weight=weight)
+    restore_node(tree_file, tree_file.get_record(0), min_visits, root_node)
+    root_node.load()
+    if not lazy:
+        load_pending(root_node)
+        tree_file.close()
+    return root_node
+
+def load_pending(root_node: Node) -> int:
+    """Builds every node of a loaded tree that is still waiting for the search to reach it.
+
+    Returns:
+        The number of nodes built.
+    """
+    count = 0
+    stack = [root_node]
+    while stack:
+        node = stack.pop()
+        count += node.load()
+        stack.extend(node.children)
+    return count
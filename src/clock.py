@@ -0,0 +1,127 @@
+"""A game clock and per-move time allocation for clocked play.
+
+Under a time control, each player has a total amount of time for the whole game, plus an increment
+added after each of their moves, instead of a fixed number of iterations per move.  GameClock keeps
+both players' remaining time and turns each move's allocation into the two deadlines accepted by
+search.search (deadline and max_deadline), which every search function in search.py and an Engine
+pass on.
+
+allocate_time decides how long a move may take:
+    - The remaining time is shared over an estimate of the player's remaining moves.  The estimate
+      comes from the game phase: the game ends at the latest when the player has placed their last
+      stone or the board is full, so it is the smaller of the two, plus MOVE_MARGIN for the
+      actions that move stacks instead of placing stones.
+    - Most of the increment is added (INCREMENT_SHARE), since it is earned back after the move.
+    - The share is scaled by the square root of the branching factor relative to its average
+      (AVERAGE_BRANCHING), within [MIN_SCALE, MAX_SCALE]: positions with many actions are harder to
+      decide.  A position with a single action gets no time.
+The result is the move's target.  Its maximum is MAX_EXTENSION times the target, capped at
+MAX_FRACTION of the remaining time.  The search stops at the target if the decision is settled,
+and otherwise keeps going up to the maximum until the root's visits are no longer unstable (see
+search.get_instability), so the extra time goes to the moves where the decision is hard.
+"""
+import time
+from typing import Dict, NamedTuple, Tuple
+
+from .enums import Color
+from .game import get_actions
+from .types import State
+
+MIN_MOVES_LEFT = 4
+MOVE_MARGIN = 4
+INCREMENT_SHARE = 0.8
+AVERAGE_BRANCHING = 24.0
+MIN_SCALE = 0.5
+MAX_SCALE = 2.0
+MAX_EXTENSION = 3.0
+MAX_FRACTION = 0.3
+
+class TimeControl(NamedTuple):
+    """Defines the time each player has for a game.
+
+    Attributes:
+        total: the number of seconds each player has for the whole game.
+        increment: the number of seconds added to a player's time after each of their moves.
+    """
+    total: float
+    increment: float = 0.0
+
+class Allocation(NamedTuple):
+    """Defines the time allocated to one move.
+
+    Attributes:
+        target: the number of seconds the search runs for if the root is stable.
+        maximum: the number of seconds the search may run for while the root is unstable.
+    """
+    target: float
+    maximum: float
+
+def estimate_moves_left(state: State) -> int:
+    """Returns an estimate of the number of moves the player to move has left in the game."""
+    stones = state.black_stones if state.to_move == Color.BLACK else state.white_stones
+    empty = 0
+    for row in state.board:
+        for square in row:
+            if not square:
+                empty += 1
+    return max(MIN_MOVES_LEFT, min(stones, empty) + MOVE_MARGIN)
+
+def allocate_time(state: State, remaining: float, increment: float = 0.0) -> Allocation:
+    """Returns the time to allocate to the player to move.
+
+    Args:
+        state: the position to move in.
+        remaining: the number of seconds the player has left.
+        increment: the number of seconds the player gains after the move.
+    """
+    branching = len(get_actions(state))
+    if branching <= 1 or remaining <= 0.0:
+        return Allocation(target=0.0, maximum=0.0)
+
+    share = remaining / estimate_moves_left(state) + increment * INCREMENT_SHARE
+    scale = min(MAX_SCALE, max(MIN_SCALE, (branching / AVERAGE_BRANCHING) ** 0.5))
+    maximum = min(share * scale * MAX_EXTENSION, remaining * MAX_FRACTION)
+    return Allocation(target=min(share * scale, maximum), maximum=maximum)
+
+class GameClock:
+    """Keeps both players' remaining time and allocates the time of each move."""
+    def __init__(self, time_control: TimeControl):
+        """Initializes a clock with the full time for each player."""
+        self._increment = time_control.increment
+        self._remaining: Dict[Color, float] = {
+            Color.BLACK: time_control.total,
+            Color.WHITE: time_control.total,
+        }
+        self._mover = Color.BLACK
+        self._started = 0.0
+
+    def remaining(self, color: Color) -> float:
+        """Returns the number of seconds the player has left."""
+        return self._remaining[color]
+
+    def is_flagged(self, color: Color) -> bool:
+        """Returns True if the player has run out of time."""
+        return self._remaining[color] <= 0.0
+
+    def start_move(self, state: State) -> Tuple[float, float]:
+        """Starts the clock of the player to move and returns the move's deadlines.
+
+        Returns:
+            A tuple of time.monotonic() values: the deadline and the max_deadline of the search.
+        """
+        self._mover = state.to_move
+        allocation = allocate_time(state, self._remaining[self._mover], self._increment)
+        self._started = time.monotonic()
+        return (self._started + allocation.target, self._started + allocation.maximum)
+
+    def end_move(self) -> float:
+        """Stops the clock of the player who moved and returns their remaining time.
+
+        The time used is charged to the player, and the increment is added unless they have run
+        out of time.
+        """
+        remaining = self._remaining[self._mover] - (time.monotonic() - self._started)
+        if remaining > 0.0:
+            remaining += self._increment
+        self._remaining[self._mover] = remaining
+        return remaining
@@ -0,0 +1,174 @@
+"""Class for a game-playing engine that keeps its search tree between moves.
+
+The search functions in search.py build a new tree for every move.  An Engine instead keeps the
+subtree of the move it played, and reuses the subtree of the opponent's reply when it is asked for
+its next move, so the work done on the expected continuation is not thrown away.
+
+With pondering enabled, the Engine also keeps searching the kept subtree in a background thread
+while the opponent is thinking.  Pondering stops as soon as the Engine is asked for a move (or told
+the opponent's move), and only the subtree matching the opponent's actual move is kept.
+
+An Engine can be called like the functions in search.py: engine(state, iterations) -> Action.
+"""
+from threading import Event, Thread
+from typing import Optional
+
+from .node import Node
+from .types import State, Action
+from .search import SearchOptions, SearchResult, SearchStats, run_iterations, search_tree,\
+    get_deadline
+from .utils import get_state_key, encode_action
+
+class Engine:
+    """Plays a game with a search tree that is kept, and optionally searched, between moves."""
+    def __init__(self, iterations: Optional[int] = None, time_limit: Optional[float] = None,
+                 ponder: bool = False, ponder_iterations: Optional[int] = None, **options):
+        """Initializes an engine with no tree.
+
+        Args:
+            iterations: the default number of iterations for each move.
+            time_limit: the default number of seconds for each move.
+            ponder: if True, the engine searches in the background while the opponent thinks.
+            ponder_iterations: if given, the maximum number of iterations run while pondering.
+            options: keyword arguments defining the enhancements to use (see SearchOptions).
+        """
+        self._options = SearchOptions(**options)
+        self._iterations = iterations
+        self._time_limit = time_limit
+        self._ponder = ponder
+        self._ponder_iterations = ponder_iterations
+        self._root: Optional[Node] = None
+        self._thread: Optional[Thread] = None
+        self._stop = Event()
+        self._pondered = 0
+
+    def __call__(self, state: State, iterations: Optional[int] = None, **kwargs) -> Action:
+        """Returns the engine's move, so that an Engine can be used like a search function.
+
+        Keyword arguments (e.g. deadline and max_deadline) are passed on to search.
+        """
+        return self.search(state, iterations, **kwargs).action
+
+    def search(self, state: State, iterations: Optional[int] = None,
+               time_limit: Optional[float] = None, deadline: Optional[float] = None,
+               stop: Optional[Event] = None, max_deadline: Optional[float] = None)\
+        -> SearchResult:
+        """Searches the given position, reusing any part of the tree that matches it.
+
+        The subtree of the returned action is kept as the engine's tree and, if pondering is
+        enabled, searched in the background until the next call.
+
+        Args:
+            state: the position to search.
+            iterations: the number of iterations to run, defaulting to the engine's.
+            time_limit: the number of seconds to search, defaulting to the engine's.
+            deadline: a time.monotonic() value after which no new iteration is started.
+            stop: if given, the search also ends once this event is set.  A search with a stop
+                event needs no other budget.
+            max_deadline: a later time.monotonic() value up to which the search continues past
+                the deadline while the root is unstable (see search.run_iterations).
+        """
+        self.stop_pondering()
+        root_node = self._find_root(state)
+
+        if iterations is None and time_limit is None and deadline is None and stop is None:
+            iterations, time_limit = self._iterations, self._time_limit
+        result = search_tree(root_node, self._options, iterations,
+                             get_deadline(time_limit, deadline), stop=stop,
+                             max_deadline=max_deadline)
+
+        self._root = root_node
+        self.advance(result.action)
+        if self._ponder:
+            self.start_pondering()
+        return result
+
+    def advance(self, action: Action) -> None:
+        """Keeps only the subtree of the given action, which has just been played.
+
+        Call this with the opponent's move to discard the rest of the tree before the next
+        search; search also does this itself by matching positions.
+        """
+        self.stop_pondering()
+        if self._root is None:
+            return
+
+        code = encode_action(action)
+        for child in self._root.children:
+            if child.code == code:
+                self._root = self._keep_child(self._root, child)
+                return
+        self._release(self._root)
+        self._root = None
+
+    def start_pondering(self) -> None:
+        """Starts searching the engine's tree in a background thread."""
+        if self._thread is not None or self._root is None or self._root.terminal is not None:
+            return
+
+        self._stop.clear()
+        self._pondered = 0
+        self._thread = Thread(target=self._run_ponder, args=(self._root,), daemon=True)
+        self._thread.start()
+
+    def stop_pondering(self) -> int:
+        """Stops the background search, if any, and returns the number of iterations it ran."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self._pondered
+
+    def close(self) -> None:
+        """Stops pondering and discards the engine's tree."""
+        self.stop_pondering()
+        if self._root is not None:
+            self._release(self._root)
+        self._root = None
+
+    def _run_ponder(self, root_node: Node) -> None:
+        """Runs iterations on root_node until stop_pondering is called."""
+        stats = SearchStats(root_node.count_descendants() + 1)
+        # Pondering has no budget to save, so early stopping would only cut it short.
+        options = self._options._replace(early_stop=False, confidence=None)
+        self._pondered, _ = run_iterations(root_node, options, self._ponder_iterations,
+                                           stats=stats, stop=self._stop)
+
+    def _find_root(self, state: State) -> Node:
+        """Returns the kept node for this position, or a new root if there is none."""
+        if self._root is not None:
+            key = get_state_key(state)
+            if get_state_key(self._root.state) == key:
+                return self._root
+            for child in self._root.children:
+                if get_state_key(child.state) == key:
+                    return self._keep_child(self._root, child)
+            self._release(self._root)
+
+        return Node(action=None, state=state, parent=None, weight=self._options.weight_factor,
+                    arena=self._options.arena)
+
+    def _keep_child(self, root_node: Node, child: Node) -> Node:
+        """Detaches child from root_node and releases the rest of the tree to the arena, if any."""
+        child.detach()
+        arena = self._options.arena
+        if arena is not None:
+            for other in root_node.children:
+                if other is not child:
+                    arena.release(other)
+        return child
+
+    def _release(self, root_node: Node) -> None:
+        """Releases a discarded tree to the arena, if any."""
+        if self._options.arena is not None:
+            self._options.arena.release(root_node)
+
+    @property
+    def root(self):
+        """Property definition for _root."""
+        return self._root
+
+    @property
+    def pondered(self):
+        """Property definition for _pondered."""
+        return self._pondered
@@ -0,0 +1,141 @@
+"""Static evaluation of Tak positions.
+
+This module defines a cheap evaluation function that is used in place of a full random simulation
+when a rollout is truncated.  It scores a position from three features:
+    - the difference in flat stones on top of a stack (which decides the game if it ends on flats),
+    - the road potential of each player: the most squares they hold with flats in a single row or
+      column, squared so that nearly complete roads count for much more,
+    - the difference in stones left in each player's reserve.
+
+The weighted sum of the features is converted into a win probability with the logistic function.
+
+The module also defines cheap priors over the actions of a position, used to order expansion and
+by PUCT selection (see Node.select_child_puct).  Each action is scored from the position before it
+is played, without building the next state:
+    - flat placements gain a flat, and extend the player's flats in their row or column (a
+      placement that completes a row or column is very likely to win),
+    - standing stones block the opponent's flats in their row or column,
+    - moves capture the squares topped by the opponent along their path.
+The scores are converted into probabilities with the softmax function.
+"""
+from math import exp
+from typing import Dict, List, Tuple
+
+from .enums import Color, Piece
+from .types import State, Action, Place
+from .utils import encode_action
+
+FLAT_WEIGHT = 0.3
+ROAD_WEIGHT = 0.15
+STONE_WEIGHT = 0.05
+
+FLAT_PRIOR = 1.0
+ROAD_PRIOR = 0.5
+ROAD_COMPLETE_PRIOR = 6.0
+STANDING_PRIOR = -1.0
+BLOCK_PRIOR = 0.75
+MOVE_PRIOR = -0.5
+CAPTURE_PRIOR = 0.75
+
+def get_road_potential(state: State, color: Color) -> int:
+    """Returns the most squares the player controls with flats in a single row or column.
+
+    Args:
+        state: the State to evaluate.
+        color: the Color of the player.
+    """
+    flat = Piece.BLACK_FLAT if color == Color.BLACK else Piece.WHITE_FLAT
+    board = state.board
+    best = 0
+    for index in range(4):
+        row_count, col_count = 0, 0
+        for other in range(4):
+            if board[index][other] and board[index][other][-1] == flat:
+                row_count += 1
+            if board[other][index] and board[other][index][-1] == flat:
+                col_count += 1
+        best = max(best, row_count, col_count)
+    return best
+
+def evaluate_state(state: State) -> Tuple[float, float]:
+    """Returns an estimate of each player's chance of winning from the passed state.
+
+    Args:
+        state: the State to evaluate.
+
+    Returns:
+        A tuple of floats in the range (0.0, 1.0) that sum to 1.0: (Black, White).
+    """
+    black_flats, white_flats = 0, 0
+    for row in state.board:
+        for square in row:
+            if square and square[-1] == Piece.BLACK_FLAT:
+                black_flats += 1
+            elif square and square[-1] == Piece.WHITE_FLAT:
+                white_flats += 1
+
+    black_road = get_road_potential(state, Color.BLACK)
+    white_road = get_road_potential(state, Color.WHITE)
+
+    score = (FLAT_WEIGHT * (black_flats - white_flats) +
+             ROAD_WEIGHT * (black_road**2 - white_road**2) +
+             STONE_WEIGHT * (state.black_stones - state.white_stones))
+    black = 1.0 / (1.0 + exp(-score))
+    return (black, 1.0 - black)
+
+def count_line_flats(state: State, coord: Tuple[int, int], flat: Piece) -> int:
+    """Returns the most squares topped by the given flat in the row or the column of coord."""
+    board = state.board
+    row, col = coord
+    row_count, col_count = 0, 0
+    for other in range(4):
+        if board[row][other] and board[row][other][-1] == flat:
+            row_count += 1
+        if board[other][col] and board[other][col][-1] == flat:
+            col_count += 1
+    return max(row_count, col_count)
+
+def get_action_prior(state: State, action: Action) -> float:
+    """Returns an unnormalized score of how promising an action is for the player to move.
+
+    Args:
+        state: the State in which the action is played.
+        action: the action to score.
+    """
+    color = state.to_move
+    if isinstance(action, Place):
+        if action.piece.value['type'] == 'flat':
+            own_flat = Piece.BLACK_FLAT if color == Color.BLACK else Piece.WHITE_FLAT
+            extension = count_line_flats(state, action.coord, own_flat) + 1
+            if extension == 4:
+                return ROAD_COMPLETE_PRIOR
+            return FLAT_PRIOR + ROAD_PRIOR * extension
+        other_flat = Piece.WHITE_FLAT if color == Color.BLACK else Piece.BLACK_FLAT
+        blocked = count_line_flats(state, action.coord, other_flat)
+        return STANDING_PRIOR + (BLOCK_PRIOR * blocked if blocked >= 2 else 0.0)
+
+    row, col = action.start_coord
+    steps = len(action.drop_list)
+    delta_row = (action.end_coord[0] - row) // steps
+    delta_col = (action.end_coord[1] - col) // steps
+    captures = 0
+    for step in range(1, steps + 1):
+        square = state.board[row + delta_row * step][col + delta_col * step]
+        if square and square[-1].value['color'] != color:
+            captures += 1
+    return MOVE_PRIOR + CAPTURE_PRIOR * captures
+
+def get_action_priors(state: State, actions: List[Action]) -> Dict[int, float]:
+    """Returns the prior probability of each action, keyed by action code.
+
+    Args:
+        state: the State in which the actions are played.
+        actions: the legal actions of the state.
+    """
+    scores = [get_action_prior(state, action) for action in actions]
+    if not scores:
+        return {}
+    top = max(scores)
+    weights = [exp(score - top) for score in scores]
+    total = sum(weights)
+    return {encode_action(action): weight / total for action, weight in zip(actions, weights)}
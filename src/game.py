@@ -1,25 +1,36 @@
 """Functions for running and simulating a Tak game.
 
-This module contains five functions:
+This module contains seven functions:
     validate_action(state, action) -> bool
     get_next_state(state, action) -> State
     get_actions(state) -> List[Action]
+    get_action_codes(state) -> List[int]
+    get_actions_and_codes(state) -> Tuple[List[Action], List[int]]
     check_victory(state) -> Union[None, Tuple[float, float]]
-    simulate(state) -> Tuple[float, float]
+    simulate(state, record, max_plies, lengths, probe, policy) -> Tuple[float, float]
 
     Validate_action returns true if the proposed action is valid for the given state.
     Get_next_state returns the new (immutable) state that results from applying the passed action
-    to the passed state.  Get_actions returns a list of all possible actions for a given state.
+    to the passed state.  Get_actions returns a list of all possible actions for a given state,
+    using a bounded LRU cache keyed by position so that repeated positions are only generated once.
+    Get_action_codes returns the codes of those actions (see utils.encode_action), cached the same
+    way, and get_actions_and_codes returns both lists from a single lookup.
     Check_victory if the state is terminal, returns a tuple indicating which player won.
     Simulate runs a game from the current state to an end state choosing all actions randomly.
-    This is used for the standard implementation of a Monte-Carlo Tree Search algorithm.
+    This is used for the standard implementation of a Monte-Carlo Tree Search algorithm, and can
+    be given a policy (such as mast.MastTable.choose) to choose the actions instead.  It can
+    optionally be truncated after a number of plies, in which case the last state is scored with a
+    static evaluation.
 """
-from typing import List, Union, Tuple
+from collections import Counter, OrderedDict
+from typing import Callable, List, NamedTuple, Optional, Union, Tuple
 from copy import deepcopy
+import random
 
 from .types import Action, Move, Place, State
 from .enums import Piece, Color
-from .utils import split_stack, get_drop_lists, get_path
+from .utils import split_stack, get_drop_lists, get_path, get_state_key, encode_action
+from .evaluation import evaluate_state
 
 def validate_action(state: State, action: Action, debug: bool = False) -> bool:
     """Validates proposed action for the given state.
@@ -249,17 +260,161 @@ def get_next_state(passed_state: State, action: Action) -> State:
         board=board,
     )
 
+class CacheInfo(NamedTuple):
+    """Defines the statistics of the legal action cache.
+
+    Attributes:
+        hits: the number of get_actions calls answered from the cache.
+        misses: the number of get_actions calls that had to generate the actions.
+        size: the number of positions currently in the cache.
+        capacity: the maximum number of positions kept in the cache.
+    """
+    hits: int
+    misses: int
+    size: int
+    capacity: int
+
+class ActionCache:
+    """A bounded least-recently-used cache from position keys to lists of legal actions.
+
+    The cache is shared by every search in the process, including those the engine server runs on
+    its threads.  It takes no lock, which would cost more than the lookup itself: each OrderedDict
+    operation is atomic under the GIL, and an entry evicted by another thread between two of them
+    is treated as already gone.  Only the hit and miss counters can drift under concurrent use.
+    """
+    def __init__(self, capacity: int):
+        """Initializes an empty cache that holds at most capacity positions."""
+        self._entries: OrderedDict = OrderedDict()
+        self._capacity = capacity
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Tuple) -> Optional[List[Action]]:
+        """Returns the cached actions for key (marking them as recently used), or None."""
+        actions = self._entries.get(key)
+        if actions is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            pass
+        return actions
+
+    def put(self, key: Tuple, actions: List[Action]) -> None:
+        """Caches actions for key, evicting the least recently used position if the cache is
+        full."""
+        self._entries[key] = actions
+        self._evict()
+
+    def resize(self, capacity: int) -> None:
+        """Changes the capacity, evicting the least recently used positions as needed."""
+        self._capacity = capacity
+        self._evict()
+
+    def clear(self) -> None:
+        """Empties the cache and resets its counters."""
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def _evict(self) -> None:
+        """Evicts the least recently used positions until the cache is within its capacity."""
+        while len(self._entries) > self._capacity:
+            try:
+                self._entries.popitem(last=False)
+            except KeyError:
+                break
+
+    @property
+    def capacity(self) -> int:
+        """Property definition for _capacity."""
+        return self._capacity
+
+    @property
+    def info(self) -> CacheInfo:
+        """Returns the cache's statistics."""
+        return CacheInfo(self._hits, self._misses, len(self._entries), self._capacity)
+
+ACTION_CACHE_CAPACITY = 65536
+ACTION_CACHE = ActionCache(ACTION_CACHE_CAPACITY)
+CODE_CACHE = ActionCache(ACTION_CACHE_CAPACITY)  # positions to (actions, codes) pairs
+
+def set_action_cache_capacity(capacity: int) -> None:
+    """Sets the number of positions kept by the legal action cache.  0 disables the cache."""
+    if capacity < 0:
+        raise ValueError(f"capacity cannot be < 0: {capacity}")
+    ACTION_CACHE.resize(capacity)
+    CODE_CACHE.resize(capacity)
+
+def clear_action_cache() -> None:
+    """Empties the legal action cache and resets its hit and miss counters."""
+    ACTION_CACHE.clear()
+    CODE_CACHE.clear()
+
+def get_action_cache_info() -> CacheInfo:
+    """Returns the hits, misses, size and capacity of the legal action cache."""
+    return ACTION_CACHE.info
+
 def get_actions(state: State) -> List[Action]:
     """Returns a list of all possible actions available in the current board state.
 
+    Results are kept in a bounded LRU cache keyed by position (see set_action_cache_capacity).
+    The returned list is a fresh copy, so callers may modify it.
+
     Args:
         state: An immutable State object (NamedTuple) containing board state information.
 
     Returns:
         A list of Actions (see types.py) that are immutable NamedTuples.
+    """
+    if ACTION_CACHE.capacity == 0:
+        return generate_actions(state)
+
+    key = get_state_key(state)
+    actions = ACTION_CACHE.get(key)
+    if actions is None:
+        actions = generate_actions(state)
+        ACTION_CACHE.put(key, actions)
+    return list(actions)
+
+def get_action_codes(state: State) -> List[int]:
+    """Returns the codes of the actions returned by get_actions, in the same order."""
+    return list(get_actions_and_codes(state)[1])
+
+def get_actions_and_codes(state: State) -> Tuple[List[Action], List[int]]:
+    """Returns the actions of the position and their codes (see utils.encode_action), in the order
+    of get_actions.
+
+    Both lists come from one lookup in a cache of their own, the same size as the legal action
+    cache, so that policies that look actions up by code (see mast.py) hash each position once per
+    ply and encode its actions only once.  The lists are shared with the cache and must not be
+    modified.
+    """
+    if CODE_CACHE.capacity == 0:
+        actions = generate_actions(state)
+        return (actions, [encode_action(action) for action in actions])
+
+    key = get_state_key(state)
+    entry = CODE_CACHE.get(key)
+    if entry is None:
+        actions = ACTION_CACHE.get(key)
+        if actions is None:
+            actions = generate_actions(state)
+            ACTION_CACHE.put(key, actions)
+        entry = (actions, [encode_action(action) for action in actions])
+        CODE_CACHE.put(key, entry)
+    return entry
+
+def generate_actions(state: State) -> List[Action]:
+    """Generates the list of all possible actions available in the current board state.
 
-    Raises:
-        RuntimeError: An error occurs when this function is called from a terminal state.
+    Args:
+        state: An immutable State object (NamedTuple) containing board state information.
+
+    Returns:
+        A list of Actions (see types.py) that are immutable NamedTuples.
     """
     action_list: List[Action] = []
 
@@ -365,3 +520,51 @@ def check_victory(state: State) -> Union[None, Tuple[float, float]]:
         return (1.0, 0.0)
 
     return None
+
+def simulate(state: State, record: Optional[List[Action]] = None, max_plies: Optional[int] = None,
+             lengths: Optional[Counter] = None, probe: Optional[Callable] = None,
+             policy: Optional[Callable] = None) -> Tuple[float, float]:
+    """Plays random actions from the passed state until the game is over.
+
+    Args:
+        state: An immutable State object (NamedTuple) containing board state information.
+        record: if given, every action played is appended to this list.
+        max_plies: if given, the simulation stops after this many actions and the final state is
+            scored with evaluate_state instead.
+        lengths: if given, the number of actions played is counted in this histogram.
+        probe: if given, a function (such as a tablebase.Tablebase) returning the exact result of a
+            position or None.  The simulation stops at the first position it knows.
+        policy: if given, a function taking a state, its actions and their codes (as returned by
+            get_actions_and_codes, not to be modified) and returning the action to play, used
+            instead of a uniform choice.
+
+    Returns:
+        A tuple of floats containing the score for each player: (Black, White), as returned by
+        check_victory (or evaluate_state, if the simulation was truncated, or probe) for the final
+        state of the simulated game.
+    """
+    plies = 0
+    result = check_victory(state)
+    while result is None:
+        if plies == max_plies:
+            result = evaluate_state(state)
+            break
+        if probe is not None:
+            result = probe(state)
+            if result is not None:
+                break
+        if policy is None:
+            actions = get_actions(state)
+            action = random.choice(actions)
+        else:
+            actions, codes = get_actions_and_codes(state)
+            action = policy(state, actions, codes)
+        if record is not None:
+            record.append(action)
+        state = get_next_state(state, action)
+        plies += 1
+        result = check_victory(state)
+
+    if lengths is not None:
+        lengths[plies] += 1
+    return result
@@ -0,0 +1,160 @@
+"""The Move-Average Sampling Technique (MAST): a rollout policy learned from the search's results.
+
+A MastTable keeps, for each player and action code (see utils.encode_action), the number of times
+the player played the action in a simulated game and the sum of that player's results.  The table
+is global to the search rather than kept per node: an action that tends to win wherever it is played
+(a flat on a square that completes many roads, a capture of a strong stack) earns a high average,
+and rollouts that sample from the table play it more often than the uniform rollouts of
+game.simulate.
+
+Actions are sampled with one of two policies:
+    - 'epsilon' (epsilon-greedy): a uniformly random action with probability epsilon, otherwise
+      the action with the best average, ties broken at random.
+    - 'gibbs': an action chosen with probability proportional to exp(average / temperature).
+
+Sampling is kept nearly as cheap as a uniform choice.  The averages (and, for Gibbs sampling,
+their exponentials) are stored in flat arrays indexed by code, updated with the statistics, so
+choosing an action reads one value per legal action with no division or exp.  game.simulate passes
+the codes of each position's actions along with the actions (see game.get_actions_and_codes), so
+the position is hashed once per ply, and a Gibbs sample is one pass of running sums and a bisection
+rather than a fresh weight list handed to random.choices.
+
+The table is passed to a search as an option (mast=MastTable(), see search.SearchOptions).  It is
+updated with the actions of every iteration, those chosen in the tree as well as in the rollout,
+and it is kept between searches for as long as the caller keeps it, so what one move's search
+learns carries over into the next.  decay shrinks the statistics so that old results fade.
+"""
+from array import array
+from bisect import bisect
+from itertools import accumulate
+from math import exp
+import random
+from typing import List, Optional, Tuple
+
+from .enums import Color
+from .game import get_action_codes
+from .types import State, Action
+from .utils import ACTION_CODES
+
+POLICIES = ('epsilon', 'gibbs')
+
+class MastTable:
+    """Per-player action statistics shared by every node of a search, and a policy sampling them."""
+    def __init__(self, policy: str = 'epsilon', epsilon: float = 0.1, temperature: float = 0.2):
+        """Initializes an empty table.
+
+        Args:
+            policy: 'epsilon' or 'gibbs'.
+            epsilon: the chance of a uniformly random action with the 'epsilon' policy.
+            temperature: the temperature of the 'gibbs' policy.  Averages lie in [0.0, 1.0], so
+                temperatures well below 1.0 are needed to favour the best actions.
+
+        Raises:
+            ValueError: the policy is unknown, epsilon is outside [0.0, 1.0] or the temperature is
+                not positive.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"unknown MAST policy: {policy}")
+        if not 0.0 <= epsilon <= 1.0:
+            raise ValueError(f"epsilon must be in [0.0, 1.0]: {epsilon}")
+        if temperature <= 0.0:
+            raise ValueError(f"temperature must be > 0: {temperature}")
+        self._policy = policy
+        self._epsilon = epsilon
+        self._temperature = temperature
+        self.clear()
+
+    def clear(self) -> None:
+        """Forgets every statistic."""
+        self._wins = (array('d', bytes(8 * ACTION_CODES)), array('d', bytes(8 * ACTION_CODES)))
+        self._visits = (array('d', bytes(8 * ACTION_CODES)), array('d', bytes(8 * ACTION_CODES)))
+        self._values = (array('d', [0.5]) * ACTION_CODES, array('d', [0.5]) * ACTION_CODES)
+        weight = exp(-0.5 / self._temperature)
+        self._weights = (array('d', [weight]) * ACTION_CODES, array('d', [weight]) * ACTION_CODES)
+
+    def update(self, codes: List[int], color: Color, result: Tuple[float, float]) -> None:
+        """Credits the actions of one simulated game with its result.
+
+        Args:
+            codes: the codes of the actions played, in order.
+            color: the player who played the first action; the players alternate after that.
+            result: the (Black, White) result of the game.
+        """
+        player = 0 if color == Color.BLACK else 1
+        for code in codes:
+            wins, visits = self._wins[player], self._visits[player]
+            wins[code] += result[player]
+            visits[code] += 1.0
+            self._set_value(player, code)
+            player = 1 - player
+
+    def decay(self, factor: float) -> None:
+        """Multiplies every statistic by factor (in [0.0, 1.0]), so that older results weigh less
+        than new ones."""
+        for player in (0, 1):
+            wins, visits = self._wins[player], self._visits[player]
+            for code in range(ACTION_CODES):
+                if visits[code]:
+                    wins[code] *= factor
+                    visits[code] *= factor
+                    self._set_value(player, code)
+
+    def _set_value(self, player: int, code: int) -> None:
+        """Recomputes the stored average and weight of an action from its statistics.
+
+        The average counts one extra half-won game, so actions seen once are not trusted fully.
+        Weights are scaled by exp(-1.0 / temperature), which leaves the Gibbs probabilities
+        unchanged and keeps small temperatures from overflowing.
+        """
+        value = (self._wins[player][code] + 0.5) / (self._visits[player][code] + 1.0)
+        self._values[player][code] = value
+        self._weights[player][code] = exp((value - 1.0) / self._temperature)
+
+    def get_value(self, color: Color, code: int) -> float:
+        """Returns the average result of an action for the player who plays it."""
+        return self._values[0 if color == Color.BLACK else 1][code]
+
+    def get_visits(self, color: Color, code: int) -> float:
+        """Returns the number of times the player played an action."""
+        return self._visits[0 if color == Color.BLACK else 1][code]
+
+    def choose(self, state: State, actions: List[Action],
+               codes: Optional[List[int]] = None) -> Action:
+        """Returns an action sampled by the table's policy (see game.simulate).
+
+        Args:
+            state: the position to play in.
+            actions: the position's actions, in the order returned by game.get_actions.
+            codes: the codes of the actions, in the same order.  Looked up with
+                game.get_action_codes if not given.
+        """
+        if codes is None:
+            codes = get_action_codes(state)
+        player = 0 if state.to_move == Color.BLACK else 1
+        if self._policy == 'epsilon':
+            if random.random() < self._epsilon:
+                return random.choice(actions)
+            scores = list(map(self._values[player].__getitem__, codes))
+            best = max(scores)
+            if scores.count(best) == 1:
+                return actions[scores.index(best)]
+            return actions[random.choice([index for index, score in enumerate(scores)
+                                          if score == best])]
+
+        cumulative = list(accumulate(map(self._weights[player].__getitem__, codes)))
+        return actions[bisect(cumulative, random.random() * cumulative[-1])]
+
+    @property
+    def policy(self):
+        """Property definition for _policy."""
+        return self._policy
+
+    @property
+    def epsilon(self):
+        """Property definition for _epsilon."""
+        return self._epsilon
+
+    @property
+    def temperature(self):
+        """Property definition for _temperature."""
+        return self._temperature
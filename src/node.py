@@ -4,9 +4,48 @@ A node represents a specific action taken in the game being simulated.  It store
 and attempts that pass through that action, and it uses that information to give itself a weight
 that signifies its attractiveness for exploration.
 
+The wins and visits of a node's children are kept in two contiguous arrays on the node, so that
+selecting a child is a single argmax over those arrays rather than a sort over the children.  The
+log of the node's visits is cached between selections, small visit counts are looked up in
+precomputed tables and, if NumPy is installed, nodes with many children are scored with a
+vectorized kernel.
+
+Whether a node's state is terminal is determined once, when the node is created.  A terminal node
+has no unexplored actions, and its parent remembers the first child that wins the game outright for
+the player to move (the decisive child).
+
+For the MCTS-Solver, every node also has a proven value: the exact (Black, White) result of the game
+under perfect play from that node, or None while it is unknown.  Terminal nodes are proven when they
+are created, and update_proof derives a node's value from its children with minimax rules.
+
+For RAVE, every node also keeps an all-moves-as-first (AMAF) table mapping action codes (see
+utils.encode_action) to the wins and visits of every simulation in which the player to move at the
+node played that action at any later point.  select_child blends these with the children's own
+statistics when given a RAVE equivalence parameter.
+
+With progressive widening, a node may only have k * visits**alpha children, so selection starts
+before every action has been expanded.  The unexplored actions are then expanded in the order given
+by utils.get_action_order instead of at random.
+
+With priors, every node computes a prior probability for each of its actions the first time they
+are needed (see evaluation.get_action_priors).  Unexplored actions are expanded in order of prior,
+and select_child_puct replaces UCT with the PUCT formula, which scales each child's exploration
+term by its prior.
+
+A node can also be given a loader: a function that adds the node's children from somewhere else
+the first time the search selects the node (see load and checkpoint.load_tree, which builds a saved
+tree this way rather than all at once).
+
+To bound the memory used by a search, a node's subtree can be pruned: its children are discarded
+and their actions returned to _unexplored, while the node keeps its own statistics.
+
+A node refers to its parent through a weak reference, so a tree holds no reference cycles: it is
+freed by reference counting as soon as its root is dropped, and the cyclic garbage collector never
+has to find it.  The parent property returns None once the parent has been freed.  Nodes can also
+be allocated from a NodeArena, a free list of released nodes that are reinitialized instead of
+allocating new objects; the children of a node share its arena.
+
 The Node class contains several methods:
-    calculate_uct: calculates the "exploration-attractiveness" of the node based on its wins and
-    visits.
     select_child: returns the child with the highest UCT weight
     add_child: adds a child node in the tree
     update_node: updates the wins and visits properties of the node given a result from a simulated
@@ -17,55 +56,230 @@ The Node class contains several methods:
 Adapted from: http://mcts.ai/code/python.html
 """
 
-from typing import Union, List, Tuple, Optional
+from array import array
+from math import sqrt, log
+from typing import Callable, Dict, Union, List, Tuple, Optional
 import random
+import weakref
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
 
 from .types import Action, State
 from .enums import Color
-from .game import get_actions, get_next_state, check_victory
-from .utils import get_action_string, calculate_uct
+from .game import get_actions, check_victory
+from .evaluation import get_action_priors
+from .utils import get_action_string, encode_action, get_action_order
+
+TABLE_SIZE = 4096
+INV_SQRT_TABLE = [0.0] + [1.0 / sqrt(visits) for visits in range(1, TABLE_SIZE)]
+LOG_TABLE = [0.0] + [log(visits) for visits in range(1, TABLE_SIZE)]
+# Below this many children the pure-Python loop is faster: NumPy's fixed call overhead only pays
+# off from about 96 children (measured with and without skip_proven).  On a 4x4 board few positions
+# have that many actions.
+NUMPY_MIN_CHILDREN = 96
+ARENA_CAPACITY = 1 << 18
 
 class Node:
     """Represents a node in a Monte-Carlo Tree Search."""
-    def __init__(self, action: Union[Action, None], state: State, parent, weight: float = 2.0):
-        """Initializes a node.  Gets a list of possible actions from this state."""
+    def __init__(self, action: Union[Action, None], state: State, parent, weight: float = 2.0,
+                 arena: Optional['NodeArena'] = None):
+        """Initializes a node.  Gets a list of possible actions from this state.
+
+        Args:
+            action: the action that leads to this node, or None at the root.
+            state: the node's state.
+            parent: the parent node, or None at the root.
+            weight: the exploration weight used by select_child.
+            arena: if given, the children of the node are allocated from this arena.
+        """
+        self._initialize(action, state, parent, weight, arena)
+
+    def _initialize(self, action: Union[Action, None], state: State, parent, weight: float,
+                    arena: Optional['NodeArena']) -> None:
+        """Sets every attribute of a new (or reused) node."""
         self._action = action
+        self._code = encode_action(action) if action is not None else None
         self._state = state
-        self._parent = parent
+        self._parent = weakref.ref(parent) if parent is not None else None
+        self._arena = arena
         self._children: List = []
-        self._visits: int = 0
-        self._wins: float = 0
+        self._child_wins = array('d')
+        self._child_visits = array('q')
+        self._stat_wins = array('d', [0.0])
+        self._stat_visits = array('q', [0])
+        self._child_proven = bytearray()
+        self._stat_proven = bytearray(1)
+        self._slot = 0
+        self._log_visits = 0
+        self._exploration = 0.0
         self._weight = weight
-        self._unexplored: List[Action] = get_actions(self._state)
+        self._terminal: Optional[Tuple[float, float]] = check_victory(self._state)
+        self._decisive = None
+        self._proven: Optional[Tuple[float, float]] = None
+        self._amaf: Dict[int, List[float]] = {}
+        self._priors: Optional[Dict[int, float]] = None
+        self._unexplored: List[Action] = get_actions(self._state) if self._terminal is None else []
+        self._ordered = False
+        self._last_visit = 0
+        self._loader: Optional[Callable] = None
+        if self._terminal is not None:
+            self.set_proven(self._terminal)
+
+    def get_exploration(self) -> float:
+        """Returns weight * sqrt(2 * log(visits)), recomputing it only when visits has changed."""
+        visits = self._stat_visits[self._slot]
+        if visits != self._log_visits:
+            log_visits = LOG_TABLE[visits] if visits < TABLE_SIZE else log(visits)
+            self._exploration = self._weight * sqrt(2 * log_visits)
+            self._log_visits = visits
+        return self._exploration
 
-    def select_child(self):
+    def select_child(self, skip_proven: bool = False, rave_equivalence: float = 0.0,
+                     puct_constant: float = 0.0):
         """Returns the child node with the highest UCT weight.
 
-        Uses the calculate_uct function on each Node in self._children.
+        The UCT weight is the same as calculate_uct's, computed over the contiguous child arrays.
+        Ties go to the child added last.
+
+        Args:
+            skip_proven: if True, children with a proven value are never selected.
+            rave_equivalence: if greater than 0, each child's win rate is blended with its AMAF
+                win rate (see select_child_rave).
+            puct_constant: if greater than 0, the PUCT formula is used instead of UCT (see
+                select_child_puct).  It takes precedence over rave_equivalence.
+        """
+        if puct_constant > 0.0:
+            return self.select_child_puct(puct_constant, skip_proven)
+        if rave_equivalence > 0.0:
+            return self.select_child_rave(rave_equivalence, skip_proven)
+
+        children = self._children
+        exploration = self.get_exploration()
+
+        if np is not None and len(children) >= NUMPY_MIN_CHILDREN:
+            return children[self._select_index_numpy(exploration, skip_proven)]
+
+        proven = self._child_proven
+        best_index, best_score = 0, float("-inf")
+        for index, (wins, visits) in enumerate(zip(self._child_wins, self._child_visits)):
+            if skip_proven and proven[index]:
+                continue
+            if visits == 0:
+                return children[index]
+            if visits < TABLE_SIZE:
+                inv_sqrt = INV_SQRT_TABLE[visits]
+            else:
+                inv_sqrt = 1.0 / sqrt(visits)
+            score = wins / visits + exploration * inv_sqrt
+            if score >= best_score:
+                best_index, best_score = index, score
+        return children[best_index]
+
+    def _select_index_numpy(self, exploration: float, skip_proven: bool) -> int:
+        """Returns the index of the child select_child would pick, using vectorized NumPy code.
+
+        Like the pure-Python loop, it returns the first selectable child with no visits if there
+        is one, otherwise the best scoring child (the last one on ties), and 0 if no child is
+        selectable.
+        """
+        wins = np.frombuffer(self._child_wins, dtype=np.float64)
+        visits = np.frombuffer(self._child_visits, dtype=np.int64)
+        unvisited = visits == 0
+        selectable = None
+        if skip_proven:
+            selectable = np.frombuffer(self._child_proven, dtype=np.uint8) == 0
+            if not selectable.any():
+                return 0
+            unvisited &= selectable
+        if unvisited.any():
+            return int(np.argmax(unvisited))
+
+        scores = (wins + exploration * np.sqrt(visits)) / np.maximum(visits, 1)
+        if selectable is not None:
+            scores[~selectable] = float("-inf")
+        return len(scores) - 1 - int(np.argmax(scores[::-1]))
+
+    def select_child_rave(self, rave_equivalence: float, skip_proven: bool = False):
+        """Returns the child node with the highest RAVE-blended UCT weight.
+
+        Each child's win rate is replaced by (1 - beta) * win rate + beta * AMAF win rate, where
+        beta = sqrt(k / (3 * visits + k)) and k is the equivalence parameter: the number of visits
+        at which the two estimates are weighted equally.
+
+        Args:
+            rave_equivalence: the RAVE equivalence parameter k.
+            skip_proven: if True, children with a proven value are never selected.
+        """
+        children = self._children
+        exploration = self.get_exploration()
+        proven = self._child_proven
+        amaf_table = self._amaf
+
+        best_index, best_score = 0, float("-inf")
+        for index, (wins, visits) in enumerate(zip(self._child_wins, self._child_visits)):
+            if skip_proven and proven[index]:
+                continue
+            if visits == 0:
+                return children[index]
+            value = wins / visits
+            amaf = amaf_table.get(children[index].code)
+            if amaf is not None:
+                beta = sqrt(rave_equivalence / (3 * visits + rave_equivalence))
+                value = (1.0 - beta) * value + beta * amaf[0] / amaf[1]
+            if visits < TABLE_SIZE:
+                inv_sqrt = INV_SQRT_TABLE[visits]
+            else:
+                inv_sqrt = 1.0 / sqrt(visits)
+            score = value + exploration * inv_sqrt
+            if score >= best_score:
+                best_index, best_score = index, score
+        return children[best_index]
+
+    def select_child_puct(self, puct_constant: float, skip_proven: bool = False):
+        """Returns the child node with the highest PUCT weight.
+
+        The PUCT weight of a child is wins / visits + c * prior * sqrt(parent visits) /
+        (1 + visits), so the exploration of each child is scaled by its prior rather than by the
+        log of the parent's visits.  Ties go to the child added last.
+
+        Args:
+            puct_constant: the constant c.
+            skip_proven: if True, children with a proven value are never selected.
         """
-        best_child = sorted(
-            self._children,
-            key=lambda child: calculate_uct(child.wins, child.visits, self._visits, self._weight)
-        )[-1]
-        return best_child
+        children = self._children
+        priors = self.get_priors()
+        scale = puct_constant * sqrt(self._stat_visits[self._slot])
+        proven = self._child_proven
+
+        best_index, best_score = 0, float("-inf")
+        for index, (wins, visits) in enumerate(zip(self._child_wins, self._child_visits)):
+            if skip_proven and proven[index]:
+                continue
+            value = wins / visits if visits else 0.0
+            score = value + scale * priors.get(children[index].code, 0.0) / (1 + visits)
+            if score >= best_score:
+                best_index, best_score = index, score
+        return children[best_index]
 
-    def select_child_decisive(self):
+    def select_child_decisive(self, skip_proven: bool = False, rave_equivalence: float = 0.0,
+                              puct_constant: float = 0.0):
         """Returns the child that leads to immediate victory or, if no such child exists, the child
         with the highest UCT1 value.
 
-        Uses the calculate_uct function on each Node in self._children.
+        The decisive child is found when it is added to the tree (see add_child).
+
+        Args:
+            skip_proven: if True, children with a proven value are never selected.
+            rave_equivalence: passed on to select_child.
+            puct_constant: passed on to select_child.
         """
-        for child in self._children:
-            decisive: Optional[Tuple] = check_victory(get_next_state(self._state, child.action))
-            if (decisive == (1.0, 0.0) and self._state.to_move == Color.BLACK or
-                    decisive == (0.0, 1.0) and self._state.to_move == Color.WHITE):
-                return child
+        if self._decisive is not None and not skip_proven:
+            return self._decisive
 
-        best_child = sorted(
-            self._children,
-            key=lambda child: calculate_uct(child.wins, child.visits, self._visits, self._weight)
-        )[-1]
-        return best_child
+        return self.select_child(skip_proven, rave_equivalence, puct_constant)
 
     def add_child(self, add_action: Action, add_state: State):
         """Creates and returns a new node taking an action from _unexplored.
@@ -76,11 +290,82 @@ class Node:
         Returns:
             The new node that is created and added to the list of children.
         """
-        new_node = Node(add_action, add_state, self, self._weight)
+        if self._arena is not None:
+            new_node = self._arena.allocate(add_action, add_state, self, self._weight)
+        else:
+            new_node = Node(add_action, add_state, self, self._weight)
         self._unexplored.remove(add_action)
+        new_node._stat_wins, new_node._stat_visits = self._child_wins, self._child_visits
+        new_node._stat_proven = self._child_proven
+        new_node._slot = len(self._children)
+        self._child_wins.append(0.0)
+        self._child_visits.append(0)
+        self._child_proven.append(int(new_node.proven is not None))
         self._children.append(new_node)
+
+        if self._decisive is None and (
+                new_node.terminal == (1.0, 0.0) and self._state.to_move == Color.BLACK or
+                new_node.terminal == (0.0, 1.0) and self._state.to_move == Color.WHITE):
+            self._decisive = new_node
         return new_node
 
+    def load(self) -> int:
+        """Runs the node's loader, once, to add its children.
+
+        Returns:
+            The number of children added.
+        """
+        loader, self._loader = self._loader, None
+        if loader is None:
+            return 0
+        count = len(self._children)
+        loader(self)
+        return len(self._children) - count
+
+    def prune(self) -> int:
+        """Discards every descendant of the node, returning their actions to _unexplored.
+
+        The node keeps its own wins, visits, AMAF table and proven value.  If the node has an arena,
+        the discarded nodes are released to it.
+
+        Returns:
+            The number of nodes that were discarded.
+        """
+        removed = self.count_descendants()
+        self._unexplored.extend(child.action for child in self._children)
+        if self._arena is not None:
+            for child in self._children:
+                self._arena.release(child)
+        self._children = []
+        self._child_wins = array('d')
+        self._child_visits = array('q')
+        self._child_proven = bytearray()
+        self._decisive = None
+        return removed
+
+    def detach(self):
+        """Makes the node the root of its own tree and returns it.
+
+        The node's statistics are moved out of its parent's arrays, so the rest of the old tree can
+        be discarded.
+        """
+        self._stat_wins = array('d', [self._stat_wins[self._slot]])
+        self._stat_visits = array('q', [self._stat_visits[self._slot]])
+        self._stat_proven = bytearray([self._stat_proven[self._slot]])
+        self._slot = 0
+        self._parent = None
+        return self
+
+    def count_descendants(self) -> int:
+        """Returns the number of nodes in the subtree below this node."""
+        count = 0
+        stack = list(self._children)
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(node.children)
+        return count
+
     def update_node(self, result: Tuple[float, float], simulations: int = 1) -> None:
         """Updates the _wins and _visits properties of the node.
 
@@ -89,16 +374,126 @@ class Node:
             game.
             simulations: an int indicating how many simulations are being updated.
         """
-        self._visits += simulations
+        self._stat_visits[self._slot] += simulations
         if self._state.to_move == Color.BLACK:
-            self._wins += result[0]
+            self._stat_wins[self._slot] += result[0]
         else:
-            self._wins += result[1]
+            self._stat_wins[self._slot] += result[1]
+
+    def update_amaf(self, codes: List[int], result: Tuple[float, float],
+                    simulations: int = 1) -> None:
+        """Updates the AMAF table with the actions played after this node in one simulation.
+
+        AMAF wins are counted the same way update_node counts them on the child that the action
+        leads to, so that they can be blended with that child's own statistics.
+
+        Args:
+            codes: the codes of the actions played from this node onward, starting with the action
+            taken at this node.  Only every other action (those of the player to move) is used, and
+            only its first occurrence counts.
+            result: the result of the simulation.
+            simulations: an int indicating how many simulations are being updated.
+        """
+        score = result[1] if self._state.to_move == Color.BLACK else result[0]
+        seen = set()
+        for code in codes[::2]:
+            if code in seen:
+                continue
+            seen.add(code)
+            stats = self._amaf.get(code)
+            if stats is None:
+                self._amaf[code] = [score, simulations]
+            else:
+                stats[0] += score
+                stats[1] += simulations
+
+    def set_proven(self, value: Tuple[float, float]) -> None:
+        """Marks the node as proven with the given (Black, White) result."""
+        self._proven = value
+        self._stat_proven[self._slot] = 1
+
+    def update_proof(self) -> bool:
+        """Derives the node's proven value from its children using minimax rules.
+
+        The node is a proven win for the player to move if any child is, and otherwise, once every
+        action has been expanded and every child is proven, it takes the best of its children's
+        values (a proven loss if every child is a proven loss).
+
+        Returns:
+            True if the node has just become proven, False otherwise.
+        """
+        if self._proven is not None:
+            return False
+
+        mover = 0 if self._state.to_move == Color.BLACK else 1
+        all_proven = not self._unexplored
+        best: Optional[Tuple[float, float]] = None
+        for child in self._children:
+            value = child.proven
+            if value is None:
+                all_proven = False
+            elif value[mover] == 1.0:
+                self.set_proven(value)
+                return True
+            elif best is None or value[mover] > best[mover]:
+                best = value
+
+        if all_proven and best is not None:
+            self.set_proven(best)
+            return True
+        return False
+
+    def is_expandable(self, widening_constant: Optional[float] = None,
+                      widening_exponent: float = 0.5, skip_proven: bool = False) -> bool:
+        """Returns True if an unexplored action should be expanded rather than a child selected.
+
+        Args:
+            widening_constant: if given, progressive widening is used: the node may only have
+            max(1, widening_constant * visits**widening_exponent) children.
+            widening_exponent: the exponent of the progressive widening schedule.
+            skip_proven: if True, a node whose children are all proven is always expandable.
+        """
+        if not self._unexplored:
+            return False
+        if widening_constant is None:
+            return True
+        if skip_proven and self._child_proven.count(0) == 0:
+            return True
+        limit = widening_constant * self._stat_visits[self._slot] ** widening_exponent
+        return len(self._children) < max(1.0, limit)
 
     def get_random_action(self) -> Action:
         """Returns a random member of _unexplored."""
         return random.choice(self._unexplored)
 
+    def get_ordered_action(self) -> Action:
+        """Returns the first member of _unexplored, ordered by get_action_order.
+
+        _unexplored is shuffled and sorted the first time this is called, so that actions of the
+        same kind are still expanded in random order.
+        """
+        if not self._ordered:
+            random.shuffle(self._unexplored)
+            self._unexplored.sort(key=get_action_order)
+            self._ordered = True
+        return self._unexplored[0]
+
+    def get_priors(self) -> Dict[int, float]:
+        """Returns the prior probability of each of the node's actions, keyed by action code.
+
+        The priors are computed the first time they are needed, over the node's children and
+        unexplored actions.
+        """
+        if self._priors is None:
+            actions = [child.action for child in self._children] + self._unexplored
+            self._priors = get_action_priors(self._state, actions)
+        return self._priors
+
+    def get_prior_action(self) -> Action:
+        """Returns the member of _unexplored with the highest prior."""
+        priors = self.get_priors()
+        return max(self._unexplored, key=lambda action: priors.get(encode_action(action), 0.0))
+
     def __repr__(self):
         if self._action is not None:
             action_str = get_action_string(self._action)
@@ -124,15 +519,76 @@ class Node:
             string += "| "
         return string
 
+    @property
+    def _wins(self) -> float:
+        """The node's wins, stored in its parent's child array (or its own array at the root)."""
+        return self._stat_wins[self._slot]
+
+    @_wins.setter
+    def _wins(self, wins: float) -> None:
+        self._stat_wins[self._slot] = wins
+
+    @property
+    def _visits(self) -> int:
+        """The node's visits, stored in its parent's child array (or its own array at the root)."""
+        return self._stat_visits[self._slot]
+
+    @_visits.setter
+    def _visits(self, visits: int) -> None:
+        self._stat_visits[self._slot] = visits
+
     @property
     def wins(self):
         """Property definition for _wins."""
-        return self._wins
+        return self._stat_wins[self._slot]
 
     @property
     def visits(self):
         """Property definition for _visits."""
-        return self._visits
+        return self._stat_visits[self._slot]
+
+    @property
+    def last_visit(self):
+        """Property definition for _last_visit."""
+        return self._last_visit
+
+    @last_visit.setter
+    def last_visit(self, last_visit: int) -> None:
+        self._last_visit = last_visit
+
+    @property
+    def loader(self):
+        """Property definition for _loader."""
+        return self._loader
+
+    @loader.setter
+    def loader(self, loader: Optional[Callable]) -> None:
+        self._loader = loader
+
+    @property
+    def code(self):
+        """Property definition for _code."""
+        return self._code
+
+    @property
+    def amaf(self):
+        """Property definition for _amaf."""
+        return self._amaf
+
+    @property
+    def terminal(self):
+        """Property definition for _terminal."""
+        return self._terminal
+
+    @property
+    def decisive(self):
+        """Property definition for _decisive."""
+        return self._decisive
+
+    @property
+    def proven(self):
+        """Property definition for _proven."""
+        return self._proven
 
     @property
     def unexplored(self):
@@ -151,10 +607,88 @@ class Node:
 
     @property
     def parent(self):
-        """Property definition for _parent."""
-        return self._parent
+        """The node's parent, or None at the root or once the parent has been freed."""
+        return self._parent() if self._parent is not None else None
+
+    @property
+    def arena(self):
+        """Property definition for _arena."""
+        return self._arena
 
     @property
     def action(self):
         """Property definition for _action."""
         return self._action
+
+class NodeArena:
+    """A free list of released nodes, reinitialized by allocate instead of creating new objects.
+
+    Releasing a subtree costs one pass over its nodes, but the nodes are kept rather than freed,
+    so a search that discards and regrows parts of its tree (see search.evict_nodes), or a
+    sequence of searches sharing the arena, allocates few new objects.  A released node must not
+    be used again: its attributes are cleared, and it is handed out by the next allocation.
+    """
+    def __init__(self, capacity: int = ARENA_CAPACITY):
+        """Initializes an empty arena.
+
+        Args:
+            capacity: the most nodes kept on the free list.  Nodes released beyond it are freed.
+        """
+        self._free: List[Node] = []
+        self._capacity = capacity
+        self._allocated = 0
+        self._reused = 0
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def allocate(self, action: Union[Action, None], state: State, parent,
+                 weight: float = 2.0) -> Node:
+        """Returns a node initialized like Node(action, state, parent, weight, self)."""
+        self._allocated += 1
+        if not self._free:
+            return Node(action, state, parent, weight, self)
+        self._reused += 1
+        node = self._free.pop()
+        node._initialize(action, state, parent, weight, self)  # pylint: disable=protected-access
+        return node
+
+    def release(self, node: Node) -> int:
+        """Returns a node and its descendants to the free list, clearing their attributes.
+
+        Returns:
+            The number of nodes kept on the free list.
+        """
+        kept = 0
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            stack.extend(node.children)
+            # pylint: disable=protected-access
+            node._children = []
+            node._state = node._parent = node._decisive = node._arena = None
+            node._unexplored = node._amaf = node._priors = node._loader = None
+            node._stat_wins = node._stat_visits = node._stat_proven = None
+            if len(self._free) < self._capacity:
+                self._free.append(node)
+                kept += 1
+        return kept
+
+    def clear(self) -> None:
+        """Frees every node on the free list."""
+        self._free = []
+
+    @property
+    def capacity(self):
+        """Property definition for _capacity."""
+        return self._capacity
+
+    @property
+    def allocated(self):
+        """Property definition for _allocated."""
+        return self._allocated
+
+    @property
+    def reused(self):
+        """Property definition for _reused."""
+        return self._reused
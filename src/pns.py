@@ -0,0 +1,176 @@
+"""Proof-number search for forced road wins.
+
+prove_road answers one question about a position: can the player to move (the attacker) force a
+road within a given number of plies, whatever the opponent does?  Forced roads are common on a 4x4
+board, and proof-number search finds them with far less work than sampling, because it always
+expands the position that most cheaply settles the question.
+
+The search tree is an AND/OR tree: at the attacker's positions one action must lead to a road (OR),
+at the opponent's positions every action must (AND).  Each node keeps a proof number (the fewest
+positions that would have to be proven to prove it) and a disproof number, and the search expands
+the most proving node until the root is proven, disproven, or the node budget is used up.
+
+A position is proven when the attacker has completed a road (see utils.get_path and
+game.check_victory, whose rules decide double roads and whether the game ended first), and
+disproven when the game ends any other way or no plies are left.  Positions that are settled are
+kept in a transposition table keyed by position, remaining plies and attacker, which RoadProver
+keeps between calls; a search keeps one RoadProver for all of its proof-number searches (see
+search.SearchStats).
+
+search.SearchOptions can run prove_road on the root and, with the solver, on every node of the tree
+that reaches a number of visits (see the pns options).
+"""
+from typing import List, NamedTuple, Optional, Tuple
+
+from .enums import Color
+from .game import get_actions, get_next_state, check_victory
+from .types import State, Action
+from .utils import get_path, get_state_key, get_action_order, TranspositionTable,\
+    TABLE_CAPACITY
+
+INFINITY = float("inf")
+
+class ProofResult(NamedTuple):
+    """Defines the result of a proof-number search.
+
+    Attributes:
+        proven: True if the attacker can force a road, False if it cannot, or None if the node
+            budget ran out first.
+        action: an action that forces the road if proven, otherwise None.
+        nodes: the number of positions created by the search.
+    """
+    proven: Optional[bool]
+    action: Optional[Action]
+    nodes: int
+
+class ProofNode:
+    """A position in the proof-number search tree."""
+    __slots__ = ('state', 'action', 'parent', 'children', 'plies', 'attacking', 'proof',
+                 'disproof')
+
+    def __init__(self, state: State, action: Optional[Action], parent, plies: int,
+                 attacking: bool):
+        """Initializes an unexpanded node with proof and disproof numbers of 1."""
+        self.state = state
+        self.action = action
+        self.parent = parent
+        self.children: List[ProofNode] = []
+        self.plies = plies
+        self.attacking = attacking
+        self.proof = 1.0
+        self.disproof = 1.0
+
+    def set_value(self, proven: bool) -> None:
+        """Marks the node as proven or disproven."""
+        self.proof, self.disproof = (0.0, INFINITY) if proven else (INFINITY, 0.0)
+
+    def update(self) -> None:
+        """Recomputes the node's numbers from its children."""
+        if self.attacking:
+            self.proof = min(child.proof for child in self.children)
+            self.disproof = sum(child.disproof for child in self.children)
+        else:
+            self.proof = sum(child.proof for child in self.children)
+            self.disproof = min(child.disproof for child in self.children)
+
+class RoadProver:
+    """Runs proof-number searches that share a transposition table."""
+    def __init__(self, capacity: int = TABLE_CAPACITY):
+        """Initializes a prover with an empty transposition table.
+
+        Args:
+            capacity: the most positions the table holds (see utils.TranspositionTable).
+        """
+        self._table = TranspositionTable(capacity)
+        self._attacker = 0
+        self._nodes = 0
+
+    def prove(self, state: State, plies: int = 3, max_nodes: int = 10000) -> ProofResult:
+        """Searches for a road the player to move can force within plies actions.
+
+        Args:
+            state: the position to search.
+            plies: the most actions, counting both players', the road may take.
+            max_nodes: the most positions the search may create.
+        """
+        self._attacker = 0 if state.to_move == Color.BLACK else 1
+        self._nodes = 0
+        root = ProofNode(state, None, None, plies, True)
+        self._evaluate(root)
+
+        while root.proof != 0.0 and root.disproof != 0.0 and self._nodes < max_nodes:
+            node = root
+            while node.children:
+                if node.attacking:
+                    node = min(node.children, key=lambda child: child.proof)
+                else:
+                    node = min(node.children, key=lambda child: child.disproof)
+            self._expand(node)
+            while node is not None:
+                if node.children:
+                    node.update()
+                    if node.proof == 0.0 or node.disproof == 0.0:
+                        self._store(node)
+                node = node.parent
+
+        if root.proof == 0.0:
+            action = next((child.action for child in root.children if child.proof == 0.0), None)
+            return ProofResult(proven=True, action=action, nodes=self._nodes)
+        if root.disproof == 0.0:
+            return ProofResult(proven=False, action=None, nodes=self._nodes)
+        return ProofResult(proven=None, action=None, nodes=self._nodes)
+
+    def _evaluate(self, node: ProofNode) -> None:
+        """Settles the node if its game is over, it has no plies left, or it is in the table."""
+        result = check_victory(node.state)
+        if result is not None:
+            node.set_value(result[self._attacker] == 1.0 and get_path(node.state)[self._attacker])
+            return
+        if node.plies == 0:
+            node.set_value(False)
+            return
+        known = self._table.get(self._get_key(node))
+        if known is not None:
+            node.set_value(known)
+
+    def _expand(self, node: ProofNode) -> None:
+        """Creates the node's children, stopping early once one of them settles the node.
+
+        The attacker's flat placements, which complete most roads, are tried first.
+        """
+        actions = get_actions(node.state)
+        if node.attacking:
+            actions.sort(key=get_action_order)
+        for action in actions:
+            child = ProofNode(get_next_state(node.state, action), action, node, node.plies - 1,
+                              not node.attacking)
+            self._nodes += 1
+            self._evaluate(child)
+            node.children.append(child)
+            if node.attacking and child.proof == 0.0 or\
+                    not node.attacking and child.disproof == 0.0:
+                break
+
+    def _get_key(self, node: ProofNode) -> Tuple:
+        """Returns the table key of a node: its position, its plies left and the attacker.
+
+        The same position is a different question when the other player is the attacker, so the
+        attacker is part of the key.
+        """
+        return (get_state_key(node.state), node.plies, self._attacker)
+
+    def _store(self, node: ProofNode) -> None:
+        """Records a settled node in the transposition table and frees its subtree."""
+        self._table.put(self._get_key(node), node.proof == 0.0)
+        if node.parent is not None:
+            node.children = []
+
+def prove_road(state: State, plies: int = 3, max_nodes: int = 10000) -> ProofResult:
+    """Returns whether the player to move can force a road within plies actions.
+
+    Args:
+        state: the position to search.
+        plies: the most actions, counting both players', the road may take.
+        max_nodes: the most positions the search may create.
+    """
+    return RoadProver().prove(state, plies, max_nodes)
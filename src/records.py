@@ -0,0 +1,91 @@
+"""A base class for the binary files the engine maps with mmap: the opening book, the endgame
+tablebase and search tree checkpoints.
+
+Each of these files holds a header followed by an array of fixed-size records:
+    header: a four-byte magic string, a format version, then fields of the file's own
+    records: packed with one struct each, so record i is found by its offset alone
+A subclass names its magic, version, header and record structs and the kind of file it reads, and
+reads the rest of its header in _read_header.  RecordFile maps the file, checks the magic and the
+version, and reads records by index, or by key with a binary search when the records are sorted by
+their first field (see find_record).  Reading a record touches only the pages it lies on, so a large
+file costs little memory and is shared between processes through the page cache.
+"""
+import mmap
+import struct
+from typing import Optional, Tuple
+
+class RecordFile:
+    """A file of a header and fixed-size records, opened with mmap."""
+    MAGIC = b''
+    VERSION = 0
+    HEADER = struct.Struct('<4sH')
+    RECORD = struct.Struct('<Q')
+    KIND = 'record'
+
+    def __init__(self, path: str):
+        """Opens and maps the file.
+
+        Raises:
+            ValueError: the file is not a file of this kind and version.
+        """
+        self._path = path
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        fields = self.HEADER.unpack_from(self._map)
+        if fields[0] != self.MAGIC or fields[1] != self.VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {self.VERSION} {self.KIND} file")
+        self._offset = self.HEADER.size
+        self._count = self._read_header(fields[2:])
+
+    def _read_header(self, fields: Tuple) -> int:
+        """Reads the header fields after the version and returns the number of records.
+
+        The default takes the number of records from the last field.  Subclasses whose header is
+        followed by more data than the records move self._offset past it.
+        """
+        return fields[-1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def read_record(self, index: int) -> Tuple:
+        """Returns the unpacked fields of the record at index."""
+        return self.RECORD.unpack_from(self._map, self._offset + index * self.RECORD.size)
+
+    def find_record(self, key: int) -> Optional[Tuple]:
+        """Returns the fields of the record whose first field is key, or None if there is none.
+
+        The records must be sorted by their first field.
+        """
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            record = self.read_record(middle)
+            if record[0] == key:
+                return record
+            if record[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        self._map.close()
+
+    @property
+    def closed(self) -> bool:
+        """Returns True once the file has been unmapped."""
+        return self._map.closed
+
+    @property
+    def path(self):
+        """Property definition for _path."""
+        return self._path
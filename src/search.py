@@ -1,193 +1,979 @@
 """Functions for Monte-Carlo Tree Searches.
-This module contains four version of MCTS:
+This module contains six versions of MCTS:
     - Default (using UCB1)
     - Decisive Move (changes the select_child method to check for victory)
     - Weighted Backpropagation (weights deeper nodes more heavily)
     - Multiple Leaf Simulation (simulates leaf nodes more than one time)
+    - RAVE (blends all-moves-as-first statistics from the simulations with UCT)
+    - PUCT (expands and selects actions guided by heuristic priors)
+
+Each version is a thin wrapper around search, which runs the iterations for any combination of the
+enhancements and returns a SearchResult.  Every search can be bounded by an iteration count, a time
+limit, an absolute deadline, or any combination of the three; the search stops at whichever comes
+first.  A search can also stop early once no other root child can overtake the most visited one
+(early_stop), or once that is very unlikely (confidence).  Given a max_deadline as well, a search
+that reaches its deadline keeps going until max_deadline while the root is unstable, that is while
+the runner-up has more than STABLE_RATIO of the most visited child's visits (see get_instability and
+clock.py, which computes both deadlines from a game clock).
+
+With the solver enhancement (MCTS-Solver), terminal results found in the tree are propagated upward as
+proven wins and losses (see Node.update_proof).  Proven subtrees are no longer selected, and the
+search returns as soon as the value of the root is proven.
+
+With the RAVE enhancement, the actions of every simulation are credited to the all-moves-as-first
+tables of the nodes on the path (see Node.update_amaf), and selection blends those statistics with
+UCT (see Node.select_child_rave).  With a MAST table (see mast.py), the actions of every iteration
+update the table's global per-action statistics, and rollouts sample their actions from it.
+
+With progressive widening, a node may only have widening_constant * visits**widening_exponent
+children, so wide nodes do not spend the whole budget expanding every action.
+
+Simulations can be truncated after rollout_plies actions, in which case the position reached is
+scored with a static evaluation.  Every search reports a histogram of its simulation lengths, which
+can be used to tune the cap.
+
+Given an endgame tablebase (see tablebase.py), leaves and rollouts that reach a stored position use
+its exact result instead of playing the game out.  With alphabeta, late-game positions are first
+searched exactly with alpha-beta (see alphabeta.py), and MCTS only runs if that search cannot find
+the exact result within its depth.
+With pns, the root is first searched for a forced road with proof-number search (see pns.py) and,
+with the solver, so is every node that becomes promising by reaching pns_visits visits.
+
+async_search runs a search as an asyncio coroutine in slices of iterations, yielding to the event
+loop between slices, so that many searches and network I/O can share one thread.
+
+The memory used by a search can be bounded by a number of nodes (max_nodes) or an estimated number
+of bytes (max_bytes).  Whenever the tree grows past the ceiling, the least visited (or least recently
+visited) subtrees are pruned until the tree is back under 90% of the ceiling.
+
+Search trees hold no reference cycles (see Node), so CPython's cyclic garbage collector only adds
+pauses while a search allocates nodes.  With gc_mode, the collector is paused ('pause') or the tree
+is moved out of its reach with gc.freeze ('freeze') while iterations run.  With an arena (see
+NodeArena), nodes are allocated from a free list and the tree of search and async_search is
+released to it when the search returns, so that the next search reuses its nodes.
+
+The Multiple Leaf Simulation search can optionally run its leaf simulations on a persistent pool of
+worker processes (leaf parallelism).  The tree itself is only ever touched by the main process.
 """
-import random
-from copy import deepcopy
-
-from .node import Node
+import asyncio
+import atexit
+import gc
+import sys
+import time
+from collections import Counter
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from functools import partial
+from math import sqrt
+from multiprocessing import Pool
+from statistics import NormalDist
+from threading import Event, Lock
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .node import Node, NodeArena
+from .pns import RoadProver
 from .types import State, Action
-from .game import get_next_state, check_victory, get_actions
+from .enums import Color
+from .alphabeta import alphabeta_search, is_late_game
+from .game import get_next_state, check_victory, simulate
+from .mast import MastTable
+from .tablebase import Tablebase
+from .utils import encode_action
+
+_WORKER_POOLS: Dict[int, Pool] = {}
+GC_MODES = ('pause', 'freeze')
+FREEZE_INTERVAL = 256
+STABLE_RATIO = 0.5
+_GC_LOCK = Lock()
+_GC_USERS: Dict[str, int] = {'pause': 0, 'freeze': 0}
+_GC_ENABLED = [True]
+
+def get_worker_pool(workers: int) -> Pool:
+    """Returns a persistent pool of worker processes, creating it on first use.
+
+    Pools are kept for the lifetime of the interpreter so that repeated searches do not pay the
+    process start-up cost.  They are closed by close_worker_pools (registered with atexit).
 
-def default_mcts(root: State, iterations: int, weight_factor: float = 2.0) -> Action:
-    """Returns the most visited action from a MCTS with the given number of iterations.
+    Args:
+        workers: the number of worker processes in the pool.
+    """
+    if workers < 1:
+        raise ValueError(f"workers cannot be < 1: {workers}")
+
+    pool = _WORKER_POOLS.get(workers)
+    if pool is None:
+        pool = Pool(workers)
+        _WORKER_POOLS[workers] = pool
+    return pool
+
+def close_worker_pools() -> None:
+    """Closes every worker pool created by get_worker_pool."""
+    for pool in _WORKER_POOLS.values():
+        pool.close()
+        pool.join()
+    _WORKER_POOLS.clear()
+
+atexit.register(close_worker_pools)
+
+def simulate_leaf(state: State, simulations: int, max_plies: Optional[int] = None,
+                  lengths: Optional[Counter] = None,
+                  tablebase: Optional[Tablebase] = None) -> Tuple[float, float]:
+    """Returns the summed result of several random simulations from the same state.
 
     Args:
-        root: a State NamedTuple that represents the current game state from which to simulate.
-        iterations: the number of iterations to run before selecting an action.
+        state: the State from which to simulate.
+        simulations: the number of simulations to run.
+        max_plies: if given, each simulation is truncated after this many actions.
+        lengths: if given, the length of each simulation is counted in this histogram.
+        tablebase: if given, each simulation stops at the first position found in it.
     """
-    root_node: Node = Node(action=None, state=root, parent=None, weight=weight_factor)
+    black, white = 0.0, 0.0
+    for _ in range(simulations):
+        result = simulate(state, max_plies=max_plies, lengths=lengths, probe=tablebase)
+        black, white = black + result[0], white + result[1]
+    return (black, white)
 
-    for _ in range(iterations):
-        current_node: Node = root_node
-        state = deepcopy(root_node.state)
+def simulate_leaf_worker(state: State, simulations: int, max_plies: Optional[int] = None,
+                         tablebase: Optional[Tablebase] = None)\
+    -> Tuple[Tuple[float, float], Counter]:
+    """Returns the summed result of several simulations along with their length histogram.
 
-        # Select
-        while not current_node.unexplored and current_node.children:  # fully expanded, non-terminal
-            current_node = current_node.select_child()
-            state = get_next_state(state, current_node.action)
+    This is the unit of work sent to the worker processes, so it must stay a module-level function.
 
-        # Expand
-        if current_node.unexplored:
-            action = current_node.get_random_action()
-            state = get_next_state(state, action)
-            current_node = current_node.add_child(action, state)
-
-        # Simulate
-        while check_victory(state) is None:
-            state = get_next_state(state, random.choice(get_actions(state)))
-
-        # typing workaround, currently no good way to unwrap an optional type
-        if check_victory(state) == (1.0, 0.0):
-            result = (1.0, 0.0)
-        elif check_victory(state) == (0.0, 1.0):
-            result = (0.0, 1.0)
-        else:
-            result = (0.5, 0.5)
+    Args:
+        state: the State from which to simulate.
+        simulations: the number of simulations to run.
+        max_plies: if given, each simulation is truncated after this many actions.
+        tablebase: if given, each simulation stops at the first position found in it.
+    """
+    lengths: Counter = Counter()
+    return (simulate_leaf(state, simulations, max_plies, lengths, tablebase), lengths)
+
+def simulate_leaf_parallel(state: State, simulations: int, workers: int,
+                           max_plies: Optional[int] = None, lengths: Optional[Counter] = None,
+                           tablebase: Optional[Tablebase] = None)\
+    -> Tuple[float, float]:
+    """Splits the simulations of a leaf across the worker pool and returns the summed result.
 
-        # Backpropagate
-        while current_node is not None:
-            current_node.update_node(result)
-            current_node = current_node.parent
+    Args:
+        state: the State from which to simulate.
+        simulations: the total number of simulations to run.
+        workers: the number of worker processes to use.
+        max_plies: if given, each simulation is truncated after this many actions.
+        lengths: if given, the length of each simulation is counted in this histogram.
+        tablebase: if given, each simulation stops at the first position found in it.  Each
+            worker process maps the tablebase file itself.
+    """
+    pool = get_worker_pool(workers)
+    chunks: List[Tuple[State, int, Optional[int], Optional[Tablebase]]] = [
+        (state, simulations // workers + (1 if worker < simulations % workers else 0), max_plies,
+         tablebase)
+        for worker in range(min(workers, simulations))
+    ]
+    black, white = 0.0, 0.0
+    for result, worker_lengths in pool.starmap(simulate_leaf_worker, chunks):
+        black, white = black + result[0], white + result[1]
+        if lengths is not None:
+            lengths.update(worker_lengths)
+    return (black, white)
+
+class SearchOptions(NamedTuple):
+    """Defines the enhancements used by a search.
+
+    Attributes:
+        weight_factor: the exploration weight used by calculate_uct.
+        decisive: if True, selection always takes a child that wins immediately.
+        weighted: if True, results are weighted by 2**(depth-1) during backpropagation.
+        leaf_simulations: the number of simulations to run from each new leaf.
+        workers: if greater than 0, leaf simulations run on a persistent pool of this many worker
+            processes.
+        early_stop: if True, the search stops as soon as no other root child can overtake the
+            most visited one within the remaining iterations.
+        confidence: if given (in the range (0.0, 1.0)), the search stops as soon as the runner-up
+            overtaking the most visited child is less likely than 1 - confidence, assuming it keeps
+            receiving its current share of the visits.  This rule only applies once every root
+            action has been expanded.  Implies early_stop.
+        solver: if True, proven wins and losses are propagated up the tree, proven subtrees are
+            skipped during selection and the search stops once the root is proven.
+        rave: if True, AMAF statistics are recorded and blended with UCT during selection.  The
+            simulations always run in this process, since every rollout's actions are needed.
+        rave_equivalence: the number of visits at which a child's own win rate and its AMAF win
+            rate are weighted equally.
+        widening: if True, progressive widening limits the number of children of each node and
+            unexplored actions are expanded in order (see Node.get_ordered_action).
+        widening_constant: the constant k in the widening schedule k * visits**alpha.
+        widening_exponent: the exponent alpha in the widening schedule k * visits**alpha.
+        rollout_plies: if given, every simulation is truncated after this many actions and its
+            last state is scored by evaluation.evaluate_state.
+        max_nodes: if given, the maximum number of nodes kept in the tree.
+        max_bytes: if given, the maximum estimated number of bytes used by the tree's nodes.
+        eviction: which subtrees are pruned first when the tree is too large: 'visits' (the least
+            visited) or 'recent' (the least recently visited).
+        tablebase: if given, an endgame tablebase (see tablebase.py).  New leaves found in it take
+            its exact result instead of a rollout (and are proven, with the solver), and rollouts
+            stop at the first position found in it.
+        alphabeta: if True, late-game positions (see alphabeta.is_late_game) are first searched
+            with alpha-beta, and its action is played without MCTS if it finds the exact result.
+        alphabeta_depth: the greatest depth of the alpha-beta search.
+        alphabeta_empty: a position with no more than this many empty squares is late-game.
+        alphabeta_stones: a position where either player has no more than this many stones left
+            is late-game.
+        pns: if True, the root is first searched for a forced road (see pns.py), and its action
+            is played without MCTS if one is found.  With the solver, every node that reaches
+            pns_visits visits is searched too, and proven a win if a forced road is found.
+        pns_plies: the most plies a forced road may take.
+        pns_nodes: the most positions each proof-number search may create.
+        pns_visits: the visits at which a node of the tree is searched for a forced road.
+        priors: if True, unexplored actions are expanded in order of their heuristic prior (see
+            evaluation.get_action_priors), and selection uses PUCT instead of UCT (see
+            Node.select_child_puct).
+        puct_constant: the exploration constant of PUCT.
+        mast: if given, a MAST table (see mast.py) that is updated with the actions and result of
+            every iteration and chooses the actions of the rollouts.  As with rave, the
+            simulations always run in this process.
+        arena: if given, a NodeArena from which the nodes of the trees created by search and
+            async_search are allocated, and to which those trees are released when they return.
+        gc_mode: if given, how the cyclic garbage collector is kept from scanning the tree while
+            iterations run: 'pause' disables it, 'freeze' moves every object to its permanent
+            generation (gc.freeze) every FREEZE_INTERVAL iterations.  Either affects the whole
+            process until the last search using it returns.
+    """
+    weight_factor: float = 2.0
+    decisive: bool = False
+    weighted: bool = False
+    leaf_simulations: int = 1
+    workers: int = 0
+    early_stop: bool = False
+    confidence: Optional[float] = None
+    solver: bool = False
+    rave: bool = False
+    rave_equivalence: float = 300.0
+    widening: bool = False
+    widening_constant: float = 2.0
+    widening_exponent: float = 0.5
+    rollout_plies: Optional[int] = None
+    max_nodes: Optional[int] = None
+    max_bytes: Optional[int] = None
+    eviction: str = 'visits'
+    tablebase: Optional[Tablebase] = None
+    alphabeta: bool = False
+    alphabeta_depth: int = 4
+    alphabeta_empty: int = 1
+    alphabeta_stones: int = 1
+    pns: bool = False
+    pns_plies: int = 3
+    pns_nodes: int = 2000
+    pns_visits: int = 32
+    priors: bool = False
+    puct_constant: float = 1.5
+    mast: Optional[MastTable] = None
+    arena: Optional[NodeArena] = None
+    gc_mode: Optional[str] = None
+
+class SearchResult(NamedTuple):
+    """Defines the result of a search.
+
+    Attributes:
+        action: the most visited action at the root.
+        iterations: the number of iterations (simulations) that were completed.
+        saved: the number of iterations left unused because the search stopped early.  When the
+            search is bounded only by time, this is an estimate based on the iteration rate.
+        proven: the exact (Black, White) result of the game from the root if the solver proved
+            it, otherwise None.
+        rollout_lengths: a histogram of the number of actions played by each simulation.
+        evictions: the number of nodes that were pruned to keep the tree under its memory ceiling.
+    """
+    action: Action
+    iterations: int
+    saved: int = 0
+    proven: Optional[Tuple[float, float]] = None
+    rollout_lengths: Optional[Counter] = None
+    evictions: int = 0
+
+class SearchStats:
+    """Defines the counters that are updated while a search runs.
+
+    Attributes:
+        rollout_lengths: a histogram of the number of actions played by each simulation.
+        nodes: the number of nodes in the tree.
+        evictions: the number of nodes that have been pruned from the tree.
+        ticks: the number of iterations run so far, used to timestamp node visits.
+        prover: the RoadProver of the search's proof-number searches (with pns), so that they
+            share one transposition table.
+    """
+    def __init__(self, nodes: int = 1):
+        """Initializes the counters for a tree of the given size."""
+        self.rollout_lengths: Counter = Counter()
+        self.nodes = nodes
+        self.evictions = 0
+        self.ticks = 0
+        self.prover = RoadProver()
+
+def get_deadline(time_limit: Optional[float] = None, deadline: Optional[float] = None)\
+    -> Optional[float]:
+    """Returns the earlier of the two ways of bounding a search by time.
 
-    return sorted(root_node.children, key=lambda x: x.visits)[-1].action
+    Args:
+        time_limit: a number of seconds, measured from now.
+        deadline: an absolute time, as returned by time.monotonic().
 
-def decisive_move_mcts(root: State, iterations: int) -> Action:
-    """Returns the most visited action from a MCTS with the given number of iterations.
+    Returns:
+        A time.monotonic() value, or None if neither argument is given.
+    """
+    if time_limit is not None:
+        limit_deadline = time.monotonic() + time_limit
+        if deadline is None or limit_deadline < deadline:
+            return limit_deadline
+    return deadline
 
-    This function differs from default_mcts in that for each select step, it checks if a child is
-    a decisive move (a move that leads immediately to victory).  If a child is decisive, it is
-    returned, otherwise MCTS proceeds as normal.
+def get_best_action(root_node: Node, solver: bool = False) -> Action:
+    """Returns the action of the most visited child of root_node.
 
     Args:
-        root: a State NamedTuple that represents the starting state
-        iterations: an int denoting the number of iterations to run the search.
+        root_node: the root of the searched tree.
+        solver: if True and the root is proven, the child that achieves the proven value is
+            returned instead, and children that are proven losses for the player to move are only
+            returned as a last resort.
     """
-    root_node: Node = Node(action=None, state=root, parent=None)
+    if not solver:
+        return sorted(root_node.children, key=lambda x: x.visits)[-1].action
 
-    for _ in range(iterations):
-        current_node: Node = root_node
-        state: State = deepcopy(root_node.state)
+    if root_node.proven is not None:
+        for child in root_node.children:
+            if child.proven == root_node.proven:
+                return child.action
 
-        # Select
-        while not current_node.unexplored and current_node.children:
-            current_node = current_node.select_child_decisive()
-            state = get_next_state(state, current_node.action)
+    mover = 0 if root_node.state.to_move == Color.BLACK else 1
+    candidates = [
+        child for child in root_node.children
+        if child.proven is None or child.proven[mover] > 0.0
+    ]
+    return sorted(candidates or root_node.children, key=lambda x: x.visits)[-1].action
 
-        # Expand
-        if current_node.unexplored:
-            action = current_node.get_random_action()
-            state = get_next_state(state, action)
-            current_node = current_node.add_child(action, state)
-
-        # Simulate
-        while check_victory(state) is None:
-            state = get_next_state(state, random.choice(get_actions(state)))
-
-        # typing workaround, currently no good way to unwrap an optional type
-        if check_victory(state) == (1.0, 0.0):
-            result = (1.0, 0.0)
-        elif check_victory(state) == (0.0, 1.0):
-            result = (0.0, 1.0)
-        else:
-            result = (0.5, 0.5)
+def can_stop_early(root_node: Node, remaining: int, confidence: Optional[float] = None) -> bool:
+    """Returns True if the most visited root child cannot lose its place in the remaining visits.
 
-        # backpropagate
-        while current_node is not None:
-            current_node.update_node(result)
-            current_node = current_node.parent
+    Args:
+        root_node: the root of the tree being searched.
+        remaining: the number of visits left in the search budget.
+        confidence: if given, the runner-up is only expected to receive its current share of the
+            remaining visits, plus a margin of error for this confidence level.
+    """
+    if not root_node.children:
+        return False
 
-    return sorted(root_node.children, key=lambda x: x.visits)[-1].action
+    leader, runner_up = 0.0, 0.0
+    for child in root_node.children:
+        if child.visits > leader:
+            leader, runner_up = child.visits, leader
+        elif child.visits > runner_up:
+            runner_up = child.visits
 
+    if confidence is None:
+        return runner_up + remaining < leader
 
-def weighted_backpropagation_mcts(root: State, iterations: int) -> Action:
-    """Returns the most visited action in a MCTS with the weighted backpropagation enhancement.
+    if root_node.unexplored:
+        return False
+
+    share = (runner_up + 1.0) / (root_node.visits + 1.0)
+    expected = remaining * share
+    margin = NormalDist().inv_cdf(confidence) * sqrt(remaining * share * (1.0 - share))
+    return runner_up + expected + margin < leader
+
+def get_instability(root_node: Node) -> float:
+    """Returns the runner-up's visits as a fraction of the most visited root child's visits.
+
+    The result is in [0.0, 1.0]: close to 1.0 the choice of action is still open, close to 0.0 it
+    is settled.  It is 1.0 until two children have been visited, unless the root has a single
+    action, in which case it is 0.0.
+    """
+    leader, runner_up = 0, 0
+    for child in root_node.children:
+        if child.visits > leader:
+            leader, runner_up = child.visits, leader
+        elif child.visits > runner_up:
+            runner_up = child.visits
+    if runner_up == 0:
+        return 0.0 if len(root_node.children) + len(root_node.unexplored) <= 1 else 1.0
+    return runner_up / leader
+
+def update_amaf(path: List[Node], rollout_codes: List[int], result: Tuple[float, float],
+                simulations: int = 1) -> None:
+    """Credits the actions of one simulation to the AMAF tables of the nodes on the path.
 
     Args:
-        root: the state from which to search.
-        iterations: the number of iterations to run before returning.
+        path: the nodes visited in the tree during this iteration, starting with the root.
+        rollout_codes: the codes of the actions played by the rollout after the last node.
+        result: the result of the simulation.
+        simulations: an int indicating how many simulations are being updated.
     """
-    root_node: Node = Node(action=None, state=root, parent=None)
+    codes = [node.code for node in path[1:]] + rollout_codes
+    for index, node in enumerate(path):
+        node.update_amaf(codes[index:], result, simulations)
 
-    for _ in range(iterations):
-        current_node: Node = root_node
-        state = deepcopy(root_node.state)
-        depth = 1
+def get_node_bytes(node: Node) -> int:
+    """Returns a rough estimate of the number of bytes used by a node and its state.
 
-        while not current_node.unexplored and current_node.children:
-            current_node = current_node.select_child()
-            depth += 1
-            state = get_next_state(state, current_node.action)
+    Args:
+        node: the node to measure.  Nodes with many unexplored actions give larger estimates.
+    """
+    size = sys.getsizeof(node) + sys.getsizeof(node.__dict__) + sys.getsizeof(node.state)
+    size += sys.getsizeof(node.state.board)
+    for row in node.state.board:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(square) for square in row)
+    size += sys.getsizeof(node.unexplored)
+    size += sum(sys.getsizeof(action) for action in node.unexplored)
+    return size
+
+def get_node_limit(root_node: Node, options: SearchOptions) -> Optional[int]:
+    """Returns the maximum number of nodes allowed by the options, or None if unbounded."""
+    limit = options.max_nodes
+    if options.max_bytes is not None:
+        byte_limit = max(1, options.max_bytes // get_node_bytes(root_node))
+        limit = byte_limit if limit is None else min(limit, byte_limit)
+    return limit
+
+def evict_nodes(root_node: Node, target: int, eviction: str, stats: SearchStats) -> None:
+    """Prunes subtrees until the tree has no more than target nodes.
+
+    Every node below the root that has children is a candidate.  Candidates are pruned in order of
+    their visits (or last visit), deepest first on ties, so a subtree is always considered before
+    the node above it.
 
-        if current_node.unexplored:
-            action = current_node.get_random_action()
-            state = get_next_state(state, action)
-            current_node = current_node.add_child(action, state)
-            depth += 1
+    Args:
+        root_node: the root of the tree.
+        target: the number of nodes to shrink the tree to.
+        eviction: 'visits' or 'recent' (see SearchOptions).
+        stats: the search's counters, whose nodes and evictions are updated.
+    """
+    if eviction not in ('visits', 'recent'):
+        raise ValueError(f"unknown eviction policy: {eviction}")
+
+    candidates = []
+    stack = [(child, 1) for child in root_node.children]
+    while stack:
+        node, depth = stack.pop()
+        if node.children:
+            key = node.visits if eviction == 'visits' else node.last_visit
+            candidates.append((key, -depth, id(node), node))
+            stack.extend((child, depth + 1) for child in node.children)
+
+    candidates.sort()
+    for _, _, _, node in candidates:
+        if stats.nodes <= target:
+            break
+        removed = node.prune()
+        stats.nodes -= removed
+        stats.evictions += removed
+
+@contextmanager
+def managed_gc(mode: Optional[str]) -> Iterator[None]:
+    """Pauses or freezes the cyclic garbage collector for the duration of the context.
+
+    Searches on several threads may use this at once: the collector is restored only when the last
+    of them leaves the context.
 
-        while check_victory(state) is None:
-            state = get_next_state(state, random.choice(get_actions(state)))
+    Args:
+        mode: 'pause', 'freeze' or None (see SearchOptions.gc_mode).
+    """
+    if mode is None:
+        yield
+        return
+    if mode not in GC_MODES:
+        raise ValueError(f"unknown gc mode: {mode}")
+
+    with _GC_LOCK:
+        if _GC_USERS['pause'] == 0 and _GC_USERS['freeze'] == 0:
+            _GC_ENABLED[0] = gc.isenabled()
+        _GC_USERS[mode] += 1
+        if mode == 'pause':
+            gc.disable()
+        else:
+            gc.freeze()
+    try:
+        yield
+    finally:
+        with _GC_LOCK:
+            _GC_USERS[mode] -= 1
+            if mode == 'freeze' and _GC_USERS['freeze'] == 0:
+                gc.unfreeze()
+            if _GC_USERS['pause'] == 0 and _GC_ENABLED[0]:
+                gc.enable()
+
+def run_iteration(root_node: Node, options: SearchOptions,
+                  stats: Optional[SearchStats] = None) -> None:
+    """Runs a single select, expand, simulate and backpropagate cycle on the tree.
 
-        weight_factor = 2**(depth-1)
-        if check_victory(state) == (1.0, 0.0):
-            result = (1.0 * weight_factor, 0.0)
-        elif check_victory(state) == (0.0, 1.0):
-            result = (0.0, 1.0 * weight_factor)
+    Args:
+        root_node: the root of the tree to search.
+        options: the enhancements to use.
+        stats: if given, the counters to update with the simulation lengths, the number of nodes
+            and the time of each node's last visit.
+    """
+    lengths = stats.rollout_lengths if stats is not None else None
+    current_node: Node = root_node
+    path: List[Node] = [root_node]
+    rave_equivalence = options.rave_equivalence if options.rave else 0.0
+    widening_constant = options.widening_constant if options.widening else None
+
+    puct_constant = options.puct_constant if options.priors else 0.0
+
+    # Select
+    while True:
+        if current_node.loader is not None:
+            # A node loaded from a checkpoint builds its saved children when first reached.
+            added = current_node.load()
+            if stats is not None:
+                stats.nodes += added
+        if not current_node.children or current_node.is_expandable(
+                widening_constant, options.widening_exponent, options.solver):
+            break
+        if options.decisive:
+            current_node = current_node.select_child_decisive(options.solver, rave_equivalence,
+                                                              puct_constant)
+        else:
+            current_node = current_node.select_child(options.solver, rave_equivalence,
+                                                     puct_constant)
+        path.append(current_node)
+
+    # Expand
+    if current_node.unexplored:
+        if options.priors:
+            action = current_node.get_prior_action()
+        elif options.widening:
+            action = current_node.get_ordered_action()
         else:
-            result = (0.5 * weight_factor, 0.5 * weight_factor)
+            action = current_node.get_random_action()
+        current_node = current_node.add_child(action, get_next_state(current_node.state, action))
+        path.append(current_node)
+        if stats is not None:
+            stats.nodes += 1
+    depth = len(path)
+
+    # Simulate
+    simulations = options.leaf_simulations
+    tablebase = options.tablebase
+    exact = current_node.terminal
+    if exact is None and tablebase is not None:
+        exact = tablebase.probe(current_node.state)
+        if exact is not None and options.solver and current_node.proven is None:
+            current_node.set_proven(exact)
+    mast = options.mast
+    if exact is not None:
+        result = (exact[0] * simulations, exact[1] * simulations)
+        if options.rave:
+            update_amaf(path, [], exact, simulations)
+        if mast is not None:
+            mast.update([node.code for node in path[1:]], root_node.state.to_move, exact)
+    elif options.rave or mast is not None:
+        result = (0.0, 0.0)
+        policy = mast.choose if mast is not None else None
+        for _ in range(simulations):
+            record: List[Action] = []
+            rollout_result = simulate(current_node.state, record, options.rollout_plies, lengths,
+                                      tablebase, policy)
+            codes = [encode_action(action) for action in record]
+            if options.rave:
+                update_amaf(path, codes, rollout_result)
+            if mast is not None:
+                mast.update([node.code for node in path[1:]] + codes, root_node.state.to_move,
+                            rollout_result)
+            result = (result[0] + rollout_result[0], result[1] + rollout_result[1])
+    elif options.workers > 0:
+        result = simulate_leaf_parallel(current_node.state, simulations, options.workers,
+                                        options.rollout_plies, lengths, tablebase)
+    else:
+        result = simulate_leaf(current_node.state, simulations, options.rollout_plies, lengths,
+                               tablebase)
+
+    # Prove
+    if options.solver and current_node.proven is not None:
+        proof_node = current_node.parent
+        while proof_node is not None and proof_node.update_proof():
+            proof_node = proof_node.parent
+
+    if options.weighted:
+        weight_factor = 2**(depth-1)
+        result = (result[0] * weight_factor, result[1] * weight_factor)
+        simulations *= weight_factor
+
+    # Backpropagate
+    if stats is not None:
+        stats.ticks += 1
+    proof_candidates: List[Node] = []
+    while current_node is not None:
+        if options.pns and options.solver and\
+                current_node.visits < options.pns_visits <= current_node.visits + simulations:
+            proof_candidates.append(current_node)
+        current_node.update_node(result, simulations)
+        if stats is not None:
+            current_node.last_visit = stats.ticks
+        current_node = current_node.parent
+
+    for proof_node in proof_candidates:
+        update_road_proof(proof_node, options, stats.prover if stats is not None else None)
+
+def run_iterations(root_node: Node, options: SearchOptions, iterations: Optional[int] = None,
+                   deadline: Optional[float] = None, stats: Optional[SearchStats] = None,
+                   stop: Optional[Event] = None,
+                   max_deadline: Optional[float] = None) -> Tuple[int, int]:
+    """Runs iterations on the tree until the iteration budget or the deadline is used up.
+
+    At least one iteration is always run so that the root has a child to return.
+
+    Args:
+        root_node: the root of the tree to search.
+        options: the enhancements to use.
+        iterations: the maximum number of simulations to run, or None for no limit.
+        deadline: a time.monotonic() value after which no new iteration is started, or None.
+        stats: the counters to update.  If the options bound the size of the tree, stats.nodes
+            must hold the current size of the tree.
+        stop: if given, no new iteration is started once this event is set.
+        max_deadline: if given, a time.monotonic() value after deadline.  Past the deadline,
+            iterations continue until max_deadline as long as the root is unstable (see
+            get_instability).
+
+    Returns:
+        A tuple of the number of simulations that were run and the number of simulations saved by
+        stopping early.
+
+    Raises:
+        ValueError: none of iterations, deadline and stop is given, or early stopping was requested
+        for a weighted search (whose visit increments are unbounded).
+    """
+    if iterations is None and deadline is None and stop is None:
+        raise ValueError("a search needs an iteration count, a time limit or a deadline")
+
+    early_stop = options.early_stop or options.confidence is not None
+    if early_stop and options.weighted:
+        raise ValueError("early stopping is not supported by weighted backpropagation")
+    # With no iteration budget and no deadline, no remaining budget can be estimated, and a search
+    # bounded only by the stop event would otherwise stop after its first iteration.
+    if iterations is None and deadline is None:
+        early_stop = False
+
+    node_limit = get_node_limit(root_node, options)
+    if node_limit is not None and stats is None:
+        stats = SearchStats(root_node.count_descendants() + 1)
+
+    freeze = options.gc_mode == 'freeze'
+    step = options.leaf_simulations
+    start = time.monotonic()
+    completed = 0
+    with managed_gc(options.gc_mode):
+        while iterations is None or completed + step <= iterations or completed == 0:
+            run_iteration(root_node, options, stats)
+            completed += step
+            if freeze and completed % (FREEZE_INTERVAL * step) == 0:
+                gc.freeze()
+
+            if node_limit is not None and stats.nodes > node_limit:
+                evict_nodes(root_node, int(node_limit * 0.9), options.eviction, stats)
+
+            if stop is not None and stop.is_set():
+                break
+
+            if deadline is not None:
+                now = time.monotonic()
+                if now >= deadline and (max_deadline is None or now >= max_deadline or
+                                        get_instability(root_node) <= STABLE_RATIO):
+                    break
+
+            solved = options.solver and root_node.proven is not None
+            if early_stop or solved:
+                remaining = get_remaining(iterations, completed, deadline, start, step)
+                if solved or can_stop_early(root_node, remaining, options.confidence):
+                    return (completed, remaining)
+        return (completed, 0)
+
+def get_remaining(iterations: Optional[int], completed: int, deadline: Optional[float],
+                  start: float, step: int = 1) -> int:
+    """Returns the number of simulations left in a search's budget.
+
+    If the search has a deadline, the simulations that fit before it are estimated from the rate
+    since start.
+
+    Args:
+        iterations: the search's iteration budget, or None.
+        completed: the number of simulations run so far.
+        deadline: the search's deadline, or None.
+        start: the time.monotonic() value at which the search started.
+        step: the number of simulations run by each iteration.
+    """
+    remaining = iterations - completed if iterations is not None else 0
+    now = time.monotonic()
+    if deadline is not None and now > start:
+        estimate = int((deadline - now) * completed / (now - start))
+        remaining = estimate if iterations is None else min(remaining, estimate)
+    return max(0, remaining) // step * step
+
+async def async_search(root: State, iterations: Optional[int] = None,
+                       time_limit: Optional[float] = None, deadline: Optional[float] = None,
+                       slice_iterations: int = 16, executor: Optional[Executor] = None,
+                       **options) -> SearchResult:
+    """Runs a search as a coroutine, yielding to the event loop between slices of iterations.
+
+    The search can be cancelled like any other task.  Without an executor, the CancelledError is
+    raised at the next slice boundary; with one, it is raised at once and the running slice stops
+    at its next iteration.  Either way, the tree is released to the arena (see SearchOptions).
+    Early stopping and the solver are checked against the whole budget after every slice.
 
-        while current_node is not None:
-            current_node.update_node(result, weight_factor)
-            current_node = current_node.parent
+    Args:
+        root: a State NamedTuple that represents the current game state from which to simulate.
+        iterations: the number of iterations to run before selecting an action.
+        time_limit: the number of seconds after which no new iteration is started.
+        deadline: a time.monotonic() value after which no new iteration is started.
+        slice_iterations: the number of iterations to run between yields to the event loop.
+        executor: if given, each slice runs on this executor (which must share memory with the
+            caller, e.g. a ThreadPoolExecutor) instead of on the event loop's thread.
+        options: keyword arguments defining the enhancements to use (see SearchOptions).
+    """
+    search_options = SearchOptions(**options)
+    if iterations is None and time_limit is None and deadline is None:
+        raise ValueError("a search needs an iteration count, a time limit or a deadline")
+    if (search_options.early_stop or search_options.confidence is not None) and\
+            search_options.weighted:
+        raise ValueError("early stopping is not supported by weighted backpropagation")
+
+    deadline = get_deadline(time_limit, deadline)
+    loop = asyncio.get_running_loop()
+    stats = SearchStats()
+    get_exact = partial(get_exact_result, root, search_options, iterations, deadline,
+                        stats.prover)
+    if executor is not None:
+        exact_result = await loop.run_in_executor(executor, get_exact)
+    else:
+        exact_result = get_exact()
+    if exact_result is not None:
+        return exact_result
+
+    root_node: Node = Node(action=None, state=root, parent=None,
+                           weight=search_options.weight_factor, arena=search_options.arena)
+    slice_options = search_options._replace(early_stop=False, confidence=None)
+    step = search_options.leaf_simulations
+    start = time.monotonic()
+    completed, saved = 0, 0
+    # Set on cancellation, so that a slice running on the executor stops at its next iteration
+    # instead of searching the abandoned tree until its budget is used up.
+    stop = Event()
+    running: Optional[asyncio.Future] = None
+
+    try:
+        while iterations is None or completed + step <= iterations or completed == 0:
+            budget = slice_iterations * step
+            if iterations is not None:
+                budget = min(budget, max(step, iterations - completed))
+            run_slice = partial(run_iterations, root_node, slice_options, budget, deadline, stats,
+                                stop)
+            if executor is not None:
+                # Shielded so that cancelling the task leaves the future to report when the
+                # worker thread is done with the tree.
+                running = loop.run_in_executor(executor, run_slice)
+                done, _ = await asyncio.shield(running)
+                running = None
+            else:
+                done, _ = run_slice()
+                await asyncio.sleep(0)
+            completed += done
+
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+
+            solved = search_options.solver and root_node.proven is not None
+            if solved or search_options.early_stop or search_options.confidence is not None:
+                remaining = get_remaining(iterations, completed, deadline, start, step)
+                if solved or can_stop_early(root_node, remaining, search_options.confidence):
+                    saved = remaining
+                    break
+
+        return SearchResult(action=get_best_action(root_node, search_options.solver),
+                            iterations=completed, saved=saved, proven=root_node.proven,
+                            rollout_lengths=stats.rollout_lengths, evictions=stats.evictions)
+    finally:
+        stop.set()
+        arena = search_options.arena
+        if arena is not None:
+            if running is not None and not running.done():
+                # The tree is released once the cancelled slice has stopped using it.
+                running.add_done_callback(lambda _: arena.release(root_node))
+            else:
+                arena.release(root_node)
+
+def search(root: State, iterations: Optional[int] = None, time_limit: Optional[float] = None,
+           deadline: Optional[float] = None, max_deadline: Optional[float] = None,
+           **options) -> SearchResult:
+    """Returns the most visited action and the number of iterations completed by a MCTS.
+
+    Args:
+        root: a State NamedTuple that represents the current game state from which to simulate.
+        iterations: the number of iterations to run before selecting an action.
+        time_limit: the number of seconds after which no new iteration is started.
+        deadline: a time.monotonic() value after which no new iteration is started.
+        max_deadline: a later time.monotonic() value up to which the search continues past the
+            deadline while the root is unstable (see run_iterations).
+        options: keyword arguments defining the enhancements to use (see SearchOptions).
+    """
+    search_options = SearchOptions(**options)
+    root_node: Node = Node(action=None, state=root, parent=None,
+                           weight=search_options.weight_factor, arena=search_options.arena)
+    result = search_tree(root_node, search_options, iterations, get_deadline(time_limit, deadline),
+                         max_deadline=max_deadline)
+    if search_options.arena is not None:
+        search_options.arena.release(root_node)
+    return result
+
+def get_exact_result(state: State, options: SearchOptions, iterations: Optional[int] = None,
+                     deadline: Optional[float] = None,
+                     prover: Optional[RoadProver] = None) -> Optional[SearchResult]:
+    """Returns the result of the exact searches the options enable, if they settle the position.
+
+    A late-game position is searched with alpha-beta (with alphabeta), and any position is searched
+    for a forced road (with pns) by prover, or by a new RoadProver if it is None.
+
+    Returns:
+        A SearchResult with no iterations and the proven (Black, White) result, or None if the
+        options enable neither search or neither finds the exact result.
+    """
+    if check_victory(state) is not None:
+        return None
+
+    if options.alphabeta and is_late_game(state, options.alphabeta_empty,
+                                          options.alphabeta_stones):
+        result = alphabeta_search(state, options.alphabeta_depth, deadline)
+        if result.exact:
+            proven = (result.value, 1.0 - result.value) if state.to_move == Color.BLACK else\
+                (1.0 - result.value, result.value)
+            return SearchResult(action=result.action, iterations=0, saved=iterations or 0,
+                                proven=proven)
+
+    if options.pns:
+        prover = prover if prover is not None else RoadProver()
+        proof = prover.prove(state, options.pns_plies, options.pns_nodes)
+        if proof.proven:
+            proven = (1.0, 0.0) if state.to_move == Color.BLACK else (0.0, 1.0)
+            return SearchResult(action=proof.action, iterations=0, saved=iterations or 0,
+                                proven=proven)
+    return None
+
+def update_road_proof(node: Node, options: SearchOptions,
+                      prover: Optional[RoadProver] = None) -> None:
+    """Proves the node a win for its player to move if prover (or a new RoadProver) finds a forced
+    road, and propagates the proof up the tree."""
+    if node.proven is not None or node.terminal is not None:
+        return
+    prover = prover if prover is not None else RoadProver()
+    if not prover.prove(node.state, options.pns_plies, options.pns_nodes).proven:
+        return
+
+    node.set_proven((1.0, 0.0) if node.state.to_move == Color.BLACK else (0.0, 1.0))
+    proof_node = node.parent
+    while proof_node is not None and proof_node.update_proof():
+        proof_node = proof_node.parent
+
+def search_tree(root_node: Node, options: SearchOptions, iterations: Optional[int] = None,
+                deadline: Optional[float] = None, stats: Optional[SearchStats] = None,
+                stop: Optional[Event] = None, max_deadline: Optional[float] = None)\
+    -> SearchResult:
+    """Runs iterations on an existing tree and returns the resulting SearchResult.
+
+    Args:
+        root_node: the root of the tree to search.  Its existing statistics are kept.
+        options: the enhancements to use.
+        iterations: the number of iterations to run before selecting an action.
+        deadline: a time.monotonic() value after which no new iteration is started.
+        stats: the counters to update, or None to start new ones.
+        stop: if given, no new iteration is started once this event is set.
+        max_deadline: a later time.monotonic() value up to which the search continues past the
+            deadline while the root is unstable (see run_iterations).
+    """
+    if stats is None:
+        stats = SearchStats(root_node.count_descendants() + 1)
+    exact_result = get_exact_result(root_node.state, options, iterations, deadline, stats.prover)
+    if exact_result is not None:
+        return exact_result
 
-    return sorted(root_node.children, key=lambda x: x.visits)[-1].action
+    completed, saved = run_iterations(root_node, options, iterations, deadline, stats, stop,
+                                      max_deadline)
 
-def multi_simulation_mcts(root: State, iterations: int, leaf_simulations: int = 3) -> Action:
+    return SearchResult(action=get_best_action(root_node, options.solver),
+                        iterations=completed, saved=saved, proven=root_node.proven,
+                        rollout_lengths=stats.rollout_lengths, evictions=stats.evictions)
+
+def default_mcts(root: State, iterations: Optional[int] = None, weight_factor: float = 2.0,
+                 **kwargs) -> Action:
     """Returns the most visited action from a MCTS with the given number of iterations.
 
     Args:
-        root: the State from which the search starts.
-        iterations: an int representing the number of iterations to perform.
-        leaf_simulations: the number of simulations to run each time a new node is added to the
-        tree.
+        root: a State NamedTuple that represents the current game state from which to simulate.
+        iterations: the number of iterations to run before selecting an action.
+        weight_factor: the exploration weight used by calculate_uct.
+        kwargs: additional arguments passed on to search (e.g. time_limit or deadline).
     """
-    root_node: Node = Node(action=None, state=root, parent=None)
+    return search(root, iterations, weight_factor=weight_factor, **kwargs).action
 
-    for _ in range(iterations//leaf_simulations):
-        current_node: Node = root_node
-        state = deepcopy(root_node.state)
+def decisive_move_mcts(root: State, iterations: Optional[int] = None, **kwargs) -> Action:
+    """Returns the most visited action from a MCTS with the given number of iterations.
 
-        # Select
-        while not current_node.unexplored and current_node.children:
-            current_node = current_node.select_child()
-            state = get_next_state(state, current_node.action)
+    This function differs from default_mcts in that for each select step, it checks if a child is
+    a decisive move (a move that leads immediately to victory).  If a child is decisive, it is
+    returned, otherwise MCTS proceeds as normal.
 
-        # Expand
-        if current_node.unexplored:
-            action = current_node.get_random_action()
-            state = get_next_state(state, action)
-            current_node = current_node.add_child(action, state)
+    Args:
+        root: a State NamedTuple that represents the starting state
+        iterations: an int denoting the number of iterations to run the search.
+        kwargs: additional arguments passed on to search (e.g. time_limit or deadline).
+    """
+    return search(root, iterations, decisive=True, **kwargs).action
 
-        # Simulate
-        result = (0.0, 0.0)
-        for _ in range(leaf_simulations):
-            sim_state = deepcopy(state)
-            while check_victory(sim_state) is None:
-                sim_state = get_next_state(sim_state, random.choice(get_actions(sim_state)))
-
-            if check_victory(sim_state) == (1.0, 0.0):
-                result = (result[0] + 1.0, result[1])
-            elif check_victory(sim_state) == (0.0, 1.0):
-                result = (result[0], result[1] + 1.0)
-            else:
-                result = (result[0] + 0.5, result[1] + 0.5)
+def weighted_backpropagation_mcts(root: State, iterations: Optional[int] = None,
+                                  **kwargs) -> Action:
+    """Returns the most visited action in a MCTS with the weighted backpropagation enhancement.
+
+    Args:
+        root: the state from which to search.
+        iterations: the number of iterations to run before returning.
+        kwargs: additional arguments passed on to search (e.g. time_limit or deadline).
+    """
+    return search(root, iterations, weighted=True, **kwargs).action
+
+def rave_mcts(root: State, iterations: Optional[int] = None, rave_equivalence: float = 300.0,
+              **kwargs) -> Action:
+    """Returns the most visited action from a MCTS with the RAVE enhancement.
+
+    Args:
+        root: the State from which the search starts.
+        iterations: an int representing the number of iterations to perform.
+        rave_equivalence: the number of visits at which a child's own win rate and its AMAF win
+        rate are weighted equally.
+        kwargs: additional arguments passed on to search (e.g. time_limit or deadline).
+    """
+    return search(root, iterations, rave=True, rave_equivalence=rave_equivalence, **kwargs).action
 
-        # Backpropagate
-        while current_node is not None:
-            current_node.update_node(result, leaf_simulations)
-            current_node = current_node.parent
+def puct_mcts(root: State, iterations: Optional[int] = None, puct_constant: float = 1.5,
+              **kwargs) -> Action:
+    """Returns the most visited action from a MCTS guided by heuristic action priors.
+
+    Args:
+        root: the State from which the search starts.
+        iterations: an int representing the number of iterations to perform.
+        puct_constant: the exploration constant of PUCT.
+        kwargs: additional arguments passed on to search (e.g. time_limit or deadline).
+    """
+    return search(root, iterations, priors=True, puct_constant=puct_constant, **kwargs).action
 
-    return sorted(root_node.children, key=lambda x: x.visits)[-1].action
+def multi_simulation_mcts(root: State, iterations: Optional[int] = None, leaf_simulations: int = 3,
+                          workers: int = 0, **kwargs) -> Action:
+    """Returns the most visited action from a MCTS with the given number of iterations.
+
+    Args:
+        root: the State from which the search starts.
+        iterations: an int representing the number of iterations to perform.
+        leaf_simulations: the number of simulations to run each time a new node is added to the
+        tree.
+        workers: if greater than 0, the leaf simulations are run concurrently on a persistent pool
+        of this many worker processes.  Otherwise they run one after another in this process, so
+        each iteration costs about leaf_simulations times as much as a single rollout.
+        kwargs: additional arguments passed on to search (e.g. time_limit or deadline).
+    """
+    return search(root, iterations, leaf_simulations=leaf_simulations, workers=workers,
+                  **kwargs).action
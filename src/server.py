@@ -0,0 +1,337 @@
+"""A long-running engine process that serves many games over a line protocol.
+
+Starting a new Python process for every move throws away the search tree, the legal action cache
+and the worker pools.  The server keeps one Engine (see engine.py) per game id for as long as it
+runs, so every game keeps its tree between moves and the games of each worker share warm caches.
+
+The protocol is one command per line, and every reply is one line:
+    isready                                  -> readyok
+    position <game> <black|white> [codes]    sets the game's position: the color that moved
+                                             first, followed by the action codes played since
+                                             (see utils.encode_action)
+    go <game> [iterations N] [time S]        starts a search of the game's position; with
+                                             neither budget it runs until stop
+    stop <game>                              ends the game's search early
+    close <game>                             stops the game's search and discards its engine
+    quit                                     stops every search and ends the session
+A search replies with 'bestmove <game> <code> <iterations>' when it finishes.  A malformed command
+is answered with 'error <message>'.
+
+The games are sharded over a fixed set of worker processes: a game is given to the worker with the
+fewest games when it is first positioned, and that worker owns its Engine until the game is closed.
+The server process only routes commands to the owning worker and replies back to the client, so
+games owned by different workers are searched in parallel, one core per worker.  Within a worker,
+each search runs on its own thread, so the worker keeps reading stop while it searches; the games
+of one worker share its core.
+
+Run the server on standard input and output with 'python -m src.server', or on a UNIX socket with
+'python -m src.server --socket PATH'.
+"""
+from argparse import ArgumentParser
+from itertools import count
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+import os
+import socketserver
+import sys
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, List, Optional
+
+from .enums import Color
+from .engine import Engine
+from .game import get_next_state, check_victory
+from .types import State, get_default_state
+from .utils import encode_action, decode_action
+
+GAME_COMMANDS = ('position', 'go', 'stop', 'close')
+# Options holding objects that every game of a worker would share.  Neither is safe to use from
+# several search threads at once.
+SHARED_OPTIONS = ('arena', 'mast')
+
+class Game:
+    """The engine, position and running search of one game owned by a worker process."""
+    def __init__(self, engine: Engine):
+        """Initializes a game at the default position with Black to move."""
+        self.engine = engine
+        self.state: State = get_default_state(Color.BLACK)
+        self.stop = Event()
+        self.thread: Optional[Thread] = None
+
+    def is_searching(self) -> bool:
+        """Returns True if a search of this game has been started and has not finished."""
+        return self.thread is not None and self.thread.is_alive()
+
+    def close(self) -> None:
+        """Stops the game's search, waits for it to reply and discards the engine's tree."""
+        self.stop.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.engine.close()
+
+class EngineServer:
+    """Routes the commands of the line protocol to the worker processes that own the games."""
+    def __init__(self, workers: int = 4, **options):
+        """Starts the worker processes, with no games.
+
+        Args:
+            workers: the number of worker processes, and so the number of games that can be
+                searched in parallel.
+            options: keyword arguments passed to each game's Engine (see Engine and SearchOptions).
+
+        Raises:
+            ValueError: workers is less than 1, or the options hold an arena or a MAST table,
+                which every game of a worker would share.
+        """
+        if workers < 1:
+            raise ValueError(f"workers cannot be < 1: {workers}")
+        shared = [name for name in SHARED_OPTIONS if options.get(name) is not None]
+        if shared:
+            raise ValueError(f"{', '.join(shared)} cannot be shared between games")
+
+        self._lock = Lock()
+        self._shards: Dict[str, int] = {}
+        self._loads = [0] * workers
+        self._senders: Dict[int, Callable[[str], None]] = {}
+        self._tokens = count()
+        self._closed = False
+        self._connections: List[Connection] = []
+        self._processes: List[Process] = []
+        self._readers: List[Thread] = []
+        for _ in range(workers):
+            connection, worker_connection = Pipe()
+            process = Process(target=run_worker, args=(worker_connection, options))
+            process.start()
+            worker_connection.close()
+            reader = Thread(target=self._read_replies, args=(connection,), daemon=True)
+            reader.start()
+            self._connections.append(connection)
+            self._processes.append(process)
+            self._readers.append(reader)
+
+    def handle(self, line: str, send: Callable[[str], None]) -> bool:
+        """Runs one command and sends its replies.
+
+        Args:
+            line: the command.
+            send: a function that writes one reply line.  Replies from the workers are sent from
+                reader threads, so send must be safe to call from several threads.
+
+        Returns:
+            False if the command was quit, otherwise True.
+        """
+        words = line.split()
+        if not words:
+            return True
+        command, args = words[0], words[1:]
+        try:
+            if command == 'quit':
+                self.close()
+                return False
+            if command == 'isready':
+                send('readyok')
+            elif command in GAME_COMMANDS:
+                self._forward(command, args, send)
+            else:
+                raise ValueError(f'unknown command {command}')
+        except (ValueError, IndexError, RuntimeError) as error:
+            send(f'error {error}')
+        return True
+
+    def close(self) -> None:
+        """Stops every search, discards every game and ends the worker processes.
+
+        Returns once every reply, including the bestmove of each stopped search, has been sent.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._shards.clear()
+            for connection in self._connections:
+                connection.send((None, 'quit', []))
+        for reader in self._readers:
+            reader.join()
+        for process, connection in zip(self._processes, self._connections):
+            process.join()
+            connection.close()
+
+    def _forward(self, command: str, args: List[str], send: Callable[[str], None]) -> None:
+        """Sends a game command to the worker that owns the game, assigning new games to the
+        worker with the fewest."""
+        if not args:
+            raise ValueError('missing game id')
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('the server is closed')
+            shard = self._shards.get(args[0])
+            if shard is None:
+                if command != 'position':
+                    raise ValueError(f'unknown game {args[0]}')
+                shard = self._loads.index(min(self._loads))
+                self._shards[args[0]] = shard
+                self._loads[shard] += 1
+            elif command == 'close':
+                del self._shards[args[0]]
+                self._loads[shard] -= 1
+            token = next(self._tokens)
+            self._senders[token] = send
+            self._connections[shard].send((token, command, args))
+
+    def _read_replies(self, connection: Connection) -> None:
+        """Sends each reply of one worker to the client that sent its command, until the worker
+        has quit."""
+        while True:
+            try:
+                token, reply = connection.recv()
+            except EOFError:
+                return
+            if token is None:
+                return
+            with self._lock:
+                send = self._senders.pop(token)
+            if reply is not None:
+                send(reply)
+
+def run_worker(connection: Connection, options: Dict) -> None:
+    """Runs the commands of the games owned by one worker process until the server quits.
+
+    Every command gets exactly one reply, tagged with the token it was sent with: an error, the
+    bestmove of a search, or None.  Searches run on threads of this process and reply when they
+    finish.
+
+    Args:
+        connection: the worker's end of the pipe to the server.
+        options: keyword arguments passed to each game's Engine.
+    """
+    games: Dict[str, Game] = {}
+    lock = Lock()
+    def reply(token: Optional[int], text: Optional[str]) -> None:
+        with lock:
+            connection.send((token, text))
+
+    while True:
+        token, command, args = connection.recv()
+        if command == 'quit':
+            for game in games.values():
+                game.stop.set()
+            for game in games.values():
+                game.close()
+            reply(None, None)
+            connection.close()
+            return
+        try:
+            if command == 'position':
+                set_position(games, args, options)
+                reply(token, None)
+            elif command == 'go':
+                start_search(games[args[0]], args, token, reply)
+            elif command == 'stop':
+                games[args[0]].stop.set()
+                reply(token, None)
+            else:
+                games.pop(args[0]).close()
+                reply(token, None)
+        except KeyError:
+            reply(token, f'error unknown game {args[0]}')
+        except (ValueError, IndexError, RuntimeError) as error:
+            reply(token, f'error {error}')
+
+def set_position(games: Dict[str, Game], args: List[str], options: Dict) -> None:
+    """Handles position <game> <black|white> [codes], creating the game if it is new."""
+    game = games.get(args[0])
+    if game is None:
+        game = games[args[0]] = Game(Engine(**options))
+    if game.is_searching():
+        raise RuntimeError(f'game {args[0]} is searching')
+
+    state = get_default_state(Color(args[1].capitalize()))
+    for code in args[2:]:
+        if check_victory(state):
+            raise ValueError('the game is already over')
+        state = get_next_state(state, decode_action(int(code)))
+    game.state = state
+
+def start_search(game: Game, args: List[str], token: int,
+                 reply: Callable[[Optional[int], Optional[str]], None]) -> None:
+    """Handles go <game> [iterations N] [time S], starting the search on a new thread."""
+    if game.is_searching():
+        raise RuntimeError(f'game {args[0]} is searching')
+    if check_victory(game.state):
+        raise ValueError('the game is already over')
+
+    budget = dict(zip(args[1::2], args[2::2]))
+    iterations = int(budget['iterations']) if 'iterations' in budget else None
+    time_limit = float(budget['time']) if 'time' in budget else None
+    game.stop.clear()
+
+    def search() -> None:
+        try:
+            result = game.engine.search(game.state, iterations, time_limit, stop=game.stop)
+        except Exception as error: # pylint: disable=broad-except
+            reply(token, f'error {error}')
+            return
+        reply(token, f'bestmove {args[0]} {encode_action(result.action)} {result.iterations}')
+    game.thread = Thread(target=search)
+    game.thread.start()
+
+def serve_stream(server: EngineServer, infile, outfile) -> None:
+    """Serves the protocol on a pair of text streams until quit or the end of the input."""
+    lock = Lock()
+    def send(reply: str) -> None:
+        with lock:
+            outfile.write(reply + '\n')
+            outfile.flush()
+
+    for line in infile:
+        if not server.handle(line, send):
+            return
+    server.close()
+
+def serve_socket(server: EngineServer, path: str) -> None:
+    """Serves the protocol on a UNIX socket, one thread per connection, until interrupted.
+
+    Games are shared between connections, so a client may reconnect and continue a game.
+    """
+    class Handler(socketserver.StreamRequestHandler):
+        """Reads commands from one connection."""
+        def handle(self):
+            lock = Lock()
+            def send(reply: str) -> None:
+                with lock:
+                    self.wfile.write((reply + '\n').encode())
+                    self.wfile.flush()
+
+            for line in self.rfile:
+                if not server.handle(line.decode(), send):
+                    listener.shutdown()
+                    return
+
+    if os.path.exists(path):
+        os.remove(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as listener:
+        listener.daemon_threads = True
+        try:
+            listener.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    server.close()
+    os.remove(path)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Parses the command line and runs the server."""
+    parser = ArgumentParser(description='Serve Tak games over a line protocol.')
+    parser.add_argument('--socket', help='listen on this UNIX socket instead of stdin/stdout')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='the number of worker processes searching games in parallel')
+    parser.add_argument('--ponder', action='store_true',
+                        help="search each game while waiting for the opponent's move")
+    args = parser.parse_args(argv)
+
+    server = EngineServer(workers=args.workers, ponder=args.ponder)
+    if args.socket:
+        serve_socket(server, args.socket)
+    else:
+        serve_stream(server, sys.stdin, sys.stdout)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""An endgame tablebase: exact results for positions close to the end of the game.
+
+When few squares are empty (and, optionally, both reserves are low), the game is nearly over: it
+ends as soon as the board fills up or either player places their last stone.  Random rollouts from
+such positions are noisy, but the positions are small enough to solve exactly.
+
+A true retrograde analysis would enumerate every endgame position and work backwards from the
+terminal ones, but the stacks make the number of positions far too large, and actions cannot be
+undone to find predecessors.  EndgameSolver instead solves positions forward with a memoized
+minimax search, keyed by canonical position hash (see utils.get_canonical_hash), and remembers the
+exact value of every endgame position it solves along the way.  A position is only stored once
+its value is exact: stacks can be moved back and forth forever, so a value that depends on the
+depth limit or on a repeated position is never stored.
+
+build_tablebase seeds the solver with the endgame positions reached by random games and writes the
+solved positions to a file of fixed-size records sorted by hash:
+    header: magic b'TAKE', format version, empty square and stone thresholds, number of records
+    record: canonical hash, twice Black's result
+Tablebase maps the file with mmap and finds a position with a binary search (see
+records.RecordFile).  Passing it to a search (tablebase=Tablebase(path), see search.SearchOptions)
+makes rollouts stop with the exact result as soon as they reach a stored position, and leaves found
+in the table take their exact result (and, with the solver, become proven) without a rollout.
+
+Build a tablebase with 'python -m src.tablebase PATH [--games N] [--empty N] [--stones N]'.
+"""
+from argparse import ArgumentParser
+import os
+import random
+import struct
+from typing import Dict, List, Optional, Set, Tuple
+
+from .enums import Color
+from .game import get_actions, get_next_state, check_victory
+from .records import RecordFile
+from .types import State, get_default_state
+from .utils import get_canonical_hash
+
+MAGIC = b'TAKE'
+VERSION = 1
+HEADER = struct.Struct('<4sHBBI')
+RECORD = struct.Struct('<QB')
+
+_OPEN_TABLEBASES: Dict[Tuple[str, int, int], 'Tablebase'] = {}
+
+def is_endgame(state: State, max_empty: int, max_stones: int) -> bool:
+    """Returns True if the state is within the tablebase thresholds.
+
+    Args:
+        state: the State to check.
+        max_empty: the most empty squares an endgame position may have.
+        max_stones: the most stones either player may have left.
+    """
+    if state.black_stones > max_stones or state.white_stones > max_stones:
+        return False
+    empty = 0
+    for row in state.board:
+        for square in row:
+            if not square:
+                empty += 1
+    return empty <= max_empty
+
+class EndgameSolver:
+    """Solves positions exactly with a memoized, depth-limited minimax search."""
+    def __init__(self, max_empty: int = 2, max_stones: int = 15, max_depth: int = 3):
+        """Initializes a solver with no solved positions.
+
+        Args:
+            max_empty: the empty square threshold of the endgame positions to keep.
+            max_stones: the stone threshold of the endgame positions to keep.
+            max_depth: the most plies searched from each position passed to solve.
+        """
+        self._max_empty = max_empty
+        self._max_stones = max_stones
+        self._max_depth = max_depth
+        self._solved: Dict[int, Tuple[float, float]] = {}
+        self._endgames: Dict[int, Tuple[float, float]] = {}
+        self._unsolved: Dict[int, int] = {}
+
+    def solve(self, state: State) -> Optional[Tuple[float, float]]:
+        """Returns the exact (Black, White) result of the position, or None if the search was cut
+        off before it could be proven."""
+        return self._solve(state, self._max_depth, set())
+
+    def _solve(self, state: State, depth: int, path: Set[int])\
+        -> Optional[Tuple[float, float]]:
+        """Solves a position with depth plies left, given the positions on the current line."""
+        result = check_victory(state)
+        if result is not None:
+            return result
+        key, _ = get_canonical_hash(state)
+        known = self._solved.get(key)
+        if known is not None:
+            return known
+        if depth == 0 or key in path or self._unsolved.get(key, -1) >= depth:
+            return None
+
+        mover = 0 if state.to_move == Color.BLACK else 1
+        children = [get_next_state(state, action) for action in get_actions(state)]
+        # Try the actions that win at once first, so most wins are found without a search.
+        best: Optional[Tuple[float, float]] = None
+        for child in children:
+            result = check_victory(child)
+            if result is not None and result[mover] == 1.0:
+                best = result
+                break
+
+        exact = True
+        if best is None:
+            path.add(key)
+            for child in children:
+                value = self._solve(child, depth - 1, path)
+                if value is None:
+                    exact = False
+                elif value[mover] == 1.0:
+                    best, exact = value, True
+                    break
+                elif best is None or value[mover] > best[mover]:
+                    best = value
+            path.discard(key)
+
+        if best is None or not exact:
+            self._unsolved[key] = depth
+            return None
+        self._solved[key] = best
+        if is_endgame(state, self._max_empty, self._max_stones):
+            self._endgames[key] = best
+        return best
+
+    @property
+    def endgames(self):
+        """Property definition for _endgames."""
+        return self._endgames
+
+def write_tablebase(entries: Dict[int, Tuple[float, float]], path: str, max_empty: int,
+                    max_stones: int) -> None:
+    """Writes solved positions to a tablebase file, sorted by key."""
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, max_empty, max_stones, len(entries)))
+        for key in sorted(entries):
+            file.write(RECORD.pack(key, round(entries[key][0] * 2)))
+
+def build_tablebase(path: str, games: int = 100, max_empty: int = 2, max_stones: int = 15,
+                    max_depth: int = 3) -> int:
+    """Solves the endgame positions reached by random games and writes them to a tablebase file.
+
+    Args:
+        path: the name of the tablebase file.
+        games: the number of random games played to find endgame positions.
+        max_empty: the most empty squares a stored position may have.
+        max_stones: the most stones either player may have left in a stored position.  The
+            default of 15 does not limit the reserves: random games mostly end by filling the
+            board with stones to spare.
+        max_depth: the most plies searched from each endgame position reached by a game.
+
+    Returns:
+        The number of positions in the tablebase.
+    """
+    solver = EndgameSolver(max_empty, max_stones, max_depth)
+    for game in range(games):
+        state = get_default_state(Color.BLACK if game % 2 == 0 else Color.WHITE)
+        while check_victory(state) is None and not is_endgame(state, max_empty, max_stones):
+            state = get_next_state(state, random.choice(get_actions(state)))
+        if check_victory(state) is None:
+            solver.solve(state)
+
+    write_tablebase(solver.endgames, path, max_empty, max_stones)
+    return len(solver.endgames)
+
+class Tablebase(RecordFile):
+    """A tablebase file opened with mmap, searched by canonical position hash.
+
+    A Tablebase can be pickled, so it can be sent to worker processes.  It is pickled as its path,
+    and unpickling returns the process's open Tablebase for that file (see open_tablebase), so
+    each worker maps the file once rather than once per task.
+    """
+    MAGIC = MAGIC
+    VERSION = VERSION
+    HEADER = HEADER
+    RECORD = RECORD
+    KIND = 'tablebase'
+
+    def _read_header(self, fields: Tuple) -> int:
+        """Reads the thresholds and the number of records."""
+        self._max_empty, self._max_stones, count = fields
+        return count
+
+    def __reduce__(self):
+        return (open_tablebase, (self._path,))
+
+    def __call__(self, state: State) -> Optional[Tuple[float, float]]:
+        return self.probe(state)
+
+    def probe(self, state: State) -> Optional[Tuple[float, float]]:
+        """Returns the exact (Black, White) result of the position, or None if it is not stored.
+
+        Positions outside the thresholds are rejected before the position is hashed, so probing
+        is cheap for most of the game.
+        """
+        if not is_endgame(state, self._max_empty, self._max_stones):
+            return None
+        record = self.find_record(get_canonical_hash(state)[0])
+        if record is None:
+            return None
+        return (record[1] / 2, 1.0 - record[1] / 2)
+
+    @property
+    def max_empty(self):
+        """Property definition for _max_empty."""
+        return self._max_empty
+
+    @property
+    def max_stones(self):
+        """Property definition for _max_stones."""
+        return self._max_stones
+
+def open_tablebase(path: str) -> Tablebase:
+    """Returns a Tablebase for the file, reusing the one this process already has open.
+
+    Tablebases are kept by path and by the file's inode and modification time, so a file that is
+    rewritten is mapped again.
+    """
+    status = os.stat(path)
+    key = (path, status.st_ino, status.st_mtime_ns)
+    tablebase = _OPEN_TABLEBASES.get(key)
+    if tablebase is None or tablebase.closed:
+        tablebase = Tablebase(path)
+        _OPEN_TABLEBASES[key] = tablebase
+    return tablebase
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Parses the command line and builds a tablebase."""
+    parser = ArgumentParser(description='Build an endgame tablebase.')
+    parser.add_argument('path', help='the tablebase file to write')
+    parser.add_argument('--games', type=int, default=100,
+                        help='the random games played to find endgame positions')
+    parser.add_argument('--empty', type=int, default=2, help='the empty square threshold')
+    parser.add_argument('--stones', type=int, default=15, help='the stone threshold')
+    parser.add_argument('--depth', type=int, default=3, help='the depth limit of the solver')
+    args = parser.parse_args(argv)
+
+    count = build_tablebase(args.path, args.games, args.empty, args.stones, args.depth)
+    print(f"Wrote {count} positions to {args.path}")
+
+if __name__ == '__main__':
+    main()
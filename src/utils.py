@@ -3,13 +3,23 @@
 This module defines several utility functions that are used by game.py so that that module didn't
 become unbearably long.
 """
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from collections import deque
+from functools import lru_cache
+from hashlib import blake2b
 from itertools import permutations
 from math import sqrt, log
 
 from .enums import Color, Piece
-from .types import State, Action, Place
+from .types import State, Action, Place, Move
+
+PIECES = [Piece.BLACK_FLAT, Piece.BLACK_STANDING, Piece.WHITE_FLAT, Piece.WHITE_STANDING]
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+MOVE_CODE_OFFSET = 64
+ACTION_CODES = MOVE_CODE_OFFSET + 16 * 4 * 125
+TABLE_CAPACITY = 1 << 20
+SYMMETRIES = [(transpose, flip_rows, flip_cols) for transpose in (False, True)
+              for flip_rows in (False, True) for flip_cols in (False, True)]
 
 def pretty_time_delta(seconds):
     """Prints a number of seconds in a terse, human-readable format.
@@ -67,6 +77,16 @@ def get_drop_lists(carry: int, moves: int) -> List[List[int]]:
         The outer list will contain a unique list for every possible permutation of the given sets
         of drops.
     """
+    return [list(x) for x in get_drop_tuples(carry, moves)]
+
+@lru_cache(maxsize=None)
+def get_drop_tuples(carry: int, moves: int) -> Tuple[Tuple[int, ...], ...]:
+    """Returns the drop lists of get_drop_lists as tuples, computing them only once.
+
+    Args:
+        carry: An int representing the number of stones picked up.
+        moves: An int representing the number of squares on which stones are dropped.
+    """
     possible_drops = list(range(1, carry + 1))
     all_combinations = get_combinations(possible_drops, carry)
     combinations = [x for x in all_combinations if len(x) == moves]
@@ -76,9 +96,7 @@ def get_drop_lists(carry: int, moves: int) -> List[List[int]]:
         for perm in permutations(combo):
             perms.append(perm)
 
-    solution = [list(x) for x in set(perms)]
-
-    return solution
+    return tuple(set(perms))
 
 def get_combinations(candidates: List[int], target: int) -> List[List[int]]:
     """Returns a list of lists representing each possible set of drops.
@@ -243,6 +261,211 @@ def get_action_string(action: Action) -> str:
     return (f"Move ({action.start_coord[0]}, {action.start_coord[1]})->("
             f"{action.end_coord[0]}, {action.end_coord[1]}): {action.drop_list}")
 
+def get_state_key(state: State) -> Tuple:
+    """Returns a hashable key that identifies a position.
+
+    Two states have the same key exactly when they have the same player to move, the same stones
+    remaining and the same stacks on every square.
+
+    Args:
+        state: the State to be identified.
+    """
+    return (state.to_move, state.black_stones, state.white_stones,
+            tuple(tuple(square) for row in state.board for square in row))
+
+class TranspositionTable:
+    """A bounded table from position keys (see get_state_key) to the results of exact searches.
+
+    Used by alphabeta.AlphaBeta and pns.RoadProver, which keep their table between searches.  A
+    full table is cleared rather than evicting entries one by one, since an exact search revisits
+    mostly the positions it stored last.
+    """
+    def __init__(self, capacity: int = TABLE_CAPACITY):
+        """Initializes an empty table.
+
+        Args:
+            capacity: the most positions the table holds.  Storing a new position in a table that
+                holds this many clears it first.
+        """
+        self._entries: Dict[Tuple, Any] = {}
+        self._capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Returns the entry stored for key, or None."""
+        return self._entries.get(key)
+
+    def put(self, key: Tuple, entry: Any) -> None:
+        """Stores entry for key, first clearing the table if it is full and key is new."""
+        if len(self._entries) >= self._capacity and key not in self._entries:
+            self._entries.clear()
+        self._entries[key] = entry
+
+    def clear(self) -> None:
+        """Empties the table."""
+        self._entries.clear()
+
+    @property
+    def capacity(self):
+        """Property definition for _capacity."""
+        return self._capacity
+
+def get_action_order(action: Action) -> int:
+    """Returns a sort key that puts the usually stronger kinds of action first.
+
+    Flat placements come first, then moves, then standing stones.
+
+    Args:
+        action: the action to be ordered.
+    """
+    if isinstance(action, Place):
+        return 0 if action.piece.value['type'] == 'flat' else 2
+    return 1
+
+def encode_action(action: Action) -> int:
+    """Returns a compact int code that uniquely identifies an action.
+
+    Place actions are coded in the range [0, 64) from their square and piece.  Move actions are
+    coded in the range [64, ACTION_CODES) from their starting square, their direction and their drop
+    list (stored as base-5 digits, since no more than four stones are ever dropped on a square).
+
+    Args:
+        action: the action to be encoded.
+    """
+    if isinstance(action, Place):
+        return (action.coord[0] * 4 + action.coord[1]) * 4 + PIECES.index(action.piece)
+
+    row, col = action.start_coord
+    delta_row, delta_col = action.end_coord[0] - row, action.end_coord[1] - col
+    steps = abs(delta_row + delta_col)
+    direction = DIRECTIONS.index((delta_row // steps, delta_col // steps))
+    drops = 0
+    for drop in reversed(action.drop_list):
+        drops = drops * 5 + drop
+    return MOVE_CODE_OFFSET + ((row * 4 + col) * 4 + direction) * 125 + drops
+
+def decode_action(code: int) -> Action:
+    """Returns the action identified by a code from encode_action.
+
+    Args:
+        code: an int in the range [0, ACTION_CODES).
+    """
+    if code < MOVE_CODE_OFFSET:
+        square, piece = divmod(code, 4)
+        return Place(coord=divmod(square, 4), piece=PIECES[piece])
+
+    start, drops = divmod(code - MOVE_CODE_OFFSET, 125)
+    square, direction = divmod(start, 4)
+    row, col = divmod(square, 4)
+    drop_list = []
+    while drops:
+        drops, drop = divmod(drops, 5)
+        drop_list.append(drop)
+    steps = len(drop_list)
+    return Move(
+        start_coord=(row, col),
+        end_coord=(row + DIRECTIONS[direction][0] * steps, col + DIRECTIONS[direction][1] * steps),
+        carry_size=sum(drop_list),
+        drop_list=drop_list,
+    )
+
+def encode_state(state: State) -> bytes:
+    """Returns a compact byte string holding the passed state.
+
+    The string holds the player to move, each player's remaining stones, and then, for every
+    square, the height of its stack followed by the index of each piece in PIECES.
+    """
+    data = bytearray([state.to_move == Color.WHITE, state.black_stones, state.white_stones])
+    for row in state.board:
+        for square in row:
+            data.append(len(square))
+            data.extend(PIECES.index(piece) for piece in square)
+    return bytes(data)
+
+def decode_state(data: bytes) -> State:
+    """Returns the state held in a byte string from encode_state."""
+    board = []
+    offset = 3
+    for _ in range(4):
+        row = []
+        for _ in range(4):
+            height = data[offset]
+            row.append([PIECES[index] for index in data[offset + 1:offset + 1 + height]])
+            offset += 1 + height
+        board.append(row)
+    return State(to_move=Color.WHITE if data[0] else Color.BLACK, black_stones=data[1],
+                 white_stones=data[2], board=board)
+
+def get_state_hash(state: State) -> int:
+    """Returns a 64-bit hash of a position that is the same in every process and every run.
+
+    Unlike hash(get_state_key(state)), the value can be stored in files and shared between
+    processes.
+    """
+    return int.from_bytes(blake2b(encode_state(state), digest_size=8).digest(), 'little')
+
+def transform_coord(coord: Tuple[int, int], symmetry: int) -> Tuple[int, int]:
+    """Returns the square a coordinate is mapped to by one of the board's eight symmetries.
+
+    Args:
+        coord: the coordinate to transform.
+        symmetry: an index into SYMMETRIES; 0 is the identity.
+    """
+    row, col = coord
+    transpose, flip_rows, flip_cols = SYMMETRIES[symmetry]
+    if transpose:
+        row, col = col, row
+    if flip_rows:
+        row = 3 - row
+    if flip_cols:
+        col = 3 - col
+    return (row, col)
+
+INVERSE_SYMMETRIES = [
+    next(inverse for inverse in range(len(SYMMETRIES))
+         if all(transform_coord(transform_coord((row, col), symmetry), inverse) == (row, col)
+                for row in range(4) for col in range(4)))
+    for symmetry in range(len(SYMMETRIES))
+]
+
+def transform_state(state: State, symmetry: int) -> State:
+    """Returns a copy of the state with the board mapped by one of the board's symmetries."""
+    board: List[List[List[Piece]]] = [[[] for _ in range(4)] for _ in range(4)]
+    for row in range(4):
+        for col in range(4):
+            new_row, new_col = transform_coord((row, col), symmetry)
+            board[new_row][new_col] = list(state.board[row][col])
+    return state._replace(board=board)
+
+def transform_action(action: Action, symmetry: int) -> Action:
+    """Returns the action mapped by one of the board's symmetries."""
+    if isinstance(action, Place):
+        return Place(coord=transform_coord(action.coord, symmetry), piece=action.piece)
+    return Move(
+        start_coord=transform_coord(action.start_coord, symmetry),
+        end_coord=transform_coord(action.end_coord, symmetry),
+        carry_size=action.carry_size,
+        drop_list=list(action.drop_list),
+    )
+
+def get_canonical_hash(state: State) -> Tuple[int, int]:
+    """Returns a hash that is the same for every position equivalent to this one under the board's
+    symmetries.
+
+    Roads connect opposite edges in either direction, so rotating or reflecting the board does not
+    change the value of a position.
+
+    Returns:
+        A tuple (hash, symmetry): the smallest get_state_hash of the eight transformed positions,
+        and the symmetry that maps this state to that position.  An action found for the
+        canonical position is mapped back with
+        transform_action(action, INVERSE_SYMMETRIES[symmetry]).
+    """
+    return min((get_state_hash(transform_state(state, symmetry)), symmetry)
+               for symmetry in range(len(SYMMETRIES)))
+
 def calculate_uct(child_wins: int, child_visits: int, parent_visits: int, weight: float = 2.0)\
     -> float:
     """Returns a float that represents its attractiveness for MCTS exploration
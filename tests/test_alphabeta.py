@@ -0,0 +1,70 @@
+import time
+import unittest
+import tests.env
+
+from src.alphabeta import AlphaBeta, alphabeta_search, is_late_game
+from src.search import search
+from src.types import State, Place, get_default_state
+from src.enums import Color, Piece
+from src.game import get_next_state, check_victory, validate_action
+
+B, W, WS = Piece.BLACK_FLAT, Piece.WHITE_FLAT, Piece.WHITE_STANDING
+
+class TestAlphaBeta(unittest.TestCase):
+    def test_forced_finish(self):
+        # Black completes the top row to win; any other action lets White do the same.
+        state = State(
+            to_move=Color.BLACK,
+            black_stones=8,
+            white_stones=8,
+            board=[
+                [[B], [B], [B], []],
+                [[W], [W], [W], []],
+                [[], [], [], []],
+                [[], [], [], []],
+            ]
+        )
+        result = alphabeta_search(state, 2)
+        self.assertTrue(result.exact)
+        self.assertEqual(result.value, 1.0)
+        self.assertEqual(check_victory(get_next_state(state, result.action)), (1.0, 0.0))
+
+        # With no road for Black, White's threat must be blocked with a standing stone.
+        state = state._replace(to_move=Color.WHITE)
+        blocked = get_next_state(state, Place(coord=(0, 3), piece=WS))
+        result = AlphaBeta().search(blocked, 3, time.monotonic() + 10)
+        self.assertTrue(validate_action(blocked, result.action))
+        self.assertGreaterEqual(result.depth, 1)
+
+        # The root's best action does not depend on its table entry surviving the search.
+        searcher = AlphaBeta()
+        searcher._table.put = lambda key, entry: None  # pylint: disable=protected-access
+        result = searcher.search(blocked, 3)
+        self.assertTrue(validate_action(blocked, result.action))
+
+    def test_handoff(self):
+        # Black fills the last square with a flat and wins on flats, 8 to 7.
+        state = State(
+            to_move=Color.BLACK,
+            black_stones=5,
+            white_stones=5,
+            board=[
+                [[B], [W], [B], [W]],
+                [[W], [B], [B], [B]],
+                [[B], [W], [B], [W]],
+                [[W], [W], [W], []],
+            ]
+        )
+        self.assertTrue(is_late_game(state))
+        self.assertFalse(is_late_game(get_default_state(Color.BLACK)))
+
+        result = search(state, 50, alphabeta=True)
+        self.assertEqual(result.iterations, 0)
+        self.assertEqual(result.saved, 50)
+        self.assertEqual(result.proven, (1.0, 0.0))
+        self.assertEqual(check_victory(get_next_state(state, result.action)), (1.0, 0.0))
+
+        self.assertEqual(search(state, 5).iterations, 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+from threading import Event
+import unittest
+import tests.env
+
+from src.analysis import analyze, get_principal_variation, format_snapshot
+from src.node import Node
+from src.types import get_default_state
+from src.enums import Color
+from src.game import validate_action, get_next_state
+
+class TestAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.state = get_default_state(Color.BLACK)
+
+    def test_snapshots(self):
+        snapshots = list(analyze(self.state, interval_iterations=10, interval=None,
+                                 iterations=30))
+        self.assertEqual([snapshot.iterations for snapshot in snapshots], [10, 20, 30])
+        last = snapshots[-1]
+        self.assertEqual(last.tree_size, 31)
+        self.assertEqual(sum(child.visits for child in last.children), 30)
+        self.assertEqual(last.children[0].visits, max(child.visits for child in last.children))
+        for child in last.children:
+            self.assertTrue(0.0 <= child.win_rate <= 1.0)
+
+        state = self.state
+        for action in last.pv:
+            self.assertTrue(validate_action(state, action))
+            state = get_next_state(state, action)
+        self.assertIn('30 it', format_snapshot(last))
+
+    def test_stop(self):
+        # The consumer can stop at any snapshot, and an event can stop the analysis mid-interval.
+        for count, snapshot in enumerate(analyze(self.state, interval_iterations=5), 1):
+            if count == 3:
+                break
+        self.assertEqual(snapshot.iterations, 15)
+
+        stop = Event()
+        stop.set()
+        snapshots = list(analyze(self.state, interval=10.0, stop=stop))
+        self.assertEqual(len(snapshots), 1)
+        self.assertEqual(snapshots[0].iterations, 1)
+
+        with self.assertRaises(ValueError):
+            next(analyze(self.state, interval=None))
+
+    def test_principal_variation(self):
+        root_node = Node(None, self.state, None)
+        self.assertEqual(get_principal_variation(root_node), [])
+        action = root_node.unexplored[0]
+        child = root_node.add_child(action, get_next_state(self.state, action))
+        child._visits = 1
+        self.assertEqual(get_principal_variation(root_node), [action])
+        self.assertEqual(get_principal_variation(root_node, max_length=0), [])
+
+if __name__ == '__main__':
+    unittest.main()
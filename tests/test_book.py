@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+import tests.env
+
+from src.book import OpeningBook, build_book, book_player, get_book_positions,\
+    search_book_position
+from src.types import State, get_default_state
+from src.enums import Color, Piece
+from src.game import get_actions, get_next_state, validate_action
+from src.search import default_mcts
+from src.engine import Engine
+from src.utils import transform_state
+
+class TestBook(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_build_and_lookup(self):
+        count = build_book(self.path, plies=1, iterations=5, workers=1, colors=(Color.BLACK,))
+        self.assertEqual(count, len(get_book_positions(1, (Color.BLACK,))))
+
+        state = get_default_state(Color.BLACK)
+        with OpeningBook(self.path) as book:
+            self.assertEqual(len(book), count)
+            self.assertIn(state, book)
+            self.assertNotIn(get_default_state(Color.WHITE), book)
+
+            for action in get_actions(state):
+                reply_state = get_next_state(state, action)
+                self.assertTrue(validate_action(reply_state, book.lookup(reply_state)))
+                mirrored = transform_state(reply_state, 5)
+                self.assertTrue(validate_action(mirrored, book.lookup(mirrored)))
+
+            after = get_next_state(reply_state, book.lookup(reply_state))
+            self.assertIsNone(book.lookup(after))
+            player = book_player(book, default_mcts)
+            self.assertEqual(player.__name__, 'book_default_mcts')
+            self.assertEqual(book_player(book, Engine()).__name__, 'book_Engine')
+            self.assertTrue(validate_action(after, player(after, 5)))
+
+    def test_exact_position(self):
+        # A forced road is settled by the proof-number handoff before any child is expanded.
+        B, W = Piece.BLACK_FLAT, Piece.WHITE_FLAT
+        state = State(
+            to_move=Color.BLACK,
+            black_stones=11,
+            white_stones=13,
+            board=[
+                [[], [B], [], []],
+                [[B], [], [B], []],
+                [[], [B], [], [W]],
+                [[], [], [], [W]],
+            ]
+        )
+        entry = search_book_position(state, 20, {'pns': True})
+        self.assertEqual((entry.visits, entry.iterations), (0, 0))
+        entry = search_book_position(state, 20, {'alphabeta': True, 'alphabeta_empty': 16,
+                                                 'alphabeta_stones': 15, 'alphabeta_depth': 3})
+        self.assertEqual(entry.iterations, 0)
+
+if __name__ == '__main__':
+    unittest.main()
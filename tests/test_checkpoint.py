@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+import tests.env
+
+from src.checkpoint import save_tree, load_tree, TreeFile
+from src.node import Node
+from src.search import SearchOptions, search_tree
+from src.types import get_default_state
+from src.enums import Color
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_save_and_load(self):
+        root_node = Node(action=None, state=get_default_state(Color.BLACK), parent=None)
+        search_tree(root_node, SearchOptions(), 60)
+        count = save_tree(root_node, self.path)
+        self.assertEqual(count, root_node.count_descendants() + 1)
+
+        with TreeFile(self.path) as tree_file:
+            self.assertEqual(len(tree_file), count)
+            self.assertEqual(tree_file.get_record(0).visits, 60)
+            child = root_node.children[0]
+            record = tree_file.get_record(tree_file.find([child.code]))
+            self.assertEqual((record.visits, record.wins), (child.visits, child.wins))
+
+        loaded = load_tree(self.path, lazy=False)
+        self.assertEqual(loaded.count_descendants(), root_node.count_descendants())
+        self.assertEqual([(child.code, child.visits, child.wins) for child in loaded.children],
+                         [(child.code, child.visits, child.wins) for child in root_node.children])
+        self.assertEqual(len(loaded.unexplored), len(root_node.unexplored))
+
+        search_tree(loaded, SearchOptions(), 10)
+        self.assertEqual(loaded.visits, 70)
+
+        shallow = load_tree(self.path, min_visits=61)
+        self.assertEqual(shallow.children, [])
+        self.assertEqual(shallow.visits, 60)
+
+        # Lazily, only the root's children are built until the search selects them.
+        lazy = load_tree(self.path)
+        self.assertEqual(lazy.count_descendants(), len(root_node.children))
+        self.assertEqual([(child.code, child.visits, child.wins) for child in lazy.children],
+                         [(child.code, child.visits, child.wins) for child in root_node.children])
+        self.assertEqual(sum(1 for child in lazy.children if child.loader is not None),
+                         sum(1 for child in root_node.children if child.children))
+        search_tree(lazy, SearchOptions(), 10)
+        self.assertEqual(lazy.visits, 70)
+        self.assertEqual(save_tree(lazy, self.path), lazy.count_descendants() + 1)
+        self.assertGreaterEqual(lazy.count_descendants(), root_node.count_descendants())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import time
+import unittest
+import tests.env
+
+from src.clock import GameClock, TimeControl, allocate_time, estimate_moves_left, MAX_FRACTION
+from src.search import default_mcts
+from src.types import State, get_default_state
+from src.enums import Color, Piece
+from src.game import validate_action
+
+B, W = Piece.BLACK_FLAT, Piece.WHITE_FLAT
+
+class TestClock(unittest.TestCase):
+    def setUp(self):
+        self.state = get_default_state(Color.BLACK)
+
+    def test_estimate_moves_left(self):
+        self.assertEqual(estimate_moves_left(self.state), 19)
+        state = self.state._replace(black_stones=1)
+        self.assertEqual(estimate_moves_left(state), 5)
+
+    def test_allocate_time(self):
+        allocation = allocate_time(self.state, 60.0)
+        self.assertGreater(allocation.target, 0.0)
+        self.assertGreater(allocation.maximum, allocation.target)
+        self.assertLess(allocation.target, 60.0 * MAX_FRACTION)
+
+        # The increment adds time, and a nearly empty clock caps the maximum.
+        self.assertGreater(allocate_time(self.state, 60.0, 5.0).target, allocation.target)
+        short = allocate_time(self.state, 1.0, 10.0)
+        self.assertLessEqual(short.maximum, 1.0 * MAX_FRACTION)
+        self.assertLessEqual(short.target, short.maximum)
+
+        # Positions with more actions get more time.
+        state = State(
+            to_move=Color.BLACK,
+            black_stones=10,
+            white_stones=10,
+            board=[
+                [[B, W, B], [W], [B], []],
+                [[W, B], [B], [], []],
+                [[], [W], [W, B], []],
+                [[], [], [], [B, W, B]],
+            ],
+        )
+        self.assertGreater(allocate_time(state, 60.0).target, allocation.target)
+        self.assertEqual(allocate_time(self.state, 0.0).maximum, 0.0)
+
+    def test_game_clock(self):
+        clock = GameClock(TimeControl(total=2.0, increment=1.0))
+        start = time.monotonic()
+        deadline, max_deadline = clock.start_move(self.state)
+        self.assertLess(time.monotonic(), deadline)
+        self.assertLessEqual(deadline, max_deadline)
+        action = default_mcts(self.state, None, deadline=deadline, max_deadline=max_deadline)
+        self.assertTrue(validate_action(self.state, action))
+        self.assertLessEqual(time.monotonic(), max_deadline + 0.5)
+        remaining = clock.end_move()
+        self.assertTrue(3.0 - (time.monotonic() - start) <= remaining < 3.0)
+        self.assertEqual(clock.remaining(Color.BLACK), remaining)
+        self.assertEqual(clock.remaining(Color.WHITE), 2.0)
+
+        clock = GameClock(TimeControl(total=0.001, increment=1.0))
+        clock.start_move(self.state)
+        time.sleep(0.01)
+        self.assertLess(clock.end_move(), 0.0)
+        self.assertTrue(clock.is_flagged(Color.BLACK))
+
+if __name__ == '__main__':
+    unittest.main()
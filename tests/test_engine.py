@@ -0,0 +1,62 @@
+from threading import Event, Timer
+import time
+import unittest
+import tests.env
+
+from src.engine import Engine
+from src.types import get_default_state
+from src.enums import Color
+from src.game import get_next_state, validate_action
+
+class TestEngine(unittest.TestCase):
+    def setUp(self):
+        self.state = get_default_state(Color.BLACK)
+
+    def test_tree_reuse(self):
+        engine = Engine(iterations=30)
+        action = engine(self.state)
+        self.assertTrue(validate_action(self.state, action))
+        self.assertIsNotNone(engine.root)
+        self.assertIsNone(engine.root.parent)
+        self.assertEqual(engine.root.action, action)
+
+        kept = engine.root
+        state = get_next_state(self.state, action)
+        reply = kept.children[0].action if kept.children else kept.unexplored[0]
+        engine.advance(reply)
+        if kept.children:
+            self.assertEqual(engine.root.action, reply)
+        else:
+            self.assertIsNone(engine.root)
+
+        state = get_next_state(state, reply)
+        result = engine.search(state, 10)
+        self.assertEqual(result.iterations, 10)
+
+    def test_pondering(self):
+        engine = Engine(iterations=10, ponder=True)
+        action = engine(self.state)
+        time.sleep(0.3)
+        kept = engine.root
+        self.assertGreater(engine.stop_pondering(), 0)
+        self.assertGreater(kept.visits, 1)
+
+        state = get_next_state(self.state, action)
+        reply = kept.children[0].action
+        engine(get_next_state(state, reply))
+        engine.close()
+        self.assertIsNone(engine.root)
+
+    def test_early_stop_without_budget(self):
+        # Neither pondering nor a search bounded only by a stop event is cut short by early_stop.
+        engine = Engine(iterations=10, ponder=True, early_stop=True)
+        engine(self.state)
+        time.sleep(0.3)
+        self.assertGreater(engine.stop_pondering(), 1)
+
+        stop = Event()
+        timer = Timer(0.2, stop.set)
+        timer.start()
+        result = Engine(early_stop=True, confidence=0.9).search(self.state, stop=stop)
+        timer.join()
+        self.assertGreater(result.iterations, 1)
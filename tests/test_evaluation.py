@@ -0,0 +1,50 @@
+import unittest
+import tests.env
+
+from src.evaluation import evaluate_state, get_road_potential, get_action_priors
+from src.types import get_default_state, Place, Move
+from src.game import get_actions
+from src.utils import encode_action
+from src.enums import Color, Piece
+
+class TestEvaluation(unittest.TestCase):
+    def setUp(self):
+        self.state = get_default_state(Color.BLACK)._replace(
+            black_stones=12,
+            white_stones=12,
+            board=[
+                [[Piece.BLACK_FLAT], [Piece.BLACK_FLAT], [], [Piece.BLACK_FLAT]],
+                [[Piece.WHITE_FLAT], [], [Piece.WHITE_STANDING], []],
+                [[Piece.WHITE_FLAT], [], [], []],
+                [[], [], [], []],
+            ],
+        )
+
+    def test_get_road_potential(self):
+        self.assertEqual(get_road_potential(self.state, Color.BLACK), 3)
+        self.assertEqual(get_road_potential(self.state, Color.WHITE), 2)
+        self.assertEqual(get_road_potential(get_default_state(Color.BLACK), Color.WHITE), 0)
+
+    def test_evaluate_state(self):
+        self.assertEqual(evaluate_state(get_default_state(Color.BLACK)), (0.5, 0.5))
+
+        black, white = evaluate_state(self.state)
+        self.assertGreater(black, 0.5)
+        self.assertAlmostEqual(black + white, 1.0)
+
+    def test_get_action_priors(self):
+        actions = get_actions(self.state)
+        priors = get_action_priors(self.state, actions)
+        self.assertEqual(len(priors), len(actions))
+        self.assertAlmostEqual(sum(priors.values()), 1.0)
+
+        road = encode_action(Place(coord=(0, 2), piece=Piece.BLACK_FLAT))
+        self.assertEqual(max(priors, key=priors.get), road)
+        block = encode_action(Place(coord=(3, 0), piece=Piece.BLACK_STANDING))
+        wall = encode_action(Place(coord=(3, 3), piece=Piece.BLACK_STANDING))
+        self.assertGreater(priors[block], priors[wall])
+        capture = encode_action(Move(start_coord=(0, 0), end_coord=(1, 0), carry_size=1,
+                                     drop_list=[1]))
+        slide = encode_action(Move(start_coord=(0, 1), end_coord=(1, 1), carry_size=1,
+                                   drop_list=[1]))
+        self.assertGreater(priors[capture], priors[slide])
@@ -2,7 +2,8 @@ import unittest
 import tests.env
 import pprint as pp
 
-from src.game import get_actions
+from src.game import get_actions, generate_actions, set_action_cache_capacity,\
+    clear_action_cache, get_action_cache_info, ACTION_CACHE_CAPACITY
 from src.types import State, Place, Move
 from src.enums import Piece, Color
 
@@ -88,6 +89,27 @@ class TestGetActions(unittest.TestCase):
 
         self.assertEqual(get_actions(self.error_state), [])
 
+    def test_action_cache(self):
+        clear_action_cache()
+        actions = get_actions(self.test_state_1)
+        self.assertEqual(actions, generate_actions(self.test_state_1))
+        actions.pop()
+        self.assertEqual(get_actions(self.test_state_1), generate_actions(self.test_state_1))
+        self.assertEqual(get_action_cache_info()[:3], (1, 1, 1))
+
+        set_action_cache_capacity(1)
+        get_actions(self.blank_state)
+        self.assertEqual(get_action_cache_info().size, 1)
+        get_actions(self.test_state_1)
+        self.assertEqual(get_action_cache_info().misses, 3)
+
+        set_action_cache_capacity(0)
+        get_actions(self.test_state_1)
+        self.assertEqual(get_action_cache_info()[:3], (1, 3, 0))
+
+        set_action_cache_capacity(ACTION_CACHE_CAPACITY)
+        clear_action_cache()
+
     def setUp(self):
         self.blank_state = State(
             to_move = Color.WHITE,
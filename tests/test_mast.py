@@ -0,0 +1,69 @@
+import random
+import unittest
+import tests.env
+
+from src.mast import MastTable
+from src.search import search
+from src.types import get_default_state
+from src.enums import Color
+from src.game import get_actions, get_action_codes, get_actions_and_codes, simulate
+from src.utils import encode_action
+
+class TestMast(unittest.TestCase):
+    def setUp(self):
+        self.state = get_default_state(Color.BLACK)
+        self.actions = get_actions(self.state)
+        self.codes = [encode_action(action) for action in self.actions]
+
+    def test_get_action_codes(self):
+        self.assertEqual(get_action_codes(self.state), self.codes)
+        self.assertEqual(get_actions_and_codes(self.state), (self.actions, self.codes))
+
+    def test_update(self):
+        table = MastTable()
+        # Black plays the first action and wins, White's reply is credited with the loss.
+        table.update(self.codes[:2], Color.BLACK, (1.0, 0.0))
+        self.assertEqual(table.get_visits(Color.BLACK, self.codes[0]), 1.0)
+        self.assertEqual(table.get_visits(Color.WHITE, self.codes[1]), 1.0)
+        self.assertEqual(table.get_visits(Color.BLACK, self.codes[1]), 0.0)
+        self.assertAlmostEqual(table.get_value(Color.BLACK, self.codes[0]), 0.75)
+        self.assertAlmostEqual(table.get_value(Color.WHITE, self.codes[1]), 0.25)
+        self.assertEqual(table.get_value(Color.BLACK, self.codes[2]), 0.5)
+
+        table.decay(0.5)
+        self.assertEqual(table.get_visits(Color.BLACK, self.codes[0]), 0.5)
+        self.assertAlmostEqual(table.get_value(Color.BLACK, self.codes[0]), 2 / 3)
+
+    def test_choose(self):
+        greedy = MastTable(epsilon=0.0)
+        for _ in range(3):
+            greedy.update([self.codes[5]], Color.BLACK, (1.0, 0.0))
+        for _ in range(10):
+            self.assertEqual(greedy.choose(self.state, self.actions), self.actions[5])
+            self.assertEqual(greedy.choose(self.state, self.actions, self.codes), self.actions[5])
+
+        gibbs = MastTable(policy='gibbs', temperature=0.05)
+        for _ in range(20):
+            gibbs.update([self.codes[5]], Color.BLACK, (1.0, 0.0))
+        random.seed(0)
+        chosen = [gibbs.choose(self.state, self.actions, self.codes) for _ in range(50)]
+        self.assertGreater(chosen.count(self.actions[5]), 25)
+
+        with self.assertRaises(ValueError):
+            MastTable(policy='greedy')
+
+    def test_simulate_policy(self):
+        table = MastTable()
+        record = []
+        result = simulate(self.state, record, policy=table.choose)
+        self.assertIn(result[0] + result[1], (1.0, 2.0))
+        self.assertTrue(record)
+
+    def test_search(self):
+        table = MastTable()
+        result = search(self.state, 50, mast=table, rave=True)
+        self.assertIn(result.action, self.actions)
+        self.assertGreater(sum(table.get_visits(Color.BLACK, code) for code in self.codes), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,14 @@
+import gc
 import tests.env
 import unittest
+import warnings
 
-from src.node import Node
+import src.node
+from src.node import Node, NodeArena, np
 from src.types import State, Place, get_default_state
 from src.enums import Color, Piece
-from src.game import get_next_state
-from src.utils import calculate_uct
+from src.game import get_next_state, get_actions
+from src.utils import calculate_uct, encode_action
 
 class TestNode(unittest.TestCase):
     def setUp(self):
@@ -53,6 +56,97 @@ class TestNode(unittest.TestCase):
     def test_select_child(self):
         self.assertEqual(self.root_node.select_child(), self.child_2)
 
+    def test_select_child_matches_uct(self):
+        state = get_default_state(Color.WHITE)
+        root_node = Node(None, state, None)
+        for index, action in enumerate(get_actions(state)):
+            child = root_node.add_child(action, get_next_state(state, action))
+            child._visits = 1 + index % 7
+            child._wins = (index * 3 % 5) / 5 * child._visits
+        root_node._visits = sum(child._visits for child in root_node.children)
+
+        expected = max(
+            reversed(root_node.children),
+            key=lambda child: calculate_uct(child.wins, child.visits, root_node.visits)
+        )
+        self.assertEqual(root_node.select_child(), expected)
+
+        root_node._visits += 5
+        expected = max(
+            reversed(root_node.children),
+            key=lambda child: calculate_uct(child.wins, child.visits, root_node.visits)
+        )
+        self.assertEqual(root_node.select_child(), expected)
+
+    @unittest.skipUnless(np, "NumPy is not installed")
+    def test_select_child_numpy(self):
+        state = get_default_state(Color.WHITE)
+        root_node = Node(None, state, None)
+        for index, action in enumerate(get_actions(state)):
+            child = root_node.add_child(action, get_next_state(state, action))
+            child._visits = 1 + index % 7
+            child._wins = (index * 3 % 5) / 5 * child._visits
+        root_node._visits = sum(child._visits for child in root_node.children)
+        children = root_node.children
+
+        threshold = src.node.NUMPY_MIN_CHILDREN
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('error')
+                for skip_proven in (False, True):
+                    src.node.NUMPY_MIN_CHILDREN = len(children) + 1
+                    expected = root_node.select_child(skip_proven)
+                    src.node.NUMPY_MIN_CHILDREN = 0
+                    self.assertIs(root_node.select_child(skip_proven), expected)
+
+                # The first child with no visits is taken, skipping proven ones if asked to.
+                children[3]._visits = 0
+                children[5]._visits = 0
+                children[3].set_proven((1.0, 0.0))
+                self.assertIs(root_node.select_child(), children[3])
+                self.assertIs(root_node.select_child(True), children[5])
+        finally:
+            src.node.NUMPY_MIN_CHILDREN = threshold
+
+    def test_select_child_puct(self):
+        state = get_default_state(Color.BLACK)
+        root_node = Node(None, state, None)
+        self.assertAlmostEqual(sum(root_node.get_priors().values()), 1.0)
+        actions = get_actions(state)
+        for action in actions[:2]:
+            child = root_node.add_child(action, get_next_state(state, action))
+            child._visits, child._wins = 2, 1.0
+        root_node._visits = 4
+
+        priors = root_node.get_priors()
+        expected = max(reversed(root_node.children), key=lambda child: priors[child.code])
+        self.assertEqual(root_node.select_child(puct_constant=1.5), expected)
+        best = max(actions[2:], key=lambda action: priors[encode_action(action)])
+        self.assertEqual(priors[encode_action(root_node.get_prior_action())],
+                         priors[encode_action(best)])
+
+    def test_terminal_and_decisive(self):
+        state = get_default_state(Color.BLACK)._replace(board=[
+            [[Piece.BLACK_FLAT], [Piece.BLACK_FLAT], [Piece.BLACK_FLAT], []],
+            [[Piece.WHITE_FLAT], [Piece.WHITE_FLAT], [], []],
+            [[], [Piece.WHITE_FLAT], [], []],
+            [[], [], [], []],
+        ])
+        root_node = Node(None, state, None)
+        self.assertIsNone(root_node.terminal)
+        self.assertIsNone(root_node.decisive)
+
+        losing = Place(coord=(3, 3), piece=Piece.BLACK_FLAT)
+        root_node.add_child(losing, get_next_state(state, losing))
+        self.assertIsNone(root_node.decisive)
+
+        winning = Place(coord=(0, 3), piece=Piece.BLACK_FLAT)
+        child = root_node.add_child(winning, get_next_state(state, winning))
+        self.assertEqual(child.terminal, (1.0, 0.0))
+        self.assertEqual(child.unexplored, [])
+        self.assertEqual(root_node.decisive, child)
+        self.assertEqual(root_node.select_child_decisive(), child)
+
     def test_update_node(self):
         result_1 = (1.0, 0.0)
         result_2 = (0.0, 1.0)
@@ -69,3 +163,36 @@ class TestNode(unittest.TestCase):
         self.child_1.update_node(result_3)
         self.assertEqual(self.child_1._visits, 6)
         self.assertEqual(self.child_1._wins, 1.5)
+
+    def test_parent_links(self):
+        self.assertIs(self.child_1.parent, self.root_node)
+        state = get_default_state(Color.WHITE)
+        root_node = Node(None, state, None)
+        action = get_actions(state)[0]
+        child = root_node.add_child(action, get_next_state(state, action))
+        # The tree has no reference cycles, so dropping the root frees it at once.
+        gc.disable()
+        try:
+            del root_node
+            self.assertIsNone(child.parent)
+        finally:
+            gc.enable()
+
+    def test_arena(self):
+        arena = NodeArena(capacity=2)
+        state = get_default_state(Color.WHITE)
+        root_node = Node(None, state, None, arena=arena)
+        actions = get_actions(state)[:3]
+        children = [root_node.add_child(action, get_next_state(state, action))
+                    for action in actions]
+        self.assertEqual(arena.allocated, 3)
+        self.assertIs(children[0].arena, arena)
+
+        root_node.prune()
+        self.assertEqual(len(arena), 2)
+        child = root_node.add_child(actions[0], get_next_state(state, actions[0]))
+        self.assertIn(child, children)
+        self.assertEqual(arena.reused, 1)
+        self.assertIs(child.parent, root_node)
+        self.assertEqual((child.visits, child.code), (0, encode_action(actions[0])))
+        self.assertEqual(root_node.children, [child])
@@ -0,0 +1,65 @@
+import unittest
+import tests.env
+
+from src.pns import RoadProver, prove_road
+from src.search import search
+from src.types import State
+from src.enums import Color, Piece
+from src.game import get_next_state, check_victory, get_actions
+
+B, W = Piece.BLACK_FLAT, Piece.WHITE_FLAT
+
+class TestPns(unittest.TestCase):
+    def setUp(self):
+        # A Black flat on (1, 1) threatens both (1, 3) and (3, 1), and White can only block one.
+        self.state = State(
+            to_move=Color.BLACK,
+            black_stones=11,
+            white_stones=13,
+            board=[
+                [[], [B], [], []],
+                [[B], [], [B], []],
+                [[], [B], [], [W]],
+                [[], [], [], [W]],
+            ]
+        )
+
+    def test_prove_road(self):
+        self.assertFalse(prove_road(self.state, 1).proven)
+
+        result = prove_road(self.state, 3)
+        self.assertTrue(result.proven)
+        after = get_next_state(self.state, result.action)
+        for reply in get_actions(after):
+            reply_state = get_next_state(after, reply)
+            self.assertIsNone(check_victory(reply_state))
+            self.assertTrue(prove_road(reply_state, 1).proven)
+
+        prover = RoadProver()
+        self.assertTrue(prover.prove(self.state, 3).proven)
+        self.assertLessEqual(prover.prove(self.state, 3).nodes, result.nodes)
+        self.assertIsNone(prove_road(self.state, 3, max_nodes=1).proven)
+
+    def test_reused_prover(self):
+        # After Black's proof, the table must not answer for White, who attacks in the replies.
+        prover = RoadProver()
+        result = prover.prove(self.state, 3)
+        self.assertTrue(result.proven)
+        after = get_next_state(self.state, result.action)
+        self.assertEqual(prover.prove(after, 2).proven, prove_road(after, 2).proven)
+        for reply in get_actions(after)[:10]:
+            reply_state = get_next_state(after, reply)
+            self.assertEqual(prover.prove(reply_state, 1).proven,
+                             prove_road(reply_state, 1).proven)
+
+    def test_search(self):
+        result = search(self.state, 20, pns=True)
+        self.assertEqual(result.iterations, 0)
+        self.assertEqual(result.proven, (1.0, 0.0))
+
+        result = search(self.state._replace(to_move=Color.WHITE), 40, pns=True, solver=True,
+                        pns_visits=2)
+        self.assertGreater(result.iterations, 0)
+
+if __name__ == '__main__':
+    unittest.main()
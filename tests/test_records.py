@@ -0,0 +1,50 @@
+import os
+import struct
+import tempfile
+import unittest
+import tests.env
+
+from src.records import RecordFile
+
+class PairFile(RecordFile):
+    MAGIC = b'TEST'
+    VERSION = 2
+    HEADER = struct.Struct('<4sHI')
+    RECORD = struct.Struct('<QI')
+    KIND = 'pair'
+
+class TestRecords(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, magic, version, records):
+        with open(self.path, 'wb') as file:
+            file.write(PairFile.HEADER.pack(magic, version, len(records)))
+            for record in records:
+                file.write(PairFile.RECORD.pack(*record))
+
+    def test_find_record(self):
+        records = [(key * 3, key) for key in range(100)]
+        self.write(b'TEST', 2, records)
+        with PairFile(self.path) as pairs:
+            self.assertEqual(len(pairs), 100)
+            self.assertEqual(pairs.read_record(7), (21, 7))
+            for key, value in records:
+                self.assertEqual(pairs.find_record(key), (key, value))
+            self.assertIsNone(pairs.find_record(1))
+            self.assertIsNone(pairs.find_record(300))
+
+    def test_bad_header(self):
+        self.write(b'TEST', 1, [])
+        with self.assertRaisesRegex(ValueError, 'version 2 pair file'):
+            PairFile(self.path)
+        self.write(b'NOPE', 2, [])
+        with self.assertRaises(ValueError):
+            PairFile(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+import asyncio
+import gc
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import tests.env
+
+from src.search import search, default_mcts, get_deadline, can_stop_early, async_search,\
+    get_instability
+from src.node import Node, NodeArena
+from src.types import get_default_state
+from src.enums import Color, Piece
+from src.game import validate_action, get_actions, get_next_state, check_victory
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        self.state = get_default_state(Color.BLACK)
+
+    def test_iterations(self):
+        result = search(self.state, 10)
+        self.assertEqual(result.iterations, 10)
+        self.assertTrue(validate_action(self.state, result.action))
+
+        result = search(self.state, 10, leaf_simulations=3)
+        self.assertEqual(result.iterations, 9)
+
+    def test_time_limit(self):
+        start = time.monotonic()
+        result = search(self.state, time_limit=0.2)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertGreater(result.iterations, 0)
+
+        result = search(self.state, 5, time_limit=10.0)
+        self.assertEqual(result.iterations, 5)
+
+    def test_deadline(self):
+        self.assertIsNone(get_deadline())
+        deadline = time.monotonic() + 100.0
+        self.assertEqual(get_deadline(deadline=deadline), deadline)
+        self.assertLess(get_deadline(1.0, deadline), deadline)
+
+        result = search(self.state, deadline=time.monotonic())
+        self.assertEqual(result.iterations, 1)
+
+    def test_no_budget(self):
+        with self.assertRaises(ValueError):
+            default_mcts(self.state)
+
+    def test_early_stop(self):
+        result = search(self.state, 60, early_stop=True)
+        self.assertEqual(result.iterations + result.saved, 60)
+
+        result = search(self.state, 60, confidence=0.95)
+        self.assertLessEqual(result.iterations + result.saved, 60)
+
+        with self.assertRaises(ValueError):
+            search(self.state, 10, early_stop=True, weighted=True)
+
+    def test_can_stop_early(self):
+        root_node = Node(None, self.state, None)
+        for action in get_actions(self.state):
+            root_node.add_child(action, get_next_state(self.state, action))
+        for child in root_node.children:
+            child._visits = 1
+        root_node.children[0]._visits = 40
+        root_node._visits = 40 + len(root_node.children) - 1
+
+        self.assertFalse(can_stop_early(root_node, 39))
+        self.assertTrue(can_stop_early(root_node, 38))
+        self.assertTrue(can_stop_early(root_node, 100, confidence=0.95))
+        self.assertFalse(can_stop_early(root_node, 2000, confidence=0.95))
+
+    def test_solver(self):
+        state = self.state._replace(board=[
+            [[Piece.BLACK_FLAT], [Piece.BLACK_FLAT], [Piece.BLACK_FLAT], []],
+            [[Piece.WHITE_FLAT], [Piece.WHITE_FLAT], [Piece.WHITE_FLAT], []],
+            [[], [], [], []],
+            [[], [], [], []],
+        ])
+        result = search(state, 500, solver=True)
+        self.assertEqual(result.proven, (1.0, 0.0))
+        self.assertEqual(check_victory(get_next_state(state, result.action)), (1.0, 0.0))
+        self.assertEqual(result.iterations + result.saved, 500)
+        self.assertGreater(result.saved, 0)
+
+    def test_rave(self):
+        result = search(self.state, 20, rave=True)
+        self.assertEqual(result.iterations, 20)
+        self.assertTrue(validate_action(self.state, result.action))
+
+    def test_priors(self):
+        state = self.state._replace(board=[
+            [[Piece.BLACK_FLAT], [Piece.BLACK_FLAT], [Piece.BLACK_FLAT], []],
+            [[Piece.WHITE_FLAT], [Piece.WHITE_FLAT], [], []],
+            [[], [Piece.WHITE_FLAT], [], []],
+            [[], [], [], []],
+        ])
+        result = search(state, 1, priors=True)
+        self.assertEqual(check_victory(get_next_state(state, result.action)), (1.0, 0.0))
+        self.assertTrue(validate_action(self.state, search(self.state, 20, priors=True).action))
+
+    def test_widening(self):
+        root_node = Node(None, self.state, None)
+        self.assertTrue(root_node.is_expandable(2.0))
+        root_node.add_child(root_node.get_ordered_action(), get_next_state(
+            self.state, root_node.get_ordered_action()))
+        root_node._visits = 1
+        self.assertTrue(root_node.is_expandable(2.0))
+        root_node.add_child(root_node.get_ordered_action(), get_next_state(
+            self.state, root_node.get_ordered_action()))
+        self.assertFalse(root_node.is_expandable(2.0))
+        self.assertTrue(root_node.is_expandable())
+        for child in root_node.children:
+            self.assertEqual(child.action.piece, Piece.BLACK_FLAT)
+
+        result = search(self.state, 20, widening=True)
+        self.assertEqual(result.iterations, 20)
+
+    def test_workers(self):
+        result = search(self.state, 20, leaf_simulations=4, workers=2, rollout_plies=4)
+        self.assertEqual(result.iterations, 20)
+        self.assertEqual(sum(result.rollout_lengths.values()), 20)
+        self.assertLessEqual(max(result.rollout_lengths), 4)
+
+        # Five simulations are split unevenly between the two workers.
+        result = search(self.state, 15, leaf_simulations=5, workers=2)
+        self.assertEqual(result.iterations, 15)
+        self.assertEqual(sum(result.rollout_lengths.values()), 15)
+
+    def test_rollout_plies(self):
+        result = search(self.state, 10, rollout_plies=4)
+        self.assertEqual(sum(result.rollout_lengths.values()), 10)
+        self.assertLessEqual(max(result.rollout_lengths), 4)
+
+    def test_max_nodes(self):
+        result = search(self.state, 60, max_nodes=20)
+        self.assertEqual(result.iterations, 60)
+        self.assertGreater(result.evictions, 0)
+
+        result = search(self.state, 60, max_nodes=20, eviction='recent', widening=True)
+        self.assertGreater(result.evictions, 0)
+
+        with self.assertRaises(ValueError):
+            search(self.state, 60, max_nodes=5, eviction='oldest')
+
+    def test_max_deadline(self):
+        root_node = Node(None, self.state, None)
+        self.assertEqual(get_instability(root_node), 1.0)
+        for index, action in enumerate(get_actions(self.state)[:3]):
+            child = root_node.add_child(action, get_next_state(self.state, action))
+            child._visits = (10, 4, 8)[index]
+        self.assertEqual(get_instability(root_node), 0.8)
+
+        # Past the deadline, the search goes on while the root is unstable.
+        start = time.monotonic()
+        result = search(self.state, 40, deadline=start, max_deadline=start + 60.0)
+        self.assertGreater(result.iterations, 1)
+        self.assertLessEqual(result.iterations, 40)
+        result = search(self.state, deadline=start, max_deadline=start)
+        self.assertEqual(result.iterations, 1)
+
+    def test_gc_mode(self):
+        for gc_mode in ('pause', 'freeze'):
+            result = search(self.state, 20, gc_mode=gc_mode)
+            self.assertEqual(result.iterations, 20)
+            self.assertTrue(gc.isenabled())
+            self.assertEqual(gc.get_freeze_count(), 0)
+
+        with self.assertRaises(ValueError):
+            search(self.state, 20, gc_mode='off')
+
+    def test_arena(self):
+        arena = NodeArena()
+        search(self.state, 20, arena=arena)
+        self.assertEqual(len(arena), 21)
+        result = search(self.state, 20, arena=arena, max_nodes=10)
+        self.assertEqual(result.iterations, 20)
+        self.assertEqual(arena.reused, 20)
+
+    def test_async_search(self):
+        async def run():
+            ticks = 0
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0)
+
+            task = asyncio.ensure_future(ticker())
+            result = await async_search(self.state, 20, slice_iterations=4)
+            self.assertEqual(result.iterations, 20)
+            self.assertGreaterEqual(ticks, 4)
+
+            with ThreadPoolExecutor(1) as executor:
+                result = await async_search(self.state, time_limit=0.2, executor=executor)
+            self.assertGreater(result.iterations, 0)
+
+            search_task = asyncio.ensure_future(async_search(self.state, time_limit=100.0))
+            await asyncio.sleep(0.1)
+            search_task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await search_task
+
+            # A cancelled slice on an executor stops early and its tree goes back to the arena.
+            arena = NodeArena()
+            start = time.monotonic()
+            with ThreadPoolExecutor(1) as executor:
+                search_task = asyncio.ensure_future(async_search(
+                    self.state, time_limit=100.0, slice_iterations=100000, executor=executor,
+                    arena=arena))
+                await asyncio.sleep(0.1)
+                search_task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await search_task
+            self.assertLess(time.monotonic() - start, 5.0)
+            # The release is a callback of the slice's future, run by the event loop.
+            await asyncio.sleep(0.01)
+            self.assertGreater(len(arena), 1)
+            task.cancel()
+
+        asyncio.run(run())
@@ -0,0 +1,75 @@
+import io
+import unittest
+import tests.env
+
+from src.server import EngineServer, serve_stream
+from src.types import get_default_state
+from src.enums import Color
+from src.game import get_actions, get_next_state, validate_action
+from src.utils import encode_action, decode_action
+from src.node import NodeArena
+from src.mast import MastTable
+
+class TestServer(unittest.TestCase):
+    def test_serve_stream(self):
+        state = get_default_state(Color.BLACK)
+        first = encode_action(get_actions(state)[0])
+        commands = ('isready\n'
+                    f'position a black {first}\n'
+                    'go a iterations 20\n'
+                    'position b white\n'
+                    'go b time 0.05\n'
+                    'go c\n'
+                    'close a\n'
+                    'quit\n')
+        output = io.StringIO()
+        serve_stream(EngineServer(workers=2), io.StringIO(commands), output)
+        lines = output.getvalue().splitlines()
+
+        self.assertEqual(lines[0], 'readyok')
+        self.assertIn('error unknown game c', lines)
+        replies = {line.split()[1]: line.split() for line in lines if line.startswith('bestmove')}
+        self.assertEqual(set(replies), {'a', 'b'})
+        self.assertIn(int(replies['a'][3]), range(1, 21))
+        after = get_next_state(state, decode_action(first))
+        self.assertTrue(validate_action(after, decode_action(int(replies['a'][2]))))
+
+    def test_stop(self):
+        server = EngineServer(workers=1)
+        lines = []
+        server.handle('position g black', lines.append)
+        server.handle('go g', lines.append)
+        server.handle('go g', lines.append)
+        server.handle('stop g', lines.append)
+        server.handle('close g', lines.append)
+        server.close()
+
+        self.assertEqual(lines[0], 'error game g is searching')
+        self.assertTrue(lines[1].startswith('bestmove g '))
+
+    def test_shared_options(self):
+        with self.assertRaises(ValueError):
+            EngineServer(workers=1, arena=NodeArena())
+        with self.assertRaises(ValueError):
+            EngineServer(workers=1, mast=MastTable())
+        with self.assertRaises(ValueError):
+            EngineServer(workers=0)
+
+    def test_shards(self):
+        # Each new game goes to the worker with the fewest games, and stays there.
+        server = EngineServer(workers=2)
+        lines = []
+        for name in 'abc':
+            server.handle(f'position {name} black', lines.append)
+        server.handle('close a', lines.append)
+        server.handle('position d white', lines.append)
+        for name in 'bcd':
+            server.handle(f'go {name} iterations 5', lines.append)
+        self.assertEqual(server._loads, [2, 1])  # pylint: disable=protected-access
+        server.close()
+
+        self.assertEqual(sorted(line.split()[1] for line in lines), ['b', 'c', 'd'])
+        self.assertTrue(all(line.startswith('bestmove') for line in lines))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import pickle
+from collections import Counter
+import tempfile
+import unittest
+import tests.env
+
+from src.tablebase import EndgameSolver, Tablebase, build_tablebase, write_tablebase, is_endgame
+from src.search import search
+from src.types import State
+from src.enums import Color, Piece
+from src.game import validate_action, simulate
+from src.utils import get_canonical_hash, transform_state
+
+B, W, BS = Piece.BLACK_FLAT, Piece.WHITE_FLAT, Piece.BLACK_STANDING
+
+class TestTablebase(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+        # Black fills the last square with a flat and wins on flats, 8 to 7.
+        self.state = State(
+            to_move=Color.BLACK,
+            black_stones=5,
+            white_stones=5,
+            board=[
+                [[B], [W], [B], [W]],
+                [[W], [B], [BS], [B]],
+                [[B], [W], [B], [W]],
+                [[W], [W], [B], []],
+            ]
+        )
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_solve(self):
+        solver = EndgameSolver(max_empty=1)
+        self.assertTrue(is_endgame(self.state, 1, 15))
+        self.assertEqual(solver.solve(self.state), (1.0, 0.0))
+        self.assertEqual(solver.endgames, {get_canonical_hash(self.state)[0]: (1.0, 0.0)})
+
+        write_tablebase(solver.endgames, self.path, 1, 15)
+        with Tablebase(self.path) as tablebase:
+            self.assertEqual(tablebase.probe(transform_state(self.state, 3)), (1.0, 0.0))
+            self.assertIsNone(tablebase.probe(self.state._replace(to_move=Color.WHITE)))
+            copy = pickle.loads(pickle.dumps(tablebase))
+            self.assertEqual(copy.probe(self.state), (1.0, 0.0))
+            self.assertIs(pickle.loads(pickle.dumps(tablebase)), copy)
+
+            lengths = Counter()
+            self.assertEqual(simulate(self.state, lengths=lengths, probe=tablebase), (1.0, 0.0))
+            self.assertEqual(lengths, Counter({0: 1}))
+
+            result = search(self.state, 5, tablebase=tablebase, solver=True)
+            self.assertTrue(validate_action(self.state, result.action))
+
+    def test_build_tablebase(self):
+        count = build_tablebase(self.path, games=2, max_empty=1, max_depth=1)
+        with Tablebase(self.path) as tablebase:
+            self.assertEqual(len(tablebase), count)
+            self.assertEqual((tablebase.max_empty, tablebase.max_stones), (1, 15))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
 import unittest
 import tests.env
 
-from src.utils import split_stack, get_drop_lists, get_controlled, bfs, get_path
-from src.types import State
+from src.utils import split_stack, get_drop_lists, get_controlled, bfs, get_path,\
+    encode_action, decode_action, ACTION_CODES, encode_state, decode_state, get_state_hash,\
+    get_canonical_hash, transform_state, transform_action, INVERSE_SYMMETRIES, TranspositionTable
+from src.types import State, Place, Move
 from src.enums import Color, Piece
 
 class TestUtils(unittest.TestCase):
@@ -32,6 +34,72 @@ class TestUtils(unittest.TestCase):
             [1, 1, 4],
         ])
     
+    def test_encode_action(self):
+        place = Place(coord=(2, 3), piece=Piece.WHITE_STANDING)
+        self.assertEqual(encode_action(place), 47)
+        self.assertEqual(decode_action(47), place)
+
+        move = Move(start_coord=(3, 1), end_coord=(0, 1), carry_size=4, drop_list=[1, 2, 1])
+        code = encode_action(move)
+        self.assertLess(code, ACTION_CODES)
+        self.assertEqual(decode_action(code), move)
+
+        codes = set()
+        for row in range(4):
+            for col in range(4):
+                for piece in Piece:
+                    codes.add(encode_action(Place(coord=(row, col), piece=piece)))
+                for delta_row, delta_col in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                    for carry in range(1, 5):
+                        for moves in range(1, min(carry, 3) + 1):
+                            for drop in get_drop_lists(carry, moves):
+                                move = Move(
+                                    start_coord=(row, col),
+                                    end_coord=(row + delta_row * moves, col + delta_col * moves),
+                                    carry_size=carry,
+                                    drop_list=drop,
+                                )
+                                codes.add(encode_action(move))
+                                self.assertEqual(decode_action(encode_action(move)), move)
+        self.assertEqual(len(codes), 64 + 16 * 4 * 14)
+
+    def test_canonical_hash(self):
+        state = State(
+            to_move=Color.WHITE,
+            black_stones=13,
+            white_stones=14,
+            board=[
+                [[Piece.BLACK_FLAT], [], [], []],
+                [[], [Piece.WHITE_FLAT, Piece.BLACK_STANDING], [], []],
+                [[], [], [], []],
+                [[], [], [], [Piece.WHITE_FLAT]],
+            ]
+        )
+        self.assertEqual(decode_state(encode_state(state)), state)
+        self.assertEqual(get_state_hash(state), get_state_hash(decode_state(encode_state(state))))
+
+        key, symmetry = get_canonical_hash(state)
+        move = Move(start_coord=(1, 1), end_coord=(1, 3), carry_size=2, drop_list=[1, 1])
+        for other in range(8):
+            transformed = transform_state(state, other)
+            self.assertEqual(get_canonical_hash(transformed)[0], key)
+            self.assertEqual(transform_state(transformed, INVERSE_SYMMETRIES[other]), state)
+            self.assertEqual(transform_action(transform_action(move, other),
+                                              INVERSE_SYMMETRIES[other]), move)
+        self.assertEqual(get_state_hash(transform_state(state, symmetry)), key)
+
+    def test_transposition_table(self):
+        table = TranspositionTable(2)
+        table.put((1,), 'a')
+        table.put((2,), 'b')
+        table.put((2,), 'c')
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.get((2,)), 'c')
+        table.put((3,), 'd')
+        self.assertEqual(len(table), 1)
+        self.assertIsNone(table.get((1,)))
+        self.assertEqual(table.get((3,)), 'd')
+
     def test_split_stack(self):
         a = ['a', 'b', 'c', 'd', 'e', 'f']
         b = []
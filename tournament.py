@@ -1,9 +1,12 @@
 """
-Defines functions to run a round-robin tournament among all four MCTS algorithms defined in
+Defines functions to run a round-robin tournament among all six MCTS algorithms defined in
 src/search.py.
 
 As defined, the output .csv file should be placed in build/tournament.csv.  This script will NOT
 overwrite previous data, it will simply add more lines a the end of the file.
+
+Games are played with a fixed number of iterations per move, or under a time control if
+TIME_CONTROL is set (see src/clock.py).
 """
 import csv
 from typing import List, Tuple, Optional
@@ -12,8 +15,9 @@ from datetime import datetime
 from src.game import get_next_state, check_victory
 from src.types import get_default_state
 from src.enums import Color
+from src.clock import GameClock, TimeControl
 from src.search import default_mcts, decisive_move_mcts,\
-    weighted_backpropagation_mcts, multi_simulation_mcts
+    weighted_backpropagation_mcts, multi_simulation_mcts, rave_mcts, puct_mcts
 from src.utils import pretty_time_delta
 
 FUNCTIONS = [
@@ -21,8 +25,13 @@ FUNCTIONS = [
     (decisive_move_mcts, 'dec'),
     (weighted_backpropagation_mcts, 'wbp'),
     (multi_simulation_mcts, 'msm'),
+    (rave_mcts, 'rav'),
+    (puct_mcts, 'pct'),
 ]
 
+# e.g. TimeControl(total=60.0, increment=1.0)
+TIME_CONTROL: Optional[TimeControl] = None
+
 def tournament(funcs: List) -> None:
     """Runs a round-robin tournament among algorithms.
 
@@ -40,25 +49,33 @@ def record_result(player_1: Tuple, player_2: Tuple) -> None:
         player_1, player_2: Tuples containing a MCTS function from search.py and a short string for
         ease of reading.
     """
-    line = [player_1[1], player_2[1], play_game(player_1[0], player_2[0])]
+    line = [player_1[1], player_2[1], play_game(player_1[0], player_2[0], TIME_CONTROL)]
     with open('./build/tournament.csv', mode='a') as tourn_file:
         t_writer = csv.writer(tourn_file, delimiter=',', quoting=csv.QUOTE_MINIMAL, quotechar='"')
         t_writer.writerow(line)
         print('writing:', line)
 
-def play_game(black, white) -> Optional[Tuple[float, float]]:
+def play_game(black, white, time_control: Optional[TimeControl] = None)\
+    -> Optional[Tuple[float, float]]:
     """Returns the result of a game between two algorithms.
 
     Args:
         black: the function that decides the Black player's actions.
         white: the function that decides the White player's actions.
+        time_control: if given, each move is searched until the deadlines given by a GameClock
+            instead of for 150 iterations, and a player who runs out of time loses.
     """
     state = get_default_state(Color.BLACK)
+    clock = GameClock(time_control) if time_control is not None else None
     while not check_victory(state):
-        if state.to_move == Color.BLACK:
-            action = black(state, 150)
+        player = black if state.to_move == Color.BLACK else white
+        if clock is None:
+            action = player(state, 150)
         else:
-            action = white(state, 150)
+            deadline, max_deadline = clock.start_move(state)
+            action = player(state, None, deadline=deadline, max_deadline=max_deadline)
+            if clock.end_move() <= 0.0:
+                return (0.0, 1.0) if state.to_move == Color.BLACK else (1.0, 0.0)
         state = get_next_state(state, action)
 
     return check_victory(state)